@@ -0,0 +1,181 @@
+"""
+Site and division configuration shared by the dashboard and the crawler
+worker: the ATA base URL, the GROUPS divisions, team sparring PDFs, the
+district sheet and the District / World Qualifiers matrix sheet, plus the
+standings URL and fetch plan builders. No Streamlit dependency.
+"""
+import os
+
+import pandas as pd
+
+from ata_pipeline import REGION_CODES
+
+# How long a crawled standings page counts as fresh
+STANDINGS_TTL = 3600
+
+# ATA_READ_ONLY=1: the dashboard never fetches and only reads what
+# crawler.py has stored
+READ_ONLY = os.environ.get("ATA_READ_ONLY", "").lower() in ("1", "true", "yes")
+
+# Set ATA_BASE_URL (e.g. http://127.0.0.1:8765 for mock_ata_server.py) to sweep another host
+ATA_BASE_URL = os.environ.get("ATA_BASE_URL", "https://atamartialarts.com").rstrip("/")
+STANDINGS_BASE_URL = f"{ATA_BASE_URL}/events/tournament-standings"
+
+GROUPS = {
+    "1st Degree Black Belt Women 50-59": {
+        "code": "W01D",
+        "world_url": f"{STANDINGS_BASE_URL}/worlds-standings/?code=W01D",
+        "state_url_template": STANDINGS_BASE_URL + "/state-standings/?country={}&state={}&code={}",
+        "sheet_url": "https://docs.google.com/spreadsheets/d/1tCWIc-Zeog8GFH6fZJJR-85GHbC1Kjhx50UvGluZqdg/export?format=csv"
+    },
+    "2nd/3rd Degree Black Belt Women 40-49": {
+        "code": "W23C",
+        "world_url": f"{STANDINGS_BASE_URL}/worlds-standings/?code=W23C",
+        "state_url_template": STANDINGS_BASE_URL + "/state-standings/?country={}&state={}&code={}",
+        "sheet_url": "https://docs.google.com/spreadsheets/d/1W7q6YjLYMqY9bdv5G77KdK2zxUKET3NZMQb9Inu2F8w/export?format=csv"
+    },
+    "50-59 Women Color Belts": {
+        "code": "WCOD",
+        "world_url": f"{STANDINGS_BASE_URL}/worlds-standings/?code=WCOD",
+        "state_url_template": STANDINGS_BASE_URL + "/state-standings/?country={}&state={}&code={}",
+        "sheet_url": None
+    },
+    "2nd/3rd Degree Black Belt Women 50-59": {
+        "code": "W23D",
+        "world_url": f"{STANDINGS_BASE_URL}/worlds-standings/?code=W23D",
+        "state_url_template": STANDINGS_BASE_URL + "/state-standings/?country={}&state={}&code={}",
+        "sheet_url": None  
+    }   
+}
+
+# --- TEAM SPARRING CONFIG ---
+
+TEAM_SPARRING_PDFS = {
+    "Bantam State": f"{ATA_BASE_URL}/media/zvlpk5lo/sn-bantam-state.pdf",
+    "Rookie State": f"{ATA_BASE_URL}/media/tszdwsic/sn-rookie-state.pdf",
+    "JV State": f"{ATA_BASE_URL}/media/hkpd3cl5/sn-jv-state.pdf",
+    "Varsity State": f"{ATA_BASE_URL}/media/cgxbkzx2/sn-varsity-state.pdf",
+    "Elite State": f"{ATA_BASE_URL}/media/2x0d3vsr/sn-elite-state.pdf",
+    "Premier State": f"{ATA_BASE_URL}/media/m5ukxejm/sn-premier-state.pdf",
+    "Legends State": f"{ATA_BASE_URL}/media/a2ypu3if/sn-legends-state.pdf",
+    "Executive State": f"{ATA_BASE_URL}/media/sayltmg1/sn-executive-state.pdf",
+    "World / Nationals": f"{ATA_BASE_URL}/media/1khnmd0d/sn-world.pdf",
+}
+
+
+
+DISTRICT_SHEET_URL = "https://docs.google.com/spreadsheets/d/1SJqPP3N7n4yyM8_heKe7Amv7u8mZw-T5RKN4OmBOi4I/export?format=csv"
+
+#Defining Matrix for District and World Qualifiers here
+MATRIX_SHEET_URL_V2 = (
+    "https://docs.google.com/spreadsheets/d/"
+    "1I6rKmEwf5YR7knC404v2hKH0ZzPu1Xr_mtQeLRW_ymA/"
+    "export?format=csv&gid=0"
+)
+
+
+def load_district_df() -> pd.DataFrame:
+    return pd.read_csv(DISTRICT_SHEET_URL)
+
+
+def district_map(district_df: pd.DataFrame) -> dict:
+    """District → [state/province abbreviation] from the district sheet."""
+    # Build full-name → abbreviation lookup from REGION_CODES
+    name_to_abbrev = {
+        full_name: abbrev
+        for full_name, (country, abbrev) in REGION_CODES.items()
+    }
+
+    districts = {}
+    for _, row in district_df.iterrows():
+        district = row["District"]
+        states_str = row["States and Provinces"]
+
+        abbrs = []
+        for s in str(states_str).split(","):
+            s_clean = s.strip()
+            abbr = name_to_abbrev.get(s_clean)
+            if abbr:
+                abbrs.append(abbr)
+
+        districts[district] = abbrs
+    return districts
+
+
+def load_matrix_groups() -> dict:
+    """MATRIX_GROUPS: division → code, world_url, state_url_template ({} if the sheet is unreachable)."""
+    try:
+        df = pd.read_csv(MATRIX_SHEET_URL_V2)
+
+        groups = {}
+
+        for _, row in df.iterrows():
+            div_name = str(row["Age Group"]).strip()
+            code = str(row["Code"]).strip()
+
+            # Build URLs using the formats YOU confirmed
+            world_url = f"{STANDINGS_BASE_URL}/worlds-standings/?code={code}"
+
+            state_url_template = (
+                STANDINGS_BASE_URL + "/state-standings/?country={}&state={}&code=" + code
+            )
+
+            groups[div_name] = {
+                "code": code,
+                "world_url": world_url,
+                "state_url_template": state_url_template
+            }
+
+        return groups
+
+    except Exception:
+        return {}
+
+
+def build_state_url(div_info: dict, state_full_name: str) -> str:
+    """State/province standings URL for a division (Canada needs &region=)."""
+    country, state_abbrev = REGION_CODES[state_full_name]
+    code = div_info["code"]
+
+    if country == "CA":
+        state_code_for_url = state_abbrev.lower()
+        region_param = state_full_name.replace(" ", "+")
+        return (
+            f"{div_info['state_url_template'].format(country, state_code_for_url, code)}"
+            f"&region={region_param}"
+        )
+    return div_info["state_url_template"].format(country, state_abbrev, code)
+
+
+def build_fetch_plan(groups: dict, div_names, state_names=(), include_world=False):
+    """
+    Every (division, state/world) page a report needs, one entry per URL.
+    groups is GROUPS or MATRIX_GROUPS. Returns a list of dicts: Division,
+    Code, Region, url.
+    """
+    plan = {}
+    for div_name in div_names:
+        div_info = groups.get(div_name)
+        if not div_info:
+            continue
+
+        if include_world:
+            plan.setdefault(div_info["world_url"], {
+                "Division": div_name,
+                "Code": div_info["code"],
+                "Region": "World",
+                "url": div_info["world_url"],
+            })
+
+        for state_full_name in state_names:
+            if state_full_name not in REGION_CODES:
+                continue
+            url = build_state_url(div_info, state_full_name)
+            plan.setdefault(url, {
+                "Division": div_name,
+                "Code": div_info["code"],
+                "Region": state_full_name,
+                "url": url,
+            })
+
+    return list(plan.values())
@@ -1,427 +1,673 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import re
+import ata_config
+import ata_metrics
+import ata_trace
+import pdf_extract
+import single_flight
+import standings_store
+from ata_config import (
+    GROUPS,
+    READ_ONLY,
+    STANDINGS_TTL,
+    TEAM_SPARRING_PDFS,
+    district_map,
+    load_district_df,
+    load_matrix_groups,
+)
+from ata_fetch import (
+    FETCH_ATTEMPTS,
+    FETCH_RATE,
+    FETCH_WORKERS,
+    fetch_and_store_frame,
+    fetch_group_page,
+    fetch_team_pdf_rows,
+    get_fetch_governor,
+    load_warehouse_frames,
+    read_group_page,
+)
+from ata_pipeline import (
+    ABBREV_TO_REGION,
+    EVENT_NAMES,
+    REGION_CODES,
+    STANDINGS_COLUMNS,
+    collate_district_tables,
+    collate_qualifiers,
+    dedupe_and_rank,
+    identity_key,
+    identity_keys,
+    normalize_name,
+    normalize_town,
+    resolve_identities,
+)
 import io
 import concurrent.futures
+import difflib
+import gzip
+import hashlib
+import json
+import math
+import threading
+import time
 #
+PAGES = [
+    "ATA Standings Dashboard",
+    "1st Degree Black Belt Women 50-59",
+    "National & District Rings",
+    "Historical Titles",
+    "State Champions, District & World Qualifiers (All Divisions)",
+    "Competitor Search",
+    "Division Rosters (All Divisions)",
+    "Nationwide State Champions (All Divisions)",
+    "Team Sparring",
+]
+
 # Page config
 st.set_page_config(page_title="ATA Standings Dashboard", layout="wide")
 
+# One trace per script run (ATA_TRACE_DIR); the page widget's state is already set for this run
+ata_trace.begin_run(st.session_state.get("page_choice", PAGES[0]))
+
 # --- SESSION STATE FOR REFRESH ---
 if "last_refresh" not in st.session_state:
     st.session_state.last_refresh = "Never"
 
 # --- CONFIG ---
-EVENT_NAMES = [
-    "Forms", "Weapons", "Combat Weapons", "Sparring",
-    "Creative Forms", "Creative Weapons", "X-Treme Forms", "X-Treme Weapons"
-]
+# Base URL (ATA_BASE_URL), GROUPS, TEAM_SPARRING_PDFS and the sheet-driven
+# district / matrix config live in ata_config, shared with crawler.py
 
-GROUPS = {
-    "1st Degree Black Belt Women 50-59": {
-        "code": "W01D",
-        "world_url": "https://atamartialarts.com/events/tournament-standings/worlds-standings/?code=W01D",
-        "state_url_template": "https://atamartialarts.com/events/tournament-standings/state-standings/?country={}&state={}&code={}",
-        "sheet_url": "https://docs.google.com/spreadsheets/d/1tCWIc-Zeog8GFH6fZJJR-85GHbC1Kjhx50UvGluZqdg/export?format=csv"
-    },
-    "2nd/3rd Degree Black Belt Women 40-49": {
-        "code": "W23C",
-        "world_url": "https://atamartialarts.com/events/tournament-standings/worlds-standings/?code=W23C",
-        "state_url_template": "https://atamartialarts.com/events/tournament-standings/state-standings/?country={}&state={}&code={}",
-        "sheet_url": "https://docs.google.com/spreadsheets/d/1W7q6YjLYMqY9bdv5G77KdK2zxUKET3NZMQb9Inu2F8w/export?format=csv"
-    },
-    "50-59 Women Color Belts": {
-        "code": "WCOD",
-        "world_url": "https://atamartialarts.com/events/tournament-standings/worlds-standings/?code=WCOD",
-        "state_url_template": "https://atamartialarts.com/events/tournament-standings/state-standings/?country={}&state={}&code={}",
-        "sheet_url": None
-    },
-    "2nd/3rd Degree Black Belt Women 50-59": {
-        "code": "W23D",
-        "world_url": "https://atamartialarts.com/events/tournament-standings/worlds-standings/?code=W23D",
-        "state_url_template": "https://atamartialarts.com/events/tournament-standings/state-standings/?country={}&state={}&code={}",
-        "sheet_url": None  
-    }   
-}
+REGIONS = ["All"] + list(REGION_CODES.keys()) + ["International"]
 
-REGION_CODES = {
-    "Alabama": ("US", "AL"), "Alaska": ("US", "AK"), "Arizona": ("US", "AZ"), "Arkansas": ("US", "AR"),
-    "California": ("US", "CA"), "Colorado": ("US", "CO"), "Connecticut": ("US", "CT"), "Delaware": ("US", "DE"),
-    "Florida": ("US", "FL"), "Georgia": ("US", "GA"), "Hawaii": ("US", "HI"), "Idaho": ("US", "ID"),
-    "Illinois": ("US", "IL"), "Indiana": ("US", "IN"), "Iowa": ("US", "IA"), "Kansas": ("US", "KS"),
-    "Kentucky": ("US", "KY"), "Louisiana": ("US", "LA"), "Maine": ("US", "ME"), "Maryland": ("US", "MD"),
-    "Massachusetts": ("US", "MA"), "Michigan": ("US", "MI"), "Minnesota": ("US", "MN"), "Mississippi": ("US", "MS"),
-    "Missouri": ("US", "MO"), "Montana": ("US", "MT"), "Nebraska": ("US", "NE"), "Nevada": ("US", "NV"),
-    "New Hampshire": ("US", "NH"), "New Jersey": ("US", "NJ"), "New Mexico": ("US", "NM"), "New York": ("US", "NY"),
-    "North Carolina": ("US", "NC"), "North Dakota": ("US", "ND"), "Ohio": ("US", "OH"), "Oklahoma": ("US", "OK"),
-    "Oregon": ("US", "OR"), "Pennsylvania": ("US", "PA"), "Rhode Island": ("US", "RI"), "South Carolina": ("US", "SC"),
-    "South Dakota": ("US", "SD"), "Tennessee": ("US", "TN"), "Texas": ("US", "TX"), "Utah": ("US", "UT"),
-    "Vermont": ("US", "VT"), "Virginia": ("US", "VA"), "Washington": ("US", "WA"), "West Virginia": ("US", "WV"),
-    "Wisconsin": ("US", "WI"), "Wyoming": ("US", "WY"),
-    "Alberta": ("CA", "AB"), "British Columbia": ("CA", "BC"), "Manitoba": ("CA", "MB"), "New Brunswick": ("CA", "NB"),
-    "Newfoundland and Labrador": ("CA", "NL"), "Nova Scotia": ("CA", "NS"), "Ontario": ("CA", "ON"),
-    "Prince Edward Island": ("CA", "PE"), "Quebec": ("CA", "QC"), "Saskatchewan": ("CA", "SK")
-}
+district_df = load_district_df()
 
-# --- TEAM SPARRING CONFIG ---
-
-TEAM_SPARRING_PDFS = {
-    "Bantam State": "https://atamartialarts.com/media/zvlpk5lo/sn-bantam-state.pdf",
-    "Rookie State": "https://atamartialarts.com/media/tszdwsic/sn-rookie-state.pdf",
-    "JV State": "https://atamartialarts.com/media/hkpd3cl5/sn-jv-state.pdf",
-    "Varsity State": "https://atamartialarts.com/media/cgxbkzx2/sn-varsity-state.pdf",
-    "Elite State": "https://atamartialarts.com/media/2x0d3vsr/sn-elite-state.pdf",
-    "Premier State": "https://atamartialarts.com/media/m5ukxejm/sn-premier-state.pdf",
-    "Legends State": "https://atamartialarts.com/media/a2ypu3if/sn-legends-state.pdf",
-    "Executive State": "https://atamartialarts.com/media/sayltmg1/sn-executive-state.pdf",
-    "World / Nationals": "https://atamartialarts.com/media/1khnmd0d/sn-world.pdf",
-}
+# Build District → [state_abbrev] mapping from the Google Sheet
+DISTRICT_MAP = district_map(district_df)
 
+@st.cache_data(ttl=3600)
+def load_matrix_groups_v2():
+    return load_matrix_groups()
 
-REGIONS = ["All"] + list(REGION_CODES.keys()) + ["International"]
+MATRIX_GROUPS = load_matrix_groups_v2()
 
-DISTRICT_SHEET_URL = "https://docs.google.com/spreadsheets/d/1SJqPP3N7n4yyM8_heKe7Amv7u8mZw-T5RKN4OmBOi4I/export?format=csv"
-district_df = pd.read_csv(DISTRICT_SHEET_URL)
+# --- FETCH PLAN ENGINE (District / World / State Champion reports) ---
+ALL_DIVISIONS = "All Divisions"
+# Read-only pages serve whatever the crawler stored, however old
+WAREHOUSE_MAX_AGE = float("inf") if READ_ONLY else STANDINGS_TTL
+# Rosters with missing pages are cached this long before being rebuilt
+ROSTER_PARTIAL_TTL = 60
+
+@st.cache_resource
+def get_single_flight():
+    # Standings fetch+parse calls in flight, keyed by URL, shared by all sessions
+    return single_flight.SingleFlight()
+
+
+@st.cache_resource
+def get_standings_cache():
+    # Standings frames keyed by URL, shared across reruns and sessions
+    return {"lock": threading.Lock(), "entries": {}}
+
+
+@st.cache_resource
+def get_roster_cache():
+    # Roster matrices keyed by division, plus the background precompute
+    # thread. generation counts refreshes, so builds started before one never
+    # write back; precomputed is the (generation, time) of the last full pass.
+    return {"lock": threading.Lock(), "entries": {}, "precompute": None, "generation": 0, "precomputed": None}
+
+
+def clear_standings_cache():
+    for cache in (get_standings_cache(), get_roster_cache()):
+        with cache["lock"]:
+            cache["entries"].clear()
+    roster_cache = get_roster_cache()
+    with roster_cache["lock"]:
+        roster_cache["generation"] += 1
+
+    # The store belongs to the crawler in READ_ONLY mode; expiring it would
+    # make its next pass re-crawl every page
+    if READ_ONLY:
+        return
+    conn = standings_store.connect()
+    try:
+        standings_store.expire_pages(conn)
+    finally:
+        conn.close()
+
+
+def build_fetch_plan(div_names, state_names=(), include_world=False):
+    """Fetch plan (see ata_config.build_fetch_plan) over MATRIX_GROUPS divisions."""
+    return ata_config.build_fetch_plan(MATRIX_GROUPS, div_names, state_names, include_world)
+
+
+def fetch_standings_frame(item: dict):
+    """
+    Standings frame for one plan page. Concurrent calls for the same URL
+    (from any session) share one fetch → parse → rank → store.
+    """
+    frame, _ = get_single_flight().do(("standings", item["url"]), fetch_and_store_frame, item)
+    return frame
+
+
+def execute_fetch_plan(plan):
+    """
+    Resolve a fetch plan to {url: standings frame or None}.
+    Fresh cache entries are reused; only the rest are fetched, concurrently
+    (never in READ_ONLY mode, where pages not yet crawled stay None).
+    """
+    cache = get_standings_cache()
+    now = time.time()
+    frames_by_url = {}
+
+    with cache["lock"]:
+        for item in plan:
+            hit = cache["entries"].get(item["url"])
+            if hit and now - hit[0] < STANDINGS_TTL:
+                frames_by_url[item["url"]] = hit[1]
+    ata_metrics.cache_hit("standings_memory", len(frames_by_url))
+    ata_metrics.cache_miss("standings_memory", len(plan) - len(frames_by_url))
+
+    pending = [item for item in plan if item["url"] not in frames_by_url]
+    if pending:
+        with ata_metrics.timer("warehouse_read"):
+            warehouse_frames = load_warehouse_frames(pending, WAREHOUSE_MAX_AGE)
+        ata_metrics.cache_hit("warehouse", len(warehouse_frames))
+        ata_metrics.cache_miss("warehouse", len(pending) - len(warehouse_frames))
+        with cache["lock"]:
+            for url, frame in warehouse_frames.items():
+                cache["entries"][url] = (now, frame)
+        frames_by_url.update(warehouse_frames)
+        pending = [item for item in pending if item["url"] not in frames_by_url]
+
+    if pending and not READ_ONLY:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            fetched = {
+                item["url"]: frame
+                for item, frame in zip(pending, pool.map(ata_trace.bind(fetch_standings_frame), pending))
+            }
 
-# Build district map for District qualifiers
-# Build full-name → abbreviation lookup from REGION_CODES
-name_to_abbrev = {
-    full_name: abbrev
-    for full_name, (country, abbrev) in REGION_CODES.items()
-}
+        with cache["lock"]:
+            for url, frame in fetched.items():
+                # Failures are not cached so the next run retries them
+                if frame is not None:
+                    cache["entries"][url] = (now, frame)
+        frames_by_url.update(fetched)
 
-# Build District → [state_abbrev] mapping from the Google Sheet
-DISTRICT_MAP = {}
+    return frames_by_url
 
-for _, row in district_df.iterrows():
-    district = row["District"]
-    states_str = row["States and Provinces"]
 
-    abbrs = []
-    for s in str(states_str).split(","):
-        s_clean = s.strip()
-        abbr = name_to_abbrev.get(s_clean)
-        if abbr:
-            abbrs.append(abbr)
+def plan_frame(plan, frames_by_url) -> pd.DataFrame:
+    """All fetched standings in one frame, tagged with Division, Code and Region."""
+    parts = [
+        frames_by_url[item["url"]].assign(
+            Division=item["Division"], Code=item["Code"], Region=item["Region"]
+        )
+        for item in plan
+        if frames_by_url.get(item["url"]) is not None
+    ]
+    if not parts:
+        return pd.DataFrame(columns=STANDINGS_COLUMNS + ["Division", "Code", "Region"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def parse_diagnostics(plan, frames_by_url) -> pd.DataFrame:
+    """One summary row per fetched page: status plus entries parsed per event."""
+    rows = []
+    for item in plan:
+        frame = frames_by_url.get(item["url"])
+        counts = frame["Event"].value_counts() if frame is not None else pd.Series(dtype=int)
+        row = {
+            "Division": item["Division"],
+            "Region": item["Region"],
+            "Status": "OK" if frame is not None else "Failed",
+            "Entries": int(counts.sum()),
+        }
+        for ev in EVENT_NAMES:
+            row[ev] = int(counts.get(ev, 0))
+        row["URL"] = item["url"]
+        rows.append(row)
+    return pd.DataFrame(rows)
 
-    DISTRICT_MAP[district] = abbrs
 
+def render_standings_diff(plan):
+    """What moved on each page of the plan between its two newest snapshots."""
+    conn = standings_store.connect()
+    try:
+        diffs = [
+            standings_store.latest_diff(conn, item["Code"], item["Region"]).assign(
+                Division=item["Division"], Region=item["Region"]
+            )
+            for item in plan
+        ]
+    finally:
+        conn.close()
+
+    diff_df = pd.concat(diffs, ignore_index=True) if diffs else pd.DataFrame()
+    with st.expander(f"What moved since the previous pull — {len(diff_df)} changes"):
+        if diff_df.empty:
+            st.write("No changes recorded yet.")
+        else:
+            lead = ["Division", "Region"]
+            st.dataframe(
+                diff_df[lead + [c for c in diff_df.columns if c not in lead]],
+                use_container_width=True, hide_index=True
+            )
 
-#Defining Matrix for District and World Qualifiers here
-MATRIX_SHEET_URL_V2 = (
-    "https://docs.google.com/spreadsheets/d/"
-    "1I6rKmEwf5YR7knC404v2hKH0ZzPu1Xr_mtQeLRW_ymA/"
-    "export?format=csv&gid=0"
-)
 
-@st.cache_data(ttl=3600)
-def load_matrix_groups_v2():
-    try:
-        df = pd.read_csv(MATRIX_SHEET_URL_V2)
+def render_parse_diagnostics(plan, frames_by_url):
+    diag_df = parse_diagnostics(plan, frames_by_url)
+    failed = int((diag_df["Status"] == "Failed").sum()) if not diag_df.empty else 0
+    with st.expander(f"Parse diagnostics — {len(diag_df)} pages, {failed} failed"):
+        st.dataframe(diag_df, use_container_width=True, hide_index=True)
+
+
+MANIFEST_COLUMNS = ["Division", "Region", "Status", "Reason", "HTTP Status", "URL"]
+
+
+def fetch_manifest(pages, results) -> pd.DataFrame:
+    """
+    Partial-result manifest: one row per requested page (Division, Region,
+    url dicts) saying whether results has it, and if not, why (the fetch
+    governor's last reason for the URL, after retries).
+    """
+    missing = [item["url"] for item in pages if results.get(item["url"]) is None]
+    records = {r["url"]: r for r in get_fetch_governor().skipped(missing)}
+    rows = []
+    for item in pages:
+        record = records.get(item["url"], {}) if results.get(item["url"]) is None else None
+        rows.append({
+            "Division": item["Division"],
+            "Region": item["Region"],
+            "Status": "OK" if record is None else "Missing",
+            "Reason": None if record is None else record.get("reason", "not crawled yet" if READ_ONLY else "not fetched"),
+            "HTTP Status": None if record is None else record.get("status"),
+            "URL": item["url"],
+        })
+    return pd.DataFrame(rows, columns=MANIFEST_COLUMNS)
+
+
+def render_fetch_manifest(manifest: pd.DataFrame, key: str):
+    """Warn when results are partial and list the missing pages; silent when complete."""
+    missing = manifest[manifest["Status"] == "Missing"]
+    if missing.empty:
+        return
+    if READ_ONLY:
+        st.warning(
+            f"Partial results: {len(missing)} of {len(manifest)} standings pages have not been "
+            "crawled yet and are left out below."
+        )
+    else:
+        st.warning(
+            f"Partial results: {len(missing)} of {len(manifest)} standings pages could not be "
+            f"loaded after {FETCH_ATTEMPTS} attempts and are left out below. Run again to retry them."
+        )
+    with st.expander(f"Missing pages — {len(missing)}"):
+        st.dataframe(missing, use_container_width=True, hide_index=True)
+        st.download_button(
+            "Download fetch manifest (CSV)",
+            data=manifest.to_csv(index=False),
+            file_name="fetch_manifest.csv",
+            mime="text/csv",
+            key=f"{key}_manifest_download",
+            on_click="ignore"
+        )
 
-        groups = {}
 
-        for _, row in df.iterrows():
-            div_name = str(row["Age Group"]).strip()
-            code = str(row["Code"]).strip()
+# --- COMPETITOR IDENTITY ---
+# Matching rules live in ata_pipeline; the registry keeps every resolved
+# name so an ID never changes for the life of the server process.
+@st.cache_resource
+def get_identity_registry():
+    # Resolved identity keys, shared across reruns, sessions and pages
+    return {"lock": threading.Lock(), "ids": {}, "blocks": {}, "names": {}}
+
+
+def resolve_identity_keys(pairs) -> dict:
+    """{(identity key, location key): competitor ID}, resolving keys not seen before."""
+    registry = get_identity_registry()
+    with registry["lock"]:
+        return resolve_identities(pairs, registry["ids"], registry["blocks"])
+
+
+def competitor_ids(names: pd.Series, locations: pd.Series = None) -> pd.Series:
+    """
+    Competitor ID per name (None for blanks). Identical names share an ID;
+    spelling and nickname variants only when their locations match.
+    """
+    known = get_identity_registry()["names"]
+    if locations is None:
+        locations = pd.Series("", index=names.index)
+    pairs = list(zip(names, locations.fillna("").astype(str)))
+    new_pairs = {
+        (name, location): (identity_key(name), normalize_name(location))
+        for name, location in set(pairs)
+        if pd.notna(name) and (name, location) not in known
+    }
+    if new_pairs:
+        resolved = resolve_identity_keys(pair for pair in new_pairs.values() if pair[0])
+        known.update({pair: resolved.get(key_pair) for pair, key_pair in new_pairs.items()})
+    return pd.Series([known.get(pair) for pair in pairs], index=names.index, dtype=object)
 
-            # Build URLs using the formats YOU confirmed
-            world_url = (
-                "https://atamartialarts.com/events/tournament-standings/"
-                f"worlds-standings/?code={code}"
-            )
 
-            state_url_template = (
-                "https://atamartialarts.com/events/tournament-standings/"
-                "state-standings/?country={}&state={}&code=" + code
-            )
+def competitor_id(name: str, location: str = ""):
+    return competitor_ids(pd.Series([name]), pd.Series([location])).iloc[0]
 
-            groups[div_name] = {
-                "code": code,
-                "world_url": world_url,
-                "state_url_template": state_url_template
-            }
 
-        return groups
+ROSTER_COLUMNS = ["State", "Name", "Location"] + EVENT_NAMES
 
-    except Exception:
-        return {}
 
-MATRIX_GROUPS = load_matrix_groups_v2()
+def roster_matrix(entries: pd.DataFrame) -> pd.DataFrame:
+    """
+    Competitor × event matrix from long (Event, Name, Location) rows:
+    one row per competitor identity and location, "X" in each event they
+    hold points in. Sorted by State, Name.
+    """
+    entries = entries[entries["Name"].astype(str).str.strip() != ""]
+    if entries.empty:
+        return pd.DataFrame(columns=ROSTER_COLUMNS)
 
-# New fetch function only for District and World Qualifiers
-
-def fetch_html_v2(url: str):
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/123.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://atamartialarts.com/",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-    }
-    try:
-        r = requests.get(url, headers=headers, timeout=15)
-        if r.status_code == 200 and len(r.text) > 5000:
-            return r.text
-    except:
-        return None
-    return None
+    keys = ["CompetitorId", "Location"]
+    entries = entries.assign(CompetitorId=competitor_ids(entries["Name"], entries["Location"]))
+    # Display the first spelling seen for each competitor
+    roster = entries.drop_duplicates(keys)[keys + ["Name"]]
 
-def get_all_state_champions_all_states():
-    all_results = []
+    marks = (
+        pd.crosstab([entries["CompetitorId"], entries["Location"]], entries["Event"])
+        .reindex(columns=EVENT_NAMES, fill_value=0)
+        .gt(0)
+        .replace({True: "X", False: ""})
+    )
+    roster = roster.join(marks, on=keys)
+    roster["State"] = roster["Location"].str.partition(",")[2].str.strip()
 
-    # Reverse lookup: abbrev → (country, state_name)
-    abbrev_to_country = {
-        abbrev: (country, state_name)
-        for state_name, (country, abbrev) in REGION_CODES.items()
-    }
+    return roster[ROSTER_COLUMNS].sort_values(["State", "Name"]).reset_index(drop=True)
 
-    PROVINCE_NAME_TO_ABBREV = {
-        "Alberta": "AB",
-        "British Columbia": "BC",
-        "Manitoba": "MB",
-        "New Brunswick": "NB",
-        "Newfoundland and Labrador": "NL",
-        "Nova Scotia": "NS",
-        "Ontario": "ON",
-        "Prince Edward Island": "PE",
-        "Quebec": "QC",
-        "Saskatchewan": "SK",
-    }
 
-    for state_full_name, (country, state_abbrev) in REGION_CODES.items():
-        for div_name, div_info in MATRIX_GROUPS.items():
-            code = div_info["code"]
+# --- RESULTS RENDERING ---
+RESULTS_PAGE_SIZES = [50, 100, 250, 500]
 
-            if country == "CA":
-                state_code_for_url = state_abbrev.lower()
-                region_param = state_full_name.replace(" ", "+")
-                url = (
-                    f"{div_info['state_url_template'].format(country, state_code_for_url, code)}"
-                    f"&region={region_param}"
-                )
-            else:
-                url = div_info["state_url_template"].format(country, state_abbrev, code)
+RESULTS_TABLE_STYLE = """
+<style>
+table, th, td {
+    text-align: left !important;
+}
+</style>
+"""
 
-            html = fetch_html_v2(url)
-            if not isinstance(html, str) or not html.strip():
-                continue
 
-            parsed = parse_multi_event_standings(html)
-            ranked = dedupe_and_rank(parsed)
+def result_hash(df: pd.DataFrame) -> str:
+    """Content hash identifying a result set (used to key cached renders/exports)."""
+    h = hashlib.sha1("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
 
-            temp_results = []
-            for event_name, entries in ranked.items():
-                for e in entries:
-                    loc = e["Location"].strip()
-                    loc_norm = loc.replace(", ", ",").replace(" ,", ",")
 
-                    if "," in loc_norm:
-                        town, region_part = loc_norm.split(",", 1)
-                    else:
-                        parts = loc_norm.split()
-                        if len(parts) > 1:
-                            town = " ".join(parts[:-1])
-                            region_part = parts[-1]
-                        else:
-                            town = loc_norm
-                            region_part = ""
-
-                    town = town.strip()
-                    region_part = region_part.strip()
-
-                    if region_part.title() in PROVINCE_NAME_TO_ABBREV:
-                        st_abbrev2 = PROVINCE_NAME_TO_ABBREV[region_part.title()]
-                    else:
-                        st_abbrev2 = region_part.replace(".", "").strip().upper()
-
-                    temp_results.append({
-                        "Name": e["Name"],
-                        "Town": town,
-                        "State": st_abbrev2,
-                        "Event": event_name,
-                        "Rank": e["Rank"],
-                        "Points": e["Points"],
-                        "Division": div_name,
-                        "Code": code,
-                        "StateQueried": state_full_name,
-                    })
-
-            if temp_results:
-                min_rank_by_event = {}
-                for r in temp_results:
-                    ev = r["Event"]
-                    rnk = r["Rank"]
-                    if ev not in min_rank_by_event or rnk < min_rank_by_event[ev]:
-                        min_rank_by_event[ev] = rnk
-
-                champs = [
-                    r for r in temp_results
-                    if r["Rank"] == min_rank_by_event.get(r["Event"], r["Rank"])
-                ]
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_results_page(result_id: str, page: int, page_size: int, _df: pd.DataFrame) -> str:
+    # _df is not hashed; result_id already identifies its contents
+    chunk = _df.iloc[page * page_size:(page + 1) * page_size]
+    return RESULTS_TABLE_STYLE + chunk.to_html(index=False, escape=False)
 
-                all_results.extend(champs)
 
-    return pd.DataFrame(all_results)
+def render_paginated_results(df: pd.DataFrame, result_id: str, key: str):
+    """HTML results table (Events keep their <br> breaks), one cached page at a time."""
+    page_size = st.selectbox(
+        "Rows per page:", RESULTS_PAGE_SIZES, index=1, key=f"{key}_page_size"
+    )
+    n_pages = max(1, -(-len(df) // page_size))
 
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(
+            f"Page (of {n_pages}):", min_value=1, max_value=n_pages, value=1, step=1,
+            key=f"{key}_page_{result_id}"
+        )
 
-# New parse for District and Worlds 
-def parse_multi_event_standings(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+    start = (page - 1) * page_size
+    st.caption(f"Showing rows {start + 1}–{min(start + page_size, len(df))} of {len(df)}")
+    with ata_metrics.timer("render", table=key):
+        st.markdown(
+            render_results_page(result_id, page - 1, page_size, df),
+            unsafe_allow_html=True
+        )
 
-    EVENT_MAP = {
-        "Forms": "Forms",
-        "Weapons": "Weapons",
-        "Combat Weapons": "Combat Weapons",
-        "Sparring": "Sparring",
-        "Creative Forms": "Creative Forms",
-        "Creative Weapons": "Creative Weapons",
-        "X-Treme Forms": "X-Treme Forms",
-        "X-Treme Weapons": "X-Treme Weapons",
-    }
 
-    results = {ev: [] for ev in EVENT_MAP.values()}
+# --- CRAWLER STATUS ---
+def render_crawl_status():
+    """In READ_ONLY mode, say how current the crawler's data is."""
+    if not READ_ONLY:
+        return
+    conn = standings_store.connect()
+    try:
+        crawl = standings_store.last_crawl(conn)
+    finally:
+        conn.close()
+    if crawl is None:
+        st.sidebar.warning("Read-only mode: the crawler has not finished a run yet.")
+        return
+    st.sidebar.caption(
+        "Read-only mode · last crawl finished "
+        + time.strftime("%Y-%m-%d %H:%M", time.localtime(crawl["finished_at"]))
+        + f" · {crawl['ok']} of {crawl['pages']} pages"
+        + (f" · {crawl['failed']} failed" if crawl["failed"] else "")
+    )
 
-    # Find all event headers
-    headers = soup.find_all("ul", class_="tournament-header")
 
-    for header in headers:
-        # Extract event name
-        span = header.find("span", class_="text-primary text-uppercase")
-        if not span:
-            continue
+# --- PERFORMANCE PANEL ---
+def render_metrics_panel():
+    """
+    Optional sidebar panel with the server-wide pipeline metrics recorded
+    by ata_metrics, as of the start of this run.
+    """
+    if not st.sidebar.toggle("Show performance panel", key="show_metrics_panel"):
+        return
 
-        event_name = span.get_text(strip=True)
+    snap = ata_metrics.snapshot()
+    fetch = snap["fetch"]
 
-        if event_name not in EVENT_MAP:
-            continue
+    with st.sidebar:
+        st.subheader("Performance")
+        st.caption(
+            "Since " + time.strftime("%Y-%m-%d %H:%M", time.localtime(snap["since"]))
+            + " · all sessions · up to the start of this run"
+        )
 
-        # Find the NEXT table after this header
-        table = header.find_next("table")
-        if not table:
-            continue
+        cols = st.columns(4)
+        cols[0].metric("Requests", fetch["requests"])
+        cols[1].metric("MB fetched", f"{fetch['bytes'] / 2**20:.1f}")
+        cols[2].metric("MB saved", f"{fetch['bytes_saved'] / 2**20:.1f}")
+        cols[3].metric("Errors", fetch["errors"])
+        st.caption(
+            f"Fetch latency p50 {fetch['p50_ms']:.0f} ms · p95 {fetch['p95_ms']:.0f} ms · "
+            f"p99 {fetch['p99_ms']:.0f} ms · {fetch['not_modified']} unchanged (304)"
+        )
 
-        tbody = table.find("tbody")
-        if not tbody:
-            continue
+        if snap["stages"]:
+            st.markdown("**Stages**")
+            st.dataframe(pd.DataFrame(snap["stages"]), use_container_width=True, hide_index=True)
+        if snap["caches"]:
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame(snap["caches"]), use_container_width=True, hide_index=True)
+        governor_rows = get_fetch_governor().status()
+        if governor_rows:
+            st.markdown("**Fetch governor**")
+            st.dataframe(pd.DataFrame(governor_rows), use_container_width=True, hide_index=True)
+            skipped = get_fetch_governor().skipped()
+            if skipped:
+                st.caption(f"{len(skipped)} URLs currently skipped")
+        if fetch["slowest_urls"]:
+            st.markdown("**Slowest URLs (p95)**")
+            st.dataframe(pd.DataFrame(fetch["slowest_urls"]), use_container_width=True, hide_index=True)
 
-        rows = []
+        st.download_button(
+            "Download metrics (JSON)",
+            data=json.dumps(snap, indent=2),
+            file_name="ata_metrics.json",
+            mime="application/json",
+            key="metrics_download",
+            on_click="ignore"
+        )
+        if st.button("Reset metrics", key="metrics_reset"):
+            ata_metrics.reset()
 
-        for tr in tbody.find_all("tr"):
-            cols = [td.get_text(strip=True) for td in tr.find_all("td")]
-            if len(cols) != 4:
-                continue
 
-            place_s, name, pts_s, loc = cols
+# --- EXPORTS ---
+# Label → (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def csv_chunks(df: pd.DataFrame):
+    """df as UTF-8 CSV bytes, EXPORT_CHUNK_ROWS rows at a time."""
+    for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+@st.cache_resource(max_entries=32, ttl=3600, show_spinner=False)
+def export_bytes(export_id: str, ext: str, _df: pd.DataFrame) -> bytes:
+    # cache_resource hands back the same (immutable) bytes instead of a copy per hit
+    if ext == "csv":
+        # Joined once into the cached bytes, with no growing buffer to copy out of
+        return b"".join(csv_chunks(_df))
+
+    buf = io.BytesIO()
+    if ext == "csv.gz":
+        with gzip.GzipFile(fileobj=buf, mode="wb") as gz:
+            for chunk in csv_chunks(_df):
+                gz.write(chunk)
+    elif ext == "parquet":
+        _df.to_parquet(buf, index=False)
+    elif ext == "xlsx":
+        _df.to_excel(buf, index=False)
+    return buf.getvalue()
+
+
+def qualifier_export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    export_df = df.copy()
+    export_df["Events"] = export_df["Events"].astype(str).str.replace("<br>", ", ")
+    return export_df
+
+
+def render_exports(exports, result_id: str, key: str):
+    """
+    Download buttons sharing one format picker. exports is a list of
+    (label, df, file_stem) or (label, df, file_stem, prepare) tuples.
+    Nothing is serialized until a button is clicked, and each
+    (result, export, format) is serialized only once.
+    """
+    fmt = st.selectbox("Export format:", list(EXPORT_FORMATS), key=f"{key}_format")
+    ext, mime = EXPORT_FORMATS[fmt]
+
+    for label, df, file_stem, *prepare in exports:
+        def build(df=df, file_stem=file_stem, prepare=prepare):
+            export_df = prepare[0](df) if prepare else df
+            return export_bytes(f"{result_id}:{file_stem}", ext, export_df)
 
-            try:
-                pts_val = int(pts_s)
-            except:
-                continue
-
-            rows.append({
-                "Rank": int(place_s),
-                "Name": name.strip(),
-                "Points": pts_val,
-                "Location": loc.strip()
-            })
-
-        if rows:
-            results[event_name] = rows
-
-    return results
-
-# Function to normalize the town name if it's more than one word
-def normalize_town(t: str) -> str:
-    if not isinstance(t, str):
-        return ""
-    return (
-        t.lower()
-         .replace(",", " ")
-         .replace(".", " ")
-         .replace("  ", " ")
-         .strip()
-    )
+        st.download_button(
+            f"Download {label} {fmt}",
+            data=build,
+            file_name=f"{file_stem}.{ext}",
+            mime=mime,
+            key=f"{key}_{file_stem}",
+            on_click="ignore"
+        )
 
-import pdfplumber
 
-@st.cache_data(ttl=3600)
-def load_team_sparring_pdf(url: str) -> pd.DataFrame:
+def get_all_state_champions_all_states():
+    """
+    Champions (best rank + ties per event) of every state/division page,
+    read from the materialized state_champions view. Only stale pages are
+    re-fetched; pages whose content is unchanged keep their champion rows.
+    In READ_ONLY mode nothing is fetched or read twice: pages the crawler
+    has not stored yet are reported missing. Returns (champions, manifest
+    of the stale pages).
+    """
+    plan = build_fetch_plan(MATRIX_GROUPS.keys(), REGION_CODES.keys())
+
+    conn = standings_store.connect()
     try:
-        r = requests.get(url, timeout=20)
-        r.raise_for_status()
-
-        text_lines = []
-        with pdfplumber.open(io.BytesIO(r.content)) as pdf:
-            for page in pdf.pages:
-                txt = page.extract_text()
-                if txt:
-                    for line in txt.split("\n"):
-                        text_lines.append(line.strip())
-
-        # Now parse lines that look like: Rank  Team  Points  Location
-        rows = []
-        for line in text_lines:
-            # crude pattern: number ... number ... state
-            parts = line.split()
-            if len(parts) < 4:
-                continue
-
-            # first token must be rank
-            if not parts[0].isdigit():
-                continue
-
-            rank = int(parts[0])
-
-            # last token is state abbreviation or full name
-            location = parts[-1]
-
-            # second-to-last token is points
-            if not parts[-2].isdigit():
-                continue
-
-            points = int(parts[-2])
-
-            # everything in the middle is team name
-            team = " ".join(parts[1:-2])
-
-            rows.append({
-                "Rank": rank,
-                "Team": team,
-                "Points": points,
-                "Location": location
-            })
-
-        return pd.DataFrame(rows)
-
-    except Exception as e:
-        st.error(f"Failed to load team sparring PDF: {e}")
-        return pd.DataFrame()
+        fresh = standings_store.fresh_pages(conn, WAREHOUSE_MAX_AGE)
+    finally:
+        conn.close()
+    stale = [item for item in plan if (item["Code"], item["Region"]) not in fresh]
+    if READ_ONLY:
+        manifest = fetch_manifest(stale, {})
+    else:
+        manifest = fetch_manifest(stale, execute_fetch_plan(stale))
 
+    conn = standings_store.connect()
+    try:
+        champions = standings_store.query_champions(
+            conn, [(item["Code"], item["Region"]) for item in plan]
+        )
+    finally:
+        conn.close()
+    return champions, manifest
 
-import requests
-from bs4 import BeautifulSoup
-import unicodedata
-import pandas as pd
-import streamlit as st
 
-# --- HELPERS ---
-@st.cache_data(ttl=3600)
-def fetch_html(url: str):
+def stored_team_rows(url: str) -> pd.DataFrame:
+    """Team rows the crawler last extracted from url (READ_ONLY mode)."""
+    conn = standings_store.connect()
     try:
-        r = requests.get(url, timeout=12)
-        if r.status_code == 200:
-            return r.text
-    except Exception:
-        return None
-    return None
+        df = standings_store.latest_team_rows(conn, url)
+    finally:
+        conn.close()
+    if df is None:
+        raise RuntimeError("not crawled yet")
+    return df
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_all_team_standings():
+    """
+    One team table across every TEAM_SPARRING_PDFS division, fetched and
+    extracted concurrently. Returns (teams_df, {division: error}).
+    Division is ordered Bantam → World; TeamKey is the normalized team name.
+    """
+    def load(item):
+        division, url = item
+        try:
+            return division, (stored_team_rows if READ_ONLY else fetch_team_pdf_rows)(url), None
+        except Exception as e:
+            return division, None, str(e)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(TEAM_SPARRING_PDFS)) as pool:
+        loaded = list(pool.map(load, TEAM_SPARRING_PDFS.items()))
+
+    failed = {division: error for division, _, error in loaded if error}
+    frames = [df.assign(Division=division) for division, df, _ in loaded if df is not None]
+    teams = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=pdf_extract.TEAM_COLUMNS + ["Division"]
+    )
+
+    teams["Division"] = pd.Categorical(teams["Division"], categories=list(TEAM_SPARRING_PDFS))
+    teams["Location"] = teams["Location"].astype("category")
+    teams["TeamKey"] = teams["Team"].map(standings_store.normalize_name)
+    teams = teams.sort_values(["Division", "Rank"], kind="stable").reset_index(drop=True)
+    return teams[["Division", "Rank", "Team", "Location", "Points", "TeamKey"]], failed
+
+
+def filter_team_standings(teams: pd.DataFrame, divisions=(), locations=(), team_text: str = ""):
+    mask = pd.Series(True, index=teams.index)
+    if divisions:
+        mask &= teams["Division"].isin(divisions)
+    if locations:
+        mask &= teams["Location"].isin(locations)
+    key = standings_store.normalize_name(team_text)
+    if key:
+        team_keys = pd.Series(teams["TeamKey"].unique())
+        mask &= teams["TeamKey"].isin(team_keys[team_keys.str.contains(key, regex=False)])
+    return teams[mask]
+
 
+# --- HELPERS ---
 @st.cache_data(ttl=3600)
 def fetch_sheet(sheet_url: str) -> pd.DataFrame:
     try:
@@ -433,88 +679,34 @@ def fetch_sheet(sheet_url: str) -> pd.DataFrame:
     except Exception:
         return pd.DataFrame()
 
-def parse_standings(html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    data = {ev: [] for ev in EVENT_NAMES}
-
-    # Province name → abbreviation
-    PROVINCE_NAME_TO_ABBREV = {
-        "Alberta": "AB",
-        "British Columbia": "BC",
-        "Manitoba": "MB",
-        "New Brunswick": "NB",
-        "Newfoundland and Labrador": "NL",
-        "Nova Scotia": "NS",
-        "Ontario": "ON",
-        "Prince Edward Island": "PE",
-        "Quebec": "QC",
-        "Saskatchewan": "SK",
-    }
-
-    headers = soup.find_all("ul", class_="tournament-header")
-    tables = soup.find_all("table")
-
-    for header, table in zip(headers, tables):
-        evt = header.find("span", class_="text-primary text-uppercase")
-        if not evt:
-            continue
-
-        ev_name = evt.get_text(strip=True)
-        if ev_name not in EVENT_NAMES:
-            continue
-
-        tbody = table.find("tbody")
-        if not tbody:
-            continue
-
-        for tr in tbody.find_all("tr"):
-            cols = [td.get_text(strip=True) for td in tr.find_all("td")]
-            if len(cols) != 4:
-                continue
-
-            rank_s, name, pts_s, loc = cols
-
-            try:
-                pts_val = int(pts_s)
-            except:
-                continue
-
-            if pts_val <= 0:
-                continue
-
-            # --- FIX: Proper location parsing for Canada ---
-            loc = loc.strip()
-            loc_norm = loc.replace(", ", ",").replace(" ,", ",")
-
-            if "," in loc_norm:
-                town, region_part = loc_norm.split(",", 1)
-            else:
-                parts = loc_norm.split()
-                if len(parts) > 1:
-                    town = " ".join(parts[:-1])
-                    region_part = parts[-1]
-                else:
-                    town = loc_norm
-                    region_part = ""
-
-            town = town.strip()
-            region_part = region_part.strip()
+def load_group_page(group_key: str, region: str, url: str):
+    """
+    parse_standings output for one GROUPS page. Served from the warehouse
+    when the page was crawled within STANDINGS_TTL (or at all, in READ_ONLY
+    mode), otherwise fetched and written back to the warehouse.
+    """
+    code = GROUPS[group_key]["code"]
+    tags = {"division": group_key, "state": region, "url": url}
 
-            # Convert province names → abbreviations
-            if region_part.title() in PROVINCE_NAME_TO_ABBREV:
-                state_abbrev = PROVINCE_NAME_TO_ABBREV[region_part.title()]
-            else:
-                state_abbrev = region_part.replace(".", "").strip().upper()
-
-            data[ev_name].append({
-                "Rank": int(rank_s),
-                "Name": name.strip(),
-                "Points": pts_val,
-                "Town": town,
-                "State": state_abbrev,
-                "Location": loc.strip()
-            })
+    conn = standings_store.connect()
+    try:
+        if (code, region) in standings_store.fresh_pages(
+            conn, WAREHOUSE_MAX_AGE, parser=standings_store.PARSER_STANDINGS
+        ):
+            ata_metrics.cache_hit("warehouse")
+            with ata_metrics.timer("warehouse_read", **tags):
+                return read_group_page(conn, code, region)
+        ata_metrics.cache_miss("warehouse")
+    finally:
+        conn.close()
+
+    if READ_ONLY:
+        return None
 
+    data, shared = get_single_flight().do(("group", url), fetch_group_page, group_key, region, url)
+    if shared and data:
+        # dedupe_and_rank sets Rank on the entry dicts; each caller gets its own
+        data = {ev: [dict(e) for e in entries] for ev, entries in data.items()}
     return data
 
 
@@ -543,14 +735,8 @@ def gather_data(group_key: str, region_choice: str, district_choice: str):
         elif region_choice == "International":
             regions_to_fetch = []
 
-    # WORLD DATA
-    world_html = fetch_html(group["world_url"])
-    if world_html:
-        world_data = parse_standings(world_html)
-        for ev, entries in world_data.items():
-            combined[ev].extend(entries)
-
-    # STATE / PROVINCE DATA
+    # WORLD DATA first, then STATE / PROVINCE DATA
+    pages = [("World", group["world_url"])]
     for region in regions_to_fetch:
 
         # --- FIX 1: Convert abbreviations (BC, ON, QC) → full province name ---
@@ -580,34 +766,22 @@ def gather_data(group_key: str, region_choice: str, district_choice: str):
             )
         else:
             # US states use normal URL
-            url = group["state_url_template"].format(country, state_code, group["code"])    
-        # DEBUG
-        #st.write("DEBUG URL:", url)
-        
-        html = fetch_html(url)
-        if html:
-            state_data = parse_standings(html)
-            for ev, entries in state_data.items():
+            url = group["state_url_template"].format(country, state_code, group["code"])
+        pages.append((region, url))
+
+    # Pages are fetched concurrently; results are combined in page order
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        page_data = list(pool.map(ata_trace.bind(lambda page: load_group_page(group_key, *page)), pages))
+
+    for data in page_data:
+        if data:
+            for ev, entries in data.items():
                 combined[ev].extend(entries)
-        #st.write("DEBUG: about to fetch", url)
-        #html = None
-        #try:
-         #   html = fetch_html(url)
-          #  st.write("DEBUG: fetch_html returned", "None" if html is None else f"len={len(html)}")
-        #except Exception as e:
-         #   st.write("DEBUG: fetch_html ERROR:", repr(e))
-
-        #if html:
-         #   try:
-          #      state_data = parse_standings(html)
-           #     total_rows = sum(len(v) for v in state_data.values())
-            #    st.write("DEBUG: parse_standings events:", list(state_data.keys()))
-             #   st.write("DEBUG: parse_standings total rows:", total_rows)
-                # 🔴 THIS is what was effectively removed before
-              #  for ev, entries in state_data.items():
-               #     combined[ev].extend(entries)
-            #except Exception as e:
-             #   st.write("DEBUG: parse_standings ERROR:", repr(e))
+
+    manifest = fetch_manifest(
+        [{"Division": group_key, "Region": region, "url": url} for region, url in pages],
+        {url: data for (_, url), data in zip(pages, page_data)}
+    )
 
     # INTERNATIONAL FILTER
     if region_choice == "International":
@@ -620,33 +794,106 @@ def gather_data(group_key: str, region_choice: str, district_choice: str):
         combined = intl
 
     has_any = any(len(lst) > 0 for lst in combined.values())
-    return combined, has_any
-
-def dedupe_and_rank(event_data: dict):
-    clean = {}
-    for ev, entries in event_data.items():
-        seen = set()
-        uniq = []
-        for e in entries:
-            key = (e["Name"].lower(), e["Location"], e["Points"])
-            if key not in seen:
-                seen.add(key)
-                uniq.append(e)
-        uniq.sort(key=lambda x: (-x["Points"], x["Name"]))
-        prev_points = None
-        prev_rank = None
-        current_pos = 1
-        for item in uniq:
-            if prev_points is None or item["Points"] != prev_points:
-                rank_to_assign = current_pos
-                item["Rank"] = rank_to_assign
-                prev_rank = rank_to_assign
-            else:
-                item["Rank"] = prev_rank
-            prev_points = item["Points"]
-            current_pos += 1
-        clean[ev] = uniq
-    return clean
+    return combined, has_any, manifest
+
+def roster_divisions():
+    return list(GROUPS) + [d for d in MATRIX_GROUPS if d not in GROUPS]
+
+
+def build_roster(division: str):
+    """Every-region roster matrix for a GROUPS or MATRIX_GROUPS division, plus its fetch manifest."""
+    if division in GROUPS:
+        combined, _, manifest = gather_data(division, "All", "")
+        entries = pd.DataFrame(
+            [(ev, e["Name"], e["Location"]) for ev, rows in combined.items() for e in rows],
+            columns=["Event", "Name", "Location"],
+        )
+    else:
+        plan = build_fetch_plan([division], REGION_CODES.keys(), include_world=True)
+        frames_by_url = execute_fetch_plan(plan)
+        manifest = fetch_manifest(plan, frames_by_url)
+        standings = plan_frame(plan, frames_by_url)
+        if standings.empty:
+            return roster_matrix(pd.DataFrame(columns=["Event", "Name", "Location"])), manifest
+        entries = standings.loc[standings["Points"] > 0, ["Event", "Name", "Location"]]
+    return roster_matrix(entries), manifest
+
+
+def roster_fresh(entry, now: float) -> bool:
+    built_at, _, _, partial = entry
+    return now - built_at < (ROSTER_PARTIAL_TTL if partial else STANDINGS_TTL)
+
+
+def roster_for_division(division: str):
+    """
+    Cached (roster matrix, fetch manifest); rebuilt once per data refresh
+    (or STANDINGS_TTL). Partial rosters, with the manifest of their missing
+    pages, are only kept for ROSTER_PARTIAL_TTL.
+    """
+    cache = get_roster_cache()
+    with cache["lock"]:
+        hit = cache["entries"].get(division)
+        generation = cache["generation"]
+    if hit and roster_fresh(hit, time.time()):
+        ata_metrics.cache_hit("roster")
+        return hit[1], hit[2]
+    ata_metrics.cache_miss("roster")
+
+    with ata_metrics.timer("roster_build", division=division):
+        roster, manifest = build_roster(division)
+    partial = not (manifest["Status"] == "OK").all()
+    with cache["lock"]:
+        # A refresh while this was building: the pages it read are stale
+        if cache["generation"] == generation:
+            cache["entries"][division] = (time.time(), roster, manifest, partial)
+    return roster, manifest
+
+
+def fresh_roster_count() -> int:
+    """Divisions with a fresh, complete roster cached."""
+    cache = get_roster_cache()
+    now = time.time()
+    with cache["lock"]:
+        return sum(
+            roster_fresh(entry, now) and not entry[3] for entry in cache["entries"].values()
+        )
+
+
+def precompute_rosters(generation: int):
+    cache = get_roster_cache()
+    for division in roster_divisions():
+        with cache["lock"]:
+            if cache["generation"] != generation:
+                return  # refreshed; the next page view starts a new pass
+        try:
+            roster_for_division(division)
+        except Exception as e:
+            print(f"Roster precompute failed for {division}: {e}")
+    with cache["lock"]:
+        if cache["generation"] == generation:
+            cache["precomputed"] = (generation, time.time())
+
+
+def start_roster_precompute():
+    """
+    Warm every division's roster in a background thread, once per refresh
+    (or STANDINGS_TTL), unless a pass is already running. Divisions still
+    partial after a pass are rebuilt on demand, not by another pass.
+    """
+    cache = get_roster_cache()
+    with cache["lock"]:
+        generation = cache["generation"]
+        done = cache["precomputed"]
+        if done and done[0] == generation and time.time() - done[1] < STANDINGS_TTL:
+            return
+        running = cache["precompute"]
+        if running and running.is_alive():
+            return
+        thread = threading.Thread(
+            target=precompute_rosters, args=(generation,), name="roster-precompute", daemon=True
+        )
+        cache["precompute"] = thread
+    thread.start()
 
 
 @st.cache_data(ttl=3600)
@@ -679,21 +926,116 @@ TITLE_TABS = {
 all_titles = load_all_title_tabs(SHEET_ID, TITLE_TABS)
 tab_names = list(all_titles.keys()) 
 
+# Placement columns of the title sheets where competitor names appear, in result order
+TITLE_PLACEMENT_COLUMNS = [
+    "World Champion",
+    "Second",
+    "Third",
+    "District Champion",
+    "State Champion",
+]
+
+TITLE_MATCH_MODES = ["Contains", "Exact", "Starts with", "Fuzzy"]
+
+
+def split_title_sheet_name(sheet_name: str):
+    """'23-24 GA State Title …' -> ('2023–2024', 'GA State Title …')."""
+    parts = sheet_name.split(" ", 1)
+
+    if len(parts) == 2:
+        year_raw, title_raw = parts
+    else:
+        year_raw = sheet_name
+        title_raw = ""
+
+    # Convert "23-24" → "2023–2024"
+    if "-" in year_raw and len(year_raw) == 5:
+        start, end = year_raw.split("-")
+        year = f"20{start}–20{end}"
+    else:
+        year = year_raw
+
+    return year, title_raw
+
+
+@st.cache_data(ttl=3600)
+def load_title_index(sheet_id: str, tabs: dict):
+    """
+    Long-format index of every title tab: one row per (sheet row, placement)
+    with Year, Title, Event, Result, Name and a normalized NameKey.
+    Built once per load of the tabs; sorted by NameKey for prefix lookups.
+    """
+    frames = []
+    for tab_order, (sheet_name, title_df) in enumerate(load_all_title_tabs(sheet_id, tabs).items()):
+        existing_cols = [c for c in TITLE_PLACEMENT_COLUMNS if c in title_df.columns]
+        if not existing_cols:
+            continue
+
+        year, title = split_title_sheet_name(sheet_name)
+        events = title_df["Event"] if "Event" in title_df.columns else pd.Series("", index=title_df.index)
+
+        long = (
+            title_df[existing_cols]
+            .assign(Event=events.fillna("").astype(str), RowOrder=range(len(title_df)))
+            .melt(id_vars=["Event", "RowOrder"], value_vars=existing_cols,
+                  var_name="Result", value_name="Name")
+            .dropna(subset=["Name"])
+        )
+        long["Name"] = long["Name"].astype(str).str.strip()
+        long = long[long["Name"] != ""]
+        long["Year"] = year
+        long["Title"] = title
+        long["TabOrder"] = tab_order
+        long["ResultOrder"] = long["Result"].map(TITLE_PLACEMENT_COLUMNS.index)
+        frames.append(long)
+
+    columns = ["Year", "Title", "Event", "Result", "Name", "NameKey", "TabOrder", "RowOrder", "ResultOrder"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+
+    index = pd.concat(frames, ignore_index=True)
+    unique_names = index["Name"].unique()
+    index["NameKey"] = index["Name"].map(
+        dict(zip(unique_names, map(standings_store.normalize_name, unique_names)))
+    )
+    return index[columns].sort_values("NameKey", kind="stable").reset_index(drop=True)
+
+
+def search_title_index(index: pd.DataFrame, query: str, mode: str = "Contains") -> pd.DataFrame:
+    """Year/Title/Event/Result rows for a competitor, one per sheet row (best placement)."""
+    key = standings_store.normalize_name(query)
+    if not key or index.empty:
+        return index.iloc[0:0][["Year", "Title", "Event", "Result"]]
+
+    names = index["NameKey"]
+    if mode == "Exact":
+        lo, hi = names.searchsorted(key, "left"), names.searchsorted(key, "right")
+        hits = index.iloc[lo:hi]
+    elif mode == "Starts with":
+        lo, hi = names.searchsorted(key, "left"), names.searchsorted(key + "\uffff", "left")
+        hits = index.iloc[lo:hi]
+    elif mode == "Fuzzy":
+        close = difflib.get_close_matches(key, names.unique(), n=10, cutoff=0.75)
+        hits = index[names.isin(close)]
+    else:
+        unique_keys = pd.Series(names.unique())
+        hits = index[names.isin(unique_keys[unique_keys.str.contains(key, regex=False)])]
+
+    return (
+        hits.sort_values(["TabOrder", "RowOrder", "ResultOrder"])
+        .drop_duplicates(["TabOrder", "RowOrder"])
+        [["Year", "Title", "Event", "Result"]]
+        .reset_index(drop=True)
+    )
+
+
+title_index = load_title_index(SHEET_ID, TITLE_TABS)
+
 
 # --- PAGE SELECTION ---
-page_choice = st.selectbox(
-    "Select a page:",
-    [
-        "ATA Standings Dashboard",
-        "1st Degree Black Belt Women 50-59",
-        "National & District Rings",
-        "Historical Titles",
-        "State Champions, District & World Qualifiers (All Divisions)",
- #       "Nationwide State Champions (All Divisions)",
- #       "Team Sparring"
-#        "Competitor Search"
-    ]
-)
+page_choice = st.selectbox("Select a page:", PAGES, key="page_choice")
+render_crawl_status()
+render_metrics_panel()
 
 # --- PAGE 1: Standings Dashboard ---
 if page_choice == "ATA Standings Dashboard":
@@ -701,6 +1043,7 @@ if page_choice == "ATA Standings Dashboard":
 
     if st.button("🔄 Refresh All Data"):
         st.cache_data.clear()
+        clear_standings_cache()
         st.session_state.last_refresh = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
         st.success("Data refreshed successfully!")
     st.caption(f"Last refreshed: {st.session_state.last_refresh}")
@@ -721,17 +1064,22 @@ if page_choice == "ATA Standings Dashboard":
     sheet_df = pd.DataFrame()
     if GROUPS[group_choice]["sheet_url"]:
         sheet_df = fetch_sheet(GROUPS[group_choice]["sheet_url"])
+        if "Name" in sheet_df.columns:
+            sheet_df = sheet_df.assign(CompetitorId=competitor_ids(sheet_df["Name"], sheet_df.get("Location")))
 
     go = st.button("Go")
 
     if go:
         with st.spinner("Loading standings..."):
-            raw_data, has_results = gather_data(group_choice, region_choice, district_choice)
-            data = dedupe_and_rank(raw_data)
+            raw_data, has_results, manifest = gather_data(group_choice, region_choice, district_choice)
+            with ata_metrics.timer("rank", division=group_choice, state=region_choice or district_choice):
+                data = dedupe_and_rank(raw_data)
+        render_fetch_manifest(manifest, key="standings_dashboard")
 
         if not has_results:
             st.warning(f"No standings data found for {region_choice or district_choice}.")
         else:
+            render_start = time.perf_counter()
             for ev in EVENT_NAMES:
                 if event_choice and ev != event_choice:
                     continue
@@ -791,7 +1139,7 @@ if page_choice == "ATA Standings Dashboard":
                         with st.expander(row["Name"]):
                             if not sheet_df.empty and ev in sheet_df.columns:
                                 comp_data = sheet_df[
-                                    (sheet_df['Name'].str.lower().str.strip() == row['Name'].lower().strip()) &
+                                    (sheet_df['CompetitorId'] == competitor_id(row['Name'], row['Location'])) &
                                     (sheet_df[ev] > 0)
                                 ][["Date", "Tournament", ev, "Type"]].rename(columns={ev: "Points"})
                                 if not comp_data.empty:
@@ -812,7 +1160,7 @@ if page_choice == "ATA Standings Dashboard":
                         with cols[1].expander(row["Name"]):
                             if not sheet_df.empty and ev in sheet_df.columns:
                                 comp_data = sheet_df[
-                                    (sheet_df['Name'].str.lower().str.strip() == row['Name'].lower().strip()) &
+                                    (sheet_df['CompetitorId'] == competitor_id(row['Name'], row['Location'])) &
                                     (sheet_df[ev] > 0)
                                 ][["Date", "Tournament", ev, "Type"]].rename(columns={ev: "Points"})
                                 if not comp_data.empty:
@@ -823,6 +1171,7 @@ if page_choice == "ATA Standings Dashboard":
                                 st.write("No tournament data available.")
                         cols[2].write(row["Location"])
                         cols[3].write(row["Points"])
+            ata_metrics.record_stage("render", time.perf_counter() - render_start, table="standings_dashboard", division=group_choice)
 
 # --- PAGE 2: 50-59 Women ---
 elif page_choice == "1st Degree Black Belt Women 50-59":
@@ -830,6 +1179,7 @@ elif page_choice == "1st Degree Black Belt Women 50-59":
 
     if st.button("🔄 Refresh All Data"):
         st.cache_data.clear()
+        clear_standings_cache()
         st.session_state.last_refresh = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
         st.success("Data refreshed successfully!")
     st.caption(f"Last refreshed: {st.session_state.last_refresh}")
@@ -837,41 +1187,20 @@ elif page_choice == "1st Degree Black Belt Women 50-59":
     is_mobile = st.radio("Are you on a mobile device?", ["No", "Yes"]) == "Yes"
 
     group_key = "1st Degree Black Belt Women 50-59"
-    combined, _ = gather_data(group_key, "All", "")
-
-    rows = {}
-    for ev, entries in combined.items():
-        for e in entries:
-            name = e["Name"]
-            location = e["Location"]
-            if (name, location) not in rows:
-                rows[(name, location)] = {ev2: "" for ev2 in EVENT_NAMES}
-            rows[(name, location)][ev] = "X"
-
-    df = pd.DataFrame([{"Name": k[0], "Location": k[1], **v} for k, v in rows.items()])
-
-    if "Location" in df.columns:
-        loc_split = df["Location"].str.split(",", n=1, expand=True)
-        if loc_split.shape[1] == 2:
-            df["Town"] = loc_split[0].str.strip()
-            df["State"] = loc_split[1].str.strip()
-        else:
-            df["Town"] = df["Location"]
-            df["State"] = ""
-
-    cols = ["State", "Name", "Location"] + EVENT_NAMES
-    df = df[cols]
-    df = df.sort_values(by=["State", "Name"])
+    with st.spinner("Loading roster…"):
+        df, manifest = roster_for_division(group_key)
+    render_fetch_manifest(manifest, key="women_50_59")
 
     if is_mobile:
         st.dataframe(df[["State", "Name"] + EVENT_NAMES].reset_index(drop=True), use_container_width=True, hide_index=True)
     else:
         st.dataframe(df.reset_index(drop=True), use_container_width=True, hide_index=True)
 
-    counts_df = pd.DataFrame({
-        "Event": EVENT_NAMES,
-        "Competitors with Points": [df[ev].eq("X").sum() for ev in EVENT_NAMES]
-    })
+    counts_df = (
+        df[EVENT_NAMES].eq("X").sum()
+        .rename_axis("Event")
+        .reset_index(name="Competitors with Points")
+    )
 
     st.subheader("Competitor Counts by Event")
     st.dataframe(counts_df.reset_index(drop=True), use_container_width=True, hide_index=True)
@@ -951,18 +1280,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -1030,18 +1359,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -1165,18 +1494,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -1245,18 +1574,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -1383,18 +1712,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("Last Name")
                         fn_col = col_map.get("First Name")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -1465,18 +1794,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("Last Name")
                         fn_col = col_map.get("First Name")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -1600,18 +1929,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -1681,18 +2010,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -1816,18 +2145,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -1896,18 +2225,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -1972,18 +2301,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -2058,18 +2387,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             # Columns to display (hide ONE STEPS)
@@ -2138,18 +2467,18 @@ elif page_choice == "National & District Rings":
                 if lic_query:
                     members_filtered = members_df[members_df['LicenseNumber'].astype(str) == lic_query]
                     if not members_filtered.empty:
-                        members_filtered['FullName'] = (
+                        member_keys = identity_keys(
                             members_filtered['MemberFirstName'].str.strip() + " " +
                             members_filtered['MemberLastName'].str.strip()
-                        ).str.lower()
+                        )
                         ln_col = col_map.get("LAST NAME")
                         fn_col = col_map.get("FIRST NAME")
                         if ln_col and fn_col:
-                            rings_fullname = (
+                            rings_keys = identity_keys(
                                 rings_df[fn_col].astype(str).str.strip() + " " +
                                 rings_df[ln_col].astype(str).str.strip()
-                            ).str.lower()
-                            mask = rings_fullname.isin(members_filtered['FullName'])
+                            )
+                            mask = rings_keys.isin(member_keys.dropna())
                             results = rings_df.loc[mask].copy()
 
             st.subheader(f"Search Results ({len(results)})")
@@ -2389,84 +2718,12 @@ elif page_choice == "Historical Titles":
         st.subheader("Search Competitor Across All Titles")
 
         search_name = st.text_input("Enter competitor name")
+        match_mode = st.radio("Match", TITLE_MATCH_MODES, horizontal=True)
 
         if search_name:
-            results = []
-
-            # All possible placement columns where names may appear
-            placement_cols = [
-                "World Champion",
-                "Second",
-                "Third",
-                "District Champion",
-                "State Champion"
-            ]
-
-            for sheet_name, title_df in all_titles.items():
-
-                # Only search columns that exist in this sheet
-                existing_cols = [c for c in placement_cols if c in title_df.columns]
-                if not existing_cols:
-                    continue
-
-                # Build mask: competitor appears in ANY placement column (row-wise)
-                mask = False
-                for col in existing_cols:
-                    mask = mask | title_df[col].astype(str).str.contains(
-                        search_name, case=False, na=False
-                    )
-
-                matches = title_df[mask].copy()
-                if matches.empty:
-                    continue
-
-                # --- Extract Year + Title from sheet name ---
-                parts = sheet_name.split(" ", 1)
-
-                if len(parts) == 2:
-                    year_raw, title_raw = parts
-                else:
-                    year_raw = sheet_name
-                    title_raw = ""
-
-                # Convert "23-24" → "2023–2024"
-                if "-" in year_raw and len(year_raw) == 5:
-                    start, end = year_raw.split("-")
-                    year = f"20{start}–20{end}"
-                else:
-                    year = year_raw
-
-                matches["Year"] = year
-                matches["Title"] = title_raw
-
-                # --- Per-row Result: which column has this competitor in THIS row? ---
-                def get_result(row):
-                    for col in existing_cols:
-                        val = str(row[col])
-                        if search_name.lower() in val.lower():
-                            return col
-                    return ""
-
-                matches["Result"] = matches.apply(get_result, axis=1)
-
-                # Drop any rows where we somehow didn't find a result
-                matches = matches[matches["Result"] != ""]
-
-                if matches.empty:
-                    continue
-
-                # Event column (if present)
-                if "Event" not in matches.columns:
-                    matches["Event"] = ""
-
-                # Keep only the useful columns
-                matches = matches[["Year", "Title", "Event", "Result"]]
-
-                results.append(matches)
-
-            if results:
-                combined = pd.concat(results, ignore_index=True)
+            combined = search_title_index(title_index, search_name, match_mode)
 
+            if not combined.empty:
                 st.success(f"Found {len(combined)} results for '{search_name}'")
                 st.dataframe(combined, use_container_width=True, hide_index=True)
             else:
@@ -2490,6 +2747,15 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
         key="report_type_all_divisions"
     )
 
+    show_diagnostics = st.toggle(
+        "Show parse diagnostics",
+        key="show_diagnostics_all_divisions"
+    )
+    show_changes = st.toggle(
+        "Show what moved since the previous pull",
+        key="show_changes_all_divisions"
+    )
+
     # --- MODE 1 & 2: STATE-BASED ---
     if report_type in [
         "District / World Qualifiers (Top 10)",
@@ -2520,48 +2786,44 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
 
     # --- MODE 3: DISTRICT-WIDE ---
     else:
-        district_choice = st.selectbox(
-            "Select District:",
+        district_choices = st.multiselect(
+            "Select District(s):",
             sorted(DISTRICT_MAP.keys()),
             key="district_choice_all_divisions"
         )
 
         division_choice = st.selectbox(
             "Select Division:",
-            sorted(MATRIX_GROUPS.keys()),
+            sorted(MATRIX_GROUPS.keys()) + [ALL_DIVISIONS],
             key="division_choice_all_divisions"
         )
 
+        # Every page goes through the same per-host rate limit, so All
+        # Divisions takes about as long as each division run back to back
+        if division_choice == ALL_DIVISIONS and district_choices and not READ_ONLY:
+            district_states = {
+                abbrev for district in district_choices
+                for abbrev in DISTRICT_MAP.get(district, []) if abbrev in ABBREV_TO_REGION
+            }
+            page_count = len(MATRIX_GROUPS) * len(district_states)
+            st.caption(
+                f"All Divisions pulls {page_count} standings pages. Pages not already stored are "
+                f"fetched at up to {FETCH_RATE:g} per second (about {math.ceil(page_count / FETCH_RATE)}s "
+                "when none are); run crawler.py to keep them stored."
+            )
+
         town_text = ""  # no town filter in this mode
         qualifier_type = "District-wide"
         go = st.button("Go", key="go_button_all_divisions")
 
+        if go and not district_choices:
+            st.warning("Select at least one district.")
+            go = False
+
     # --- WHEN GO IS CLICKED ---
     if go:
         st.info("Pulling ATA standings for all Matrix divisions…")
 
-        results = []
-
-        # Reverse lookup: abbrev → (country, state_name)
-        abbrev_to_country = {
-            abbrev: (country, state_name)
-            for state_name, (country, abbrev) in REGION_CODES.items()
-        }
-
-        # --- PROVINCE NAME → ABBREV MAP ---
-        PROVINCE_NAME_TO_ABBREV = {
-            "Alberta": "AB",
-            "British Columbia": "BC",
-            "Manitoba": "MB",
-            "New Brunswick": "NB",
-            "Newfoundland and Labrador": "NL",
-            "Nova Scotia": "NS",
-            "Ontario": "ON",
-            "Prince Edward Island": "PE",
-            "Quebec": "QC",
-            "Saskatchewan": "SK",
-        }
-
         # ============================================================
         #   MODE 1 & 2 — STATE-BASED
         # ============================================================
@@ -2569,234 +2831,76 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
             "District / World Qualifiers (Top 10)",
             "State Champions (Rank 1 + ties)",
         ]:
-            country, state_abbrev = REGION_CODES[state_choice]
-            state_full_name = state_choice
+            # --- FETCH PLAN: every division for one state (or World) ---
+            if report_type == "District / World Qualifiers (Top 10)" and "World" in qualifier_type:
+                plan = build_fetch_plan(MATRIX_GROUPS.keys(), include_world=True)
+            else:
+                plan = build_fetch_plan(MATRIX_GROUPS.keys(), [state_choice])
 
-            for div_name, div_info in MATRIX_GROUPS.items():
-                code = div_info["code"]
+            with st.spinner(f"Fetching {len(plan)} standings pages…"):
+                frames_by_url = execute_fetch_plan(plan)
 
-                # URL selection
-                if report_type == "District / World Qualifiers (Top 10)" and "World" in qualifier_type:
-                    url = div_info["world_url"]
-                else:
-                    if country == "CA":
-                        state_code_for_url = state_abbrev.lower()
-                        region_param = state_full_name.replace(" ", "+")
-                        url = (
-                            f"{div_info['state_url_template'].format(country, state_code_for_url, code)}"
-                            f"&region={region_param}"
-                        )
-                    else:
-                        url = div_info["state_url_template"].format(country, state_abbrev, code)
+            render_fetch_manifest(fetch_manifest(plan, frames_by_url), key="state_report")
 
-                html = fetch_html_v2(url)
-                if not isinstance(html, str) or not html.strip():
-                    st.warning(f"Skipping {div_name} — invalid HTML returned for URL: {url}")
-                    continue
+            if show_diagnostics:
+                render_parse_diagnostics(plan, frames_by_url)
+            if show_changes:
+                render_standings_diff(plan)
 
-                parsed = parse_multi_event_standings(html)
-                ranked = dedupe_and_rank(parsed)
-
-                # ============================================================
-                # DEBUG — SHOW EXACT EVENT RANKS FOR THIS DIVISION (STATE MODE)
-                # ============================================================
-                #st.write(f"### DEBUG — Parsed Event Ranks for Division: {div_name}")
-                #for debug_event, debug_entries in ranked.items():
-                #    st.write(f"**Event:** {debug_event}")
-                #    for de in debug_entries:
-                #        st.write(
-                #            f"- {de['Name']} | Rank: {de['Rank']} | Points: {de['Points']} | Location: {de['Location']}"
-                #        )
-                #st.write("---")
-                # ============================================================
-
-                for event_name, entries in ranked.items():
-                    for e in entries:
-
-                        # --- LOCATION PARSING ---
-                        loc = e["Location"].strip()
-                        loc_norm = loc.replace(", ", ",").replace(" ,", ",")
-
-                        if "," in loc_norm:
-                            town, region_part = loc_norm.split(",", 1)
-                        else:
-                            parts = loc_norm.split()
-                            if len(parts) > 1:
-                                town = " ".join(parts[:-1])
-                                region_part = parts[-1]
-                            else:
-                                town = loc_norm
-                                region_part = ""
-
-                        town = town.strip()
-                        region_part = region_part.strip()
-
-                        # Province name → abbreviation
-                        if region_part.title() in PROVINCE_NAME_TO_ABBREV:
-                            st_abbrev2 = PROVINCE_NAME_TO_ABBREV[region_part.title()]
-                        else:
-                            st_abbrev2 = region_part.replace(".", "").strip().upper()
-
-                        # --- DISTRICT FILTER (ONLY for District-wide) ---
-                        if qualifier_type == "District-wide":
-                            allowed_states = DISTRICT_MAP.get(state_choice, [])
-                            if st_abbrev2 not in allowed_states:
-                                continue
-
-                        # Town filter
-                        if town_text:
-                            if normalize_town(town_text) not in normalize_town(town):
-                                continue
-
-                        # Top 10 filter
-                        if report_type == "District / World Qualifiers (Top 10)":
-                            if e["Rank"] > 10:
-                                continue
-
-                        results.append({
-                            "Name": e["Name"],
-                            "Town": town,
-                            "State": st_abbrev2,
-                            "Event": event_name,
-                            "Rank": e["Rank"],
-                            "Points": e["Points"],
-                            "Division": div_name,
-                            "Code": code,
-                        })
-
-            # --- STATE CHAMPIONS FILTER (FIXED) ---
-           # --- STATE CHAMPIONS FILTER (CORRECT LOGIC) ---
-
-
-            # --- STATE CHAMPIONS FILTER (FINAL CORRECT LOGIC) ---
-            if report_type == "State Champions (Rank 1 + ties)" and results:
-
-            # STEP 1 — Determine true champions BEFORE any town filtering
-                champions = [
-                    r for r in results
-                    if r["Rank"] == 1
+            results = plan_frame(plan, frames_by_url)
+
+            # Town filter
+            if town_text:
+                results = results[
+                    results["Town"].map(normalize_town).str.contains(normalize_town(town_text), regex=False)
                 ]
 
-                # STEP 2 — Now apply town filter (optional)
-                if town_text:
-                    champions = [
-                        r for r in champions
-                        if normalize_town(town_text) in normalize_town(r["Town"])
-                    ]
-
-                # STEP 3 — Replace results with ONLY true champions
-                results = champions
-
-    
-            # --- STATE CHAMPIONS FILTER ---
-            #if report_type == "State Champions (Rank 1 + ties)" and results:
-             #   min_rank_by_event = {}
-              ##     ev = r["Event"]
-                #    rnk = r["Rank"]
-                 #   if ev not in min_rank_by_event or rnk < min_rank_by_event[ev]:
-                  #      min_rank_by_event[ev] = rnk
-
-               # results = [
-                #    r for r in results
-                 #   if r["Rank"] == min_rank_by_event.get(r["Event"], r["Rank"])
-                #]
+            # Top 10 filter
+            if report_type == "District / World Qualifiers (Top 10)":
+                results = results[results["Rank"] <= 10]
+
+            # --- STATE CHAMPIONS FILTER (Rank 1 + ties, then town filter above) ---
+            if report_type == "State Champions (Rank 1 + ties)":
+                results = results[results["Rank"] == 1]
 
         # ============================================================
         #   MODE 3 — DISTRICT-WIDE (NEW FORMAT)
         # ============================================================
         else:
-            div_name = division_choice
-            div_info = MATRIX_GROUPS[div_name]
-            code = div_info["code"]
+            all_divisions = division_choice == ALL_DIVISIONS
+            div_names = list(MATRIX_GROUPS.keys()) if all_divisions else [division_choice]
 
-            for state_abbrev in DISTRICT_MAP.get(district_choice, []):
-                if state_abbrev not in abbrev_to_country:
-                    continue
-                country, state_full_name = abbrev_to_country[state_abbrev]
-
-                # --- CANADA URL FIX ---
-                if country == "CA":
-                    state_code_for_url = state_abbrev.lower()
-                    region_param = state_full_name.replace(" ", "+")
-                    url = (
-                        f"{div_info['state_url_template'].format(country, state_code_for_url, code)}"
-                        f"&region={region_param}"
-                    )
-                else:
-                    url = div_info["state_url_template"].format(country, state_abbrev, code)
+            allowed_states = set()
+            district_regions = []
+            for district_choice in district_choices:
+                for state_abbrev in DISTRICT_MAP.get(district_choice, []):
+                    if state_abbrev not in ABBREV_TO_REGION:
+                        continue
+                    allowed_states.add(state_abbrev)
+                    district_regions.append(ABBREV_TO_REGION[state_abbrev][1])
 
-                html = fetch_html_v2(url)
-                if not isinstance(html, str) or not html.strip():
-                    st.warning(f"Skipping {div_name} / {state_abbrev} — invalid HTML returned for URL: {url}")
-                    continue
+            # --- FETCH PLAN: division(s) × every state in the district(s) ---
+            plan = build_fetch_plan(div_names, district_regions)
 
-                parsed = parse_multi_event_standings(html)
-                ranked = dedupe_and_rank(parsed)
-
-                # ============================================================
-                # DEBUG — SHOW EXACT EVENT RANKS FOR THIS DIVISION (DISTRICT MODE)
-                # ============================================================
-                st.write(f"### DEBUG — Parsed Event Ranks for Division: {div_name} / {state_abbrev}")
-                for debug_event, debug_entries in ranked.items():
-                    st.write(f"**Event:** {debug_event}")
-                    for de in debug_entries:
-                        st.write(
-                            f"- {de['Name']} | Rank: {de['Rank']} | Points: {de['Points']} | Location: {de['Location']}"
-                        )
-                st.write("---")
-                # ============================================================
-
-                for event_name, entries in ranked.items():
-                    for e in entries:
-
-                        # --- LOCATION PARSING ---
-                        loc = e["Location"].strip()
-                        loc_norm = loc.replace(", ", ",").replace(" ,", ",")
-
-                        if "," in loc_norm:
-                            town, region_part = loc_norm.split(",", 1)
-                        else:
-                            parts = loc_norm.split()
-                            if len(parts) > 1:
-                                town = " ".join(parts[:-1])
-                                region_part = parts[-1]
-                            else:
-                                town = loc_norm
-                                region_part = ""
-
-                        town = town.strip()
-                        region_part = region_part.strip()
-
-                        # Province name → abbreviation
-                        if region_part.title() in PROVINCE_NAME_TO_ABBREV:
-                            st_abbrev2 = PROVINCE_NAME_TO_ABBREV[region_part.title()]
-                        else:
-                            st_abbrev2 = region_part.replace(".", "").strip().upper()
-
-                        # --- DISTRICT FILTER ---
-                        allowed_states = DISTRICT_MAP.get(district_choice, [])
-                        if st_abbrev2 not in allowed_states:
-                            continue
-
-                        # Top 10 filter
-                        if e["Rank"] > 10:
-                            continue
-
-                        results.append({
-                            "Name": e["Name"],
-                            "Town": town,
-                            "State": st_abbrev2,
-                            "Event": event_name,
-                            "Rank": e["Rank"],
-                            "Points": e["Points"],
-                            "Division": div_name,
-                            "Code": code,
-                        })
+            with st.spinner(f"Fetching {len(plan)} standings pages…"):
+                frames_by_url = execute_fetch_plan(plan)
+
+            render_fetch_manifest(fetch_manifest(plan, frames_by_url), key="district_report")
+
+            if show_diagnostics:
+                render_parse_diagnostics(plan, frames_by_url)
+            if show_changes:
+                render_standings_diff(plan)
+
+            results = plan_frame(plan, frames_by_url)
+
+            # District filter + Top 10 filter
+            results = results[results["State"].isin(allowed_states) & (results["Rank"] <= 10)]
 
         # ============================================================
         #   NO RESULTS
         # ============================================================
-        if not results:
+        if results.empty:
             st.session_state.pop("qual_df_all_divisions", None)
             st.warning("No qualifiers found for the selected filters.")
             st.stop()
@@ -2806,105 +2910,9 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
         # ============================================================
         if "District-wide" in report_type:
 
-            # --- COLLATE ---
-            collated = {}
-            for row in results:
-                key = (row["Name"], row["Town"], row["State"])
-                if key not in collated:
-                    collated[key] = {
-                        "Name": row["Name"],
-                        "Events": set(),
-                    }
-                collated[key]["Events"].add(row["Event"])
-
-            # --- NAME SPLITTER ---
-            def split_name(full):
-                parts = full.replace(",", "").split()
-                if len(parts) == 1:
-                    return "", parts[0]
-                return " ".join(parts[:-1]), parts[-1]
-
-            # --- EVENT CODE MAPS ---
-            TRADITIONAL_CODES = {
-                "Forms": "FORMS",
-                "Sparring": "SPARRING",
-                "Weapons": "WEAPONS",
-                "Combat Weapons": "COMBAT",
-            }
-
-            CREATIVE_CODES = {
-                "Creative Forms": "ATA-CF",
-                "Creative Weapons": "ATA-CW",
-                "X-Treme Forms": "ATA-XF",
-                "X-Treme Weapons": "ATA-XW",
-            }
-
-            trad_rows = []
-            cx_rows = []
-
-            for data in collated.values():
-                first, last = split_name(data["Name"])
-                evs = data["Events"]
-
-                trad_rows.append({
-                    "Last Name": last,
-                    "First Name": first,
-                    "Traditional Forms": TRADITIONAL_CODES["Forms"] if "Forms" in evs else "None",
-                    "Traditional Sparring": TRADITIONAL_CODES["Sparring"] if "Sparring" in evs else "None",
-                    "Traditional Weapons": TRADITIONAL_CODES["Weapons"] if "Weapons" in evs else "None",
-                    "Combat Weapons": TRADITIONAL_CODES["Combat Weapons"] if "Combat Weapons" in evs else "None",
-                })
-
-                cx_rows.append({
-                    "Last Name": last,
-                    "First Name": first,
-                    "Creative Forms": CREATIVE_CODES["Creative Forms"] if "Creative Forms" in evs else "None",
-                    "Creative Weapons": CREATIVE_CODES["Creative Weapons"] if "Creative Weapons" in evs else "None",
-                    "Xtreme Forms": CREATIVE_CODES["X-Treme Forms"] if "X-Treme Forms" in evs else "None",
-                    "Xtreme Weapons": CREATIVE_CODES["X-Treme Weapons"] if "X-Treme Weapons" in evs else "None",
-                })
-                # REMOVE competitors with no Traditional events
-                trad_rows = [
-                    row for row in trad_rows
-                    if not all(row[col] == "None" for col in [
-                        "Traditional Forms",
-                        "Traditional Sparring",
-                        "Traditional Weapons",
-                        "Combat Weapons"
-                    ])
-                ]                
-
-                # REMOVE competitors with no Creative/Xtreme events
-                cx_rows = [
-                    row for row in cx_rows
-                    if not all(row[col] == "None" for col in [
-                        "Creative Forms",
-                        "Creative Weapons",
-                        "Xtreme Forms",
-                        "Xtreme Weapons"
-                    ])
-                ]        
-
-            # Build DataFrames
-            trad_df = pd.DataFrame(trad_rows)
-            cx_df = pd.DataFrame(cx_rows)
-
-            # FIX: Remove empty or incomplete rows caused by states with no data
-            required_cols = ["First Name", "Last Name"]
-            # Only drop rows if the required columns exist
-            for col in required_cols:
-                if col not in trad_df.columns:
-                    trad_df[col] = None
-                if col not in cx_df.columns:
-                    cx_df[col] = None
-            trad_df = trad_df.dropna(subset=required_cols, how="any")
-            cx_df = cx_df.dropna(subset=required_cols, how="any")
-
-            # Now it's safe to sort
-            trad_df = trad_df.sort_values(["Last Name", "First Name"])    
-            cx_df = cx_df.sort_values(["Last Name", "First Name"])
-            #trad_df = pd.DataFrame(trad_rows).sort_values(["Last Name", "First Name"])
-            #cx_df = pd.DataFrame(cx_rows).sort_values(["Last Name", "First Name"])
+            # --- COLLATE (one row per competitor, events pivoted to columns) ---
+            with ata_metrics.timer("collate", report=report_type):
+                trad_df, cx_df = collate_district_tables(results, by_division=all_divisions)
 
             # --- GREY OUT "None" ---
             def grey_none(val):
@@ -2928,67 +2936,25 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
                 st.dataframe(cx_df, use_container_width=True, hide_index=True)
 
             # --- EXPORTS ---
-            trad_csv = trad_df.to_csv(index=False).encode("utf-8")
-            cx_csv = cx_df.to_csv(index=False).encode("utf-8")
-
-            st.download_button("Download Traditional CSV", trad_csv, "district_traditional.csv")
-            st.download_button("Download Creative/Xtreme CSV", cx_csv, "district_creative_xtreme.csv")
+            render_exports(
+                [
+                    ("Traditional", trad_df, "district_traditional"),
+                    ("Creative/Xtreme", cx_df, "district_creative_xtreme"),
+                ],
+                # collate_district_tables(by_division=...) changes the tables, not results
+                f"{result_hash(results)}:{'by_division' if all_divisions else 'merged'}",
+                key="district_exports"
+            )
 
             st.stop()
 
         # ============================================================
-        #   STATE / WORLD OUTPUT (UNCHANGED)
+        #   STATE / WORLD OUTPUT
         # ============================================================
-        # --- COLLATE RESULTS ---
-        collated = {}
-
-        for row in results:
-            key = (row["Name"], row["Town"], row["State"], row["Division"])
-            if key not in collated:
-                collated[key] = {
-                    "Name": row["Name"],
-                    "Town": row["Town"],
-                    "State": row["State"],
-                    "Division": row["Division"],
-                    "Events": [],
-                }
-            collated[key]["Events"].append(row["Event"])
-
-        EVENT_ORDER = {
-            "Forms": 1,
-            "Weapons": 2,
-            "Combat Weapons": 3,
-            "Sparring": 4,
-            "Creative Forms": 5,
-            "Creative Weapons": 6,
-            "X-Treme Forms": 7,
-            "X-Treme Weapons": 8,
-        }
-
-        final_rows = []
-        total_events = 0
-
-        for data in collated.values():
-            events = sorted(data["Events"], key=lambda e: EVENT_ORDER.get(e, 999))
-            data["Events"] = "<br>".join(events)
-            total_events += len(events)
-            final_rows.append(data)
-
-        df = pd.DataFrame(final_rows)
-
-        # --- SORT BY LAST NAME ---
-        def extract_last_name(full):
-            parts = full.replace(",", "").split()
-            if len(parts) == 0:
-                return ""
-            suffixes = {"jr", "jr.", "sr", "sr.", "ii", "iii", "iv", "v"}
-            if parts[-1].lower() in suffixes and len(parts) > 1:
-                return parts[-2]
-            return parts[-1]
-
-        df["LastName"] = df["Name"].apply(extract_last_name)
-        df = df.sort_values(["LastName", "Name"]).reset_index(drop=True)
-        df = df.drop(columns=["LastName"])
+        # --- COLLATE RESULTS (sorted by last name) ---
+        with ata_metrics.timer("collate", report=report_type):
+            df = collate_qualifiers(results)
+        total_events = len(results)
 
         # --- SUMMARY ROW ---
         if report_type in [
@@ -3012,6 +2978,7 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
             df = df.drop(columns=["Town", "State"])
 
         st.session_state["qual_df_all_divisions"] = df
+        st.session_state["qual_result_id"] = result_hash(df)
         st.session_state["qual_report_type"] = report_type
 
     # ============================================================
@@ -3030,28 +2997,13 @@ if page_choice == "State Champions, District & World Qualifiers (All Divisions)"
         else:
             st.success(f"Found {len(df_no_summary)} qualifiers.")
 
-        display_df = df.copy()
-
-        html_table = """
-<style>
-table, th, td {
-    text-align: left !important;
-}
-</style>
-""" + display_df.to_html(index=False, escape=False)
-
-        st.markdown(html_table, unsafe_allow_html=True)
-
-        export_df = df.copy()
-        export_df["Events"] = export_df["Events"].astype(str).str.replace("<br>", ", ")
+        result_id = st.session_state.get("qual_result_id") or result_hash(df)
+        render_paginated_results(df, result_id, key="qual_results_all_divisions")
 
-        csv = export_df.to_csv(index=False).encode("utf-8")
-
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name="qualifiers.csv",
-            mime="text/csv"
+        render_exports(
+            [("Qualifiers", df, "qualifiers", qualifier_export_frame)],
+            result_id,
+            key="qual_exports"
         )
 
   
@@ -3066,27 +3018,42 @@ elif page_choice == "Team Sparring":
         ["Team Sparring"],  # placeholder for future "Team Combat"
     )
 
-    div_choice = st.selectbox(
-        "Select Division:",
-        list(TEAM_SPARRING_PDFS.keys())
-    )
+    team_view = st.radio("Show:", ["All Divisions", "Single Division"], horizontal=True)
+
+    if team_view == "Single Division":
+        div_choice = st.selectbox(
+            "Select Division:",
+            list(TEAM_SPARRING_PDFS.keys())
+        )
 
     if st.button("Load Team Standings"):
-        url = TEAM_SPARRING_PDFS[div_choice]
-        with st.spinner("Loading team standings from PDF..."):
-            df = load_team_sparring_pdf(url)
+        st.session_state.team_standings_loaded = True
+
+    if st.session_state.get("team_standings_loaded"):
+        with st.spinner("Loading team standings from all division PDFs..."):
+            teams, failed = load_all_team_standings()
+
+        for division, error in failed.items():
+            st.warning(f"Skipping {division} — failed to load team sparring PDF: {error}")
+
+        divisions = [div_choice] if team_view == "Single Division" else []
+        location_choices = st.multiselect(
+            "Filter by location (optional):",
+            sorted(teams["Location"].dropna().unique())
+        )
+        team_text = st.text_input("Filter by team name (optional):")
+
+        df = filter_team_standings(teams, divisions, location_choices, team_text)
 
         if df.empty:
-            st.warning("No usable table data found in this PDF (or parsing needs tuning).")
+            st.warning("No usable table data found for these filters (or parsing needs tuning).")
         else:
-            display_cols = []
-            for c in ["Rank", "Team", "Location", "Points"]:
-                if c in df.columns:
-                    display_cols.append(c)
-            if not display_cols:
-                display_cols = df.columns
-
-            st.subheader(f"{event_choice} — {div_choice}")
+            display_cols = ["Rank", "Team", "Location", "Points"]
+            if team_view == "All Divisions":
+                display_cols = ["Division"] + display_cols
+
+            title_div = div_choice if team_view == "Single Division" else "All Divisions"
+            st.subheader(f"{event_choice} — {title_div} ({len(df)} teams)")
             st.dataframe(
                 df[display_cols].reset_index(drop=True),
                 use_container_width=True,
@@ -3099,14 +3066,95 @@ if page_choice == "Nationwide State Champions (All Divisions)":
     if st.button("Pull All State Champions (Nationwide)"):
         st.info("Pulling ATA standings for ALL states and ALL divisions… this may take a moment.")
 
-        df = get_all_state_champions_all_states()
+        df, manifest = get_all_state_champions_all_states()
+        fetched_at = df.pop("Fetched At")
+
+        render_fetch_manifest(manifest, key="nationwide")
 
         st.success(f"Found {len(df)} state champions nationwide.")
+        if not fetched_at.empty:
+            st.caption(
+                "Oldest page pulled "
+                + time.strftime("%Y-%m-%d %H:%M", time.localtime(fetched_at.min()))
+            )
         st.dataframe(df, use_container_width=True)
 
-        st.download_button(
-            "Download Nationwide State Champions CSV",
-            df.to_csv(index=False).encode("utf-8"),
-            "ATA_All_State_Champions.csv",
-            "text/csv"
+        render_exports(
+            [("Nationwide State Champions", df, "ATA_All_State_Champions")],
+            result_hash(df),
+            key="nationwide_exports"
+        )
+
+# --- PAGE: Competitor Search (standings warehouse) ---
+if page_choice == "Competitor Search":
+    st.title("Competitor Search — All Divisions")
+    st.caption(
+        "Searches every standings page already crawled into the local warehouse "
+        "(by any report or dashboard page)."
+    )
+
+    search_name = st.text_input("Enter competitor name", key="warehouse_search_name")
+
+    if search_name.strip():
+        conn = standings_store.connect()
+        try:
+            found = standings_store.search_competitor(conn, search_name)
+        finally:
+            conn.close()
+
+        if found.empty:
+            st.warning("No crawled standings match that name.")
+        else:
+            found["Fetched At"] = pd.to_datetime(found["Fetched At"], unit="s").dt.strftime("%Y-%m-%d %H:%M")
+            st.success(f"Found {len(found)} standings for '{search_name}'")
+            st.dataframe(
+                found[["Name", "Division", "Region", "Event", "Rank", "Points", "Location", "Fetched At"]],
+                use_container_width=True,
+                hide_index=True
+            )
+
+# --- PAGE: Division Rosters (any GROUPS / MATRIX_GROUPS division) ---
+if page_choice == "Division Rosters (All Divisions)":
+    st.title("Division Rosters — All Divisions")
+
+    if st.button("🔄 Refresh All Data"):
+        st.cache_data.clear()
+        clear_standings_cache()
+        st.session_state.last_refresh = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.success("Data refreshed successfully!")
+    st.caption(f"Last refreshed: {st.session_state.last_refresh}")
+
+    start_roster_precompute()
+    divisions = roster_divisions()
+    ready = fresh_roster_count()
+    precompute = get_roster_cache()["precompute"]
+    if ready < len(divisions) and precompute and precompute.is_alive():
+        st.caption(f"Rosters ready: {ready} of {len(divisions)} divisions (the rest load in the background).")
+    else:
+        st.caption(f"Rosters ready: {ready} of {len(divisions)} divisions (the rest load when selected).")
+
+    roster_division = st.selectbox("Select division:", divisions, key="roster_division")
+
+    with st.spinner("Loading roster…"):
+        roster_df, manifest = roster_for_division(roster_division)
+    render_fetch_manifest(manifest, key="division_roster")
+
+    if roster_df.empty:
+        st.warning("No competitors with points found for this division.")
+    else:
+        st.dataframe(roster_df, use_container_width=True, hide_index=True)
+
+        st.subheader("Competitor Counts by Event")
+        st.dataframe(
+            roster_df[EVENT_NAMES].eq("X").sum()
+            .rename_axis("Event")
+            .reset_index(name="Competitors with Points"),
+            use_container_width=True,
+            hide_index=True
+        )
+
+        render_exports(
+            [("Roster", roster_df, "ATA_Roster_" + re.sub(r"\W+", "_", roster_division).strip("_"))],
+            result_hash(roster_df),
+            key="roster_exports"
         )
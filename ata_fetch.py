@@ -0,0 +1,311 @@
+"""
+Standings fetch layer shared by the dashboard and the crawler worker.
+
+Requests go through one FetchGovernor per process (rate limit, adaptive
+concurrency, circuit breaker) with retries, compressed transfers and
+conditional GETs against the validators kept in the warehouse. Fetched
+pages are parsed, ranked and written to the standings store; unchanged
+(304) pages are read back from it instead. No Streamlit dependency.
+"""
+import hashlib
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+import ata_metrics
+import fetch_governor
+import pdf_extract
+import standings_store
+from ata_config import ATA_BASE_URL, GROUPS, STANDINGS_TTL
+from ata_pipeline import (
+    EVENT_NAMES,
+    dedupe_and_rank,
+    parse_multi_event_standings,
+    parse_standings,
+    standings_frame,
+)
+
+# --- FETCH GOVERNOR ---
+# Every standings/PDF request goes through one governor per process, so
+# parallel sweeps from all sessions (or crawler threads) together stay
+# within these limits.
+FETCH_RATE = float(os.environ.get("ATA_FETCH_RATE", "8"))  # requests/second per host
+FETCH_BURST = 16
+FETCH_MAX_CONCURRENCY = 16
+FETCH_SLOW_SECONDS = 5.0
+# Consecutive 429/5xx/connection failures that open a host's circuit
+FETCH_FAILURE_THRESHOLD = 5
+# Attempts per URL per call; 429/5xx/connection failures are retried with jittered backoff
+FETCH_ATTEMPTS = 4
+# Threads per process fetching plan pages concurrently
+FETCH_WORKERS = 16
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_fetch_governor() -> fetch_governor.FetchGovernor:
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = fetch_governor.FetchGovernor(
+                rate=FETCH_RATE, burst=FETCH_BURST, max_concurrency=FETCH_MAX_CONCURRENCY,
+                slow_seconds=FETCH_SLOW_SECONDS, failure_threshold=FETCH_FAILURE_THRESHOLD
+            )
+        return _governor
+
+
+def governed_get(url: str, min_length: int = 0, **kwargs):
+    """
+    requests.get through the fetch governor, retrying 429/5xx/connection
+    failures up to FETCH_ATTEMPTS times. Returns the response when it is a
+    200 with at least min_length characters or a 304, otherwise None (the
+    governor records why the URL was skipped).
+    """
+    governor = get_fetch_governor()
+    for attempt in range(1, FETCH_ATTEMPTS + 1):
+        if attempt > 1:
+            ata_metrics.count("fetch.retries")
+            time.sleep(fetch_governor.backoff_delay(attempt - 1))
+        if governor.acquire(url):
+            return None
+
+        after = f" after {attempt} attempts" if attempt > 1 else ""
+        start = time.perf_counter()
+        try:
+            r = requests.get(url, **kwargs)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            ata_metrics.record_fetch(url, seconds)
+            governor.release(url, seconds, reason=type(e).__name__ + after)
+            continue
+
+        seconds = time.perf_counter() - start
+        # Bytes on the wire (compressed) vs. the decoded body
+        wire_bytes = r.raw.tell() or len(r.content)
+        ata_metrics.record_fetch(url, seconds, wire_bytes, r.status_code)
+        if len(r.content) > wire_bytes:
+            ata_metrics.count("fetch.bytes_saved", len(r.content) - wire_bytes)
+        reason = None
+        if r.status_code == 304:
+            ata_metrics.count("fetch.not_modified")
+        elif r.status_code != 200:
+            reason = f"HTTP {r.status_code}{after}"
+        elif len(r.text) < min_length:
+            reason = f"short response ({len(r.text)} chars)"
+        governor.release(url, seconds, r.status_code, reason, r.headers.get("Retry-After"))
+        if not fetch_governor.overloaded(r.status_code):
+            return None if reason else r
+    return None
+
+
+def fetch_html_v2(url: str, validators=None, min_length: int = 5001):
+    """
+    Standings page response, or None when it could not be fetched. Bodies
+    are compressed (gzip, or brotli when installed). With the stored copy's
+    validators (etag, last_modified, page_bytes) the request is conditional
+    and an unchanged page comes back as a bodiless 304.
+    """
+    headers = {
+        "User-Agent": (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/123.0.0.0 Safari/537.36"
+        ),
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Referer": f"{ATA_BASE_URL}/",
+    }
+    if validators:
+        etag, last_modified, _ = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return governed_get(url, min_length=min_length, headers=headers, timeout=15)
+
+
+def not_modified(r, validators) -> bool:
+    """True for a 304; counts the stored page's size as transfer saved."""
+    if r.status_code != 304:
+        return False
+    ata_metrics.count("fetch.bytes_saved", validators[2] if validators else 0)
+    return True
+
+
+def response_validators(r) -> dict:
+    """replace_page keyword arguments recording a 200 response's validators and size."""
+    return {
+        "etag": r.headers.get("ETag", ""),
+        "last_modified": r.headers.get("Last-Modified", ""),
+        "page_bytes": len(r.content),
+    }
+
+
+# --- STANDINGS PAGES ---
+def rank_with_snapshots(parsed: dict, division_code: str, region: str) -> dict:
+    """
+    dedupe_and_rank, but only for events whose parsed rows changed since the
+    last stored snapshot; unchanged events reuse the stored ranking. Changed
+    events are recorded as new snapshots.
+    """
+    hashes = {ev: standings_store.event_hash(entries) for ev, entries in parsed.items()}
+
+    conn = standings_store.connect()
+    try:
+        latest = standings_store.latest_snapshots(conn, division_code, region)
+        changed = [
+            ev for ev, h in hashes.items()
+            if (ev in latest or parsed[ev]) and latest.get(ev, (None, None))[1] != h
+        ]
+        unchanged = [ev for ev in hashes if ev in latest and ev not in changed]
+
+        ranked = dedupe_and_rank({ev: parsed[ev] for ev in changed})
+        for ev in unchanged:
+            ranked[ev] = standings_store.load_snapshot_rows(conn, latest[ev][0])
+
+        with conn:
+            for ev in changed:
+                standings_store.record_snapshot(conn, division_code, region, ev, hashes[ev], ranked[ev])
+            standings_store.mark_checked(conn, [latest[ev][0] for ev in unchanged])
+    finally:
+        conn.close()
+
+    return ranked
+
+
+def fetch_and_store_frame(item: dict):
+    """Fetch → parse → rank → store one plan page; its standings frame, or None when it cannot be fetched."""
+    tags = {"division": item["Division"], "state": item["Region"], "url": item["url"]}
+    conn = standings_store.connect()
+    try:
+        validators = standings_store.page_validators(conn, item["Code"], item["Region"], item["url"])
+    finally:
+        conn.close()
+
+    with ata_metrics.timer("fetch", **tags):
+        r = fetch_html_v2(item["url"], validators)
+    if r is None:
+        return None
+    if not_modified(r, validators):
+        # Unchanged since the stored copy: no parse, rank or store
+        conn = standings_store.connect()
+        try:
+            standings_store.touch_page(conn, item["Code"], item["Region"])
+        finally:
+            conn.close()
+        return load_warehouse_frames([item]).get(item["url"])
+
+    html = r.text
+    if not html.strip():
+        return None
+    with ata_metrics.timer("parse", **tags):
+        parsed = parse_multi_event_standings(html)
+    with ata_metrics.timer("rank", **tags):
+        frame = standings_frame(rank_with_snapshots(parsed, item["Code"], item["Region"]))
+
+    with ata_metrics.timer("store", **tags):
+        conn = standings_store.connect()
+        try:
+            standings_store.replace_page(
+                conn, item["Code"], item["Region"], item["Division"], item["url"],
+                frame.to_dict("records"), **response_validators(r)
+            )
+        finally:
+            conn.close()
+    return frame
+
+
+def load_warehouse_frames(plan, max_age: float = STANDINGS_TTL) -> dict:
+    """{url: standings frame} for plan pages the warehouse has copies of no older than max_age."""
+    conn = standings_store.connect()
+    try:
+        fresh = standings_store.fresh_pages(conn, max_age)
+        wanted = {(item["Code"], item["Region"]): item["url"] for item in plan}
+        hits = [page for page in wanted if page in fresh]
+        rows = standings_store.query_pages(conn, hits)
+    finally:
+        conn.close()
+
+    frames = {}
+    for (code, region), page_rows in rows.groupby(["Code", "Region"]):
+        ranked = {
+            ev: ev_rows[["Rank", "Name", "Points", "Location"]].to_dict("records")
+            for ev, ev_rows in page_rows.groupby("Event")
+        }
+        frames[wanted[(code, region)]] = standings_frame(ranked)
+    # Fresh pages with no rows at all are still valid (empty) results
+    for page in hits:
+        frames.setdefault(wanted[page], standings_frame({}))
+    return frames
+
+
+# --- GROUPS PAGES ---
+def read_group_page(conn, code: str, region: str) -> dict:
+    """Stored rows of one GROUPS page with points, in parse_standings' shape."""
+    rows = standings_store.query_pages(conn, [(code, region)], parser=standings_store.PARSER_STANDINGS)
+    rows = rows[rows["Points"] > 0]
+    data = {ev: [] for ev in EVENT_NAMES}
+    for ev, entries in rows.groupby("Event"):
+        if ev in data:
+            data[ev] = entries[["Rank", "Name", "Points", "Town", "State", "Location"]].to_dict("records")
+    return data
+
+
+def fetch_group_page(group_key: str, region: str, url: str):
+    """Fetch, parse and store one GROUPS page; None when it cannot be fetched."""
+    code = GROUPS[group_key]["code"]
+    tags = {"division": group_key, "state": region, "url": url}
+    conn = standings_store.connect()
+    try:
+        validators = standings_store.page_validators(conn, code, region, url, standings_store.PARSER_STANDINGS)
+        with ata_metrics.timer("fetch", **tags):
+            r = fetch_html_v2(url, validators, min_length=1)
+        if r is None:
+            return None
+        if not_modified(r, validators):
+            # Unchanged since the stored copy: read it back instead of re-parsing
+            standings_store.touch_page(conn, code, region, parser=standings_store.PARSER_STANDINGS)
+            return read_group_page(conn, code, region)
+
+        with ata_metrics.timer("parse", **tags):
+            data = parse_standings(r.text)
+        with ata_metrics.timer("store", **tags):
+            standings_store.replace_page(
+                conn, code, region, group_key, url,
+                [{"Event": ev, **e} for ev, entries in data.items() for e in entries],
+                parser=standings_store.PARSER_STANDINGS, **response_validators(r)
+            )
+        return data
+    finally:
+        conn.close()
+
+
+# --- TEAM PDFS ---
+def fetch_team_pdf_rows(url: str) -> pd.DataFrame:
+    """
+    Team rows of one standings PDF. Rows are stored by the PDF's content
+    hash, so an unchanged file is downloaded but never re-extracted.
+    """
+    r = governed_get(url, timeout=20)
+    if r is None:
+        skipped = get_fetch_governor().skipped([url])
+        raise RuntimeError(skipped[0]["reason"] if skipped else "download failed")
+    content_hash = hashlib.sha1(r.content).hexdigest()
+
+    conn = standings_store.connect()
+    try:
+        df = standings_store.load_team_rows(conn, content_hash)
+        if df is None:
+            rows = pdf_extract.parse_team_lines(pdf_extract.extract_lines(r.content))
+            standings_store.save_team_rows(conn, content_hash, url, rows)
+            df = pd.DataFrame(rows, columns=pdf_extract.TEAM_COLUMNS)
+    finally:
+        conn.close()
+
+    return df
@@ -0,0 +1,175 @@
+"""
+Offline fixture corpus for the standings pipeline.
+
+Two sources, same shapes:
+- a recorded corpus under FIXTURE_DIR (html/, csv/, pdf/ plus index.json
+  mapping each recorded URL to its file), captured with `bench.py record`;
+- deterministic synthetic content in the markup the ATA site serves, for
+  when nothing has been recorded or a larger scale is needed.
+"""
+import hashlib
+import json
+import os
+import random
+
+from ata_pipeline import EVENT_NAMES, REGION_CODES
+
+FIXTURE_DIR = os.environ.get("ATA_FIXTURE_DIR", "fixtures")
+
+FIRST_NAMES = [
+    "Mary", "Linda", "Susan", "Karen", "Donna", "Lisa", "Sandra", "Carol",
+    "Nancy", "Sharon", "Laura", "Julie", "Teresa", "Denise", "Brenda", "Angela",
+    "James", "Robert", "John", "Michael", "David", "William", "Richard", "Thomas",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+    "Rodriguez", "Martinez", "Hernandez", "Lopez", "Wilson", "Anderson", "Taylor",
+    "Moore", "Jackson", "Martin", "Lee", "Thompson", "White", "Harris", "Clark",
+    "O'Neil", "Van Buren", "St. James",
+]
+SUFFIXES = ["", "", "", "", "", "", "", "Jr.", "Sr.", "III"]
+TOWNS = ["Springfield", "Fairview", "Madison", "Georgetown", "Salem", "Clinton", "Bay City", "Lake Forest"]
+
+
+# --- RECORDED CORPUS ---
+def fixture_path(url: str, kind: str) -> str:
+    ext = {"html": "html", "csv": "csv", "pdf": "pdf"}[kind]
+    return os.path.join(FIXTURE_DIR, kind, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + "." + ext)
+
+
+def load_index() -> dict:
+    """{url: {"kind": ..., "path": ...}} of the recorded corpus (empty if none)."""
+    try:
+        with open(os.path.join(FIXTURE_DIR, "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_fixture(url: str, kind: str, content: bytes):
+    path = fixture_path(url, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+    index = load_index()
+    index[url] = {"kind": kind, "path": os.path.relpath(path, FIXTURE_DIR)}
+    with open(os.path.join(FIXTURE_DIR, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+
+
+def recorded(kind: str) -> list:
+    """Contents (bytes) of every recorded fixture of one kind, in URL order."""
+    index = load_index()
+    out = []
+    for url in sorted(index):
+        if index[url]["kind"] == kind:
+            with open(os.path.join(FIXTURE_DIR, index[url]["path"]), "rb") as f:
+                out.append(f.read())
+    return out
+
+
+# --- SYNTHETIC CONTENT ---
+def competitor_name(rng: random.Random) -> str:
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    suffix = rng.choice(SUFFIXES)
+    return f"{name} {suffix}" if suffix else name
+
+
+def location(rng: random.Random, region: str = None) -> str:
+    region = region or rng.choice(list(REGION_CODES))
+    country, abbrev = REGION_CODES[region]
+    # Canadian pages sometimes spell the province out
+    if country == "CA" and rng.random() < 0.3:
+        return f"{rng.choice(TOWNS)}, {region}"
+    return f"{rng.choice(TOWNS)}, {abbrev}"
+
+
+def standings_rows(rng: random.Random, rows: int, region: str = None) -> list:
+    """[(rank, name, points, location)] with tied points and a tail of zero-point rows."""
+    points = sorted((rng.randint(0, 60) * 5 for _ in range(rows)), reverse=True)
+    out, rank = [], 0
+    for i, pts in enumerate(points):
+        if i == 0 or pts != points[i - 1]:
+            rank = i + 1
+        out.append((rank, competitor_name(rng), pts, location(rng, region)))
+    return out
+
+
+def standings_html(events: dict) -> str:
+    """Standings page markup for {event: [(rank, name, points, location), ...]}."""
+    out = ['<html><head><title>Tournament Standings</title></head><body><div class="container">']
+    for ev, rows in events.items():
+        out.append(
+            '<ul class="tournament-header"><li>'
+            f'<span class="text-primary text-uppercase">{ev}</span></li></ul>'
+        )
+        out.append(
+            '<table class="table"><thead><tr><th>Place</th><th>Name</th>'
+            "<th>Points</th><th>Location</th></tr></thead><tbody>"
+        )
+        for row in rows:
+            out.append("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>")
+        out.append("</tbody></table>")
+    out.append("</div></body></html>")
+    return "".join(out)
+
+
+def standings_page(seed, rows_per_event: int = 25, region: str = None) -> str:
+    """One deterministic standings page (every event) for a seed, e.g. a URL."""
+    rng = random.Random(str(seed))
+    return standings_html({ev: standings_rows(rng, rows_per_event, region) for ev in EVENT_NAMES})
+
+
+def sheet_csv(seed, rows: int = 200) -> str:
+    """Tournament history sheet in the shape fetch_sheet reads (Name, Date, Tournament, Type, events)."""
+    rng = random.Random(str(seed))
+    lines = [",".join(["Name", "Date", "Tournament", "Type"] + EVENT_NAMES)]
+    for _ in range(rows):
+        points = [str(rng.choice([0, 0, 0, 2, 5, 10])) for _ in EVENT_NAMES]
+        lines.append(",".join(
+            [f'"{competitor_name(rng)}"', f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+             f"{rng.choice(TOWNS)} Open", rng.choice(["Class A", "Class B", "Class C"])] + points
+        ))
+    return "\n".join(lines) + "\n"
+
+
+def team_pdf(seed, pages: int = 3, rows_per_page: int = 40) -> bytes:
+    """Minimal text-only PDF of "Rank Team Points ST" lines, as the team standings PDFs hold."""
+    rng = random.Random(str(seed))
+    page_lines = []
+    rank = 0
+    for _ in range(pages):
+        lines = ["Team Sparring Standings", "Rank Team Points Location"]
+        for _ in range(rows_per_page):
+            rank += 1
+            team = f"{rng.choice(TOWNS)} {rng.choice(['Tigers', 'Dragons', 'Eagles', 'Storm'])}"
+            lines.append(f"{rank} {team} {max(0, 500 - rank * 3)} {REGION_CODES[rng.choice(list(REGION_CODES))][1]}")
+        page_lines.append(lines)
+
+    n = len(page_lines)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(n))}] /Count {n} >>".encode(),
+    ]
+    font_id = 3 + 2 * n
+    for i, lines in enumerate(page_lines):
+        text = " ".join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 9 Tf 36 806 Td 12 TL {text} ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
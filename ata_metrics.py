@@ -0,0 +1,178 @@
+"""
+Process-wide pipeline instrumentation: stage timers, counters, cache
+hit/miss ratios, bytes fetched and per-URL fetch latency.
+
+Everything is shared by all sessions of the server process and safe to
+update from worker threads. Set ATA_METRICS_LOG to a file path to also
+write every timed stage and fetch there as one JSON object per line;
+timed stages are also spans of the current run's trace (see ata_trace).
+"""
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+import ata_trace
+
+# Samples kept per stage and per URL for percentiles (oldest dropped first)
+STAGE_SAMPLES = 2048
+URL_SAMPLES = 64
+
+log = logging.getLogger("ata_dashboard.metrics")
+log.propagate = False
+if os.environ.get("ATA_METRICS_LOG"):
+    _handler = logging.FileHandler(os.environ["ATA_METRICS_LOG"], encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+
+_lock = threading.Lock()
+_stages = {}
+_counters = collections.Counter()
+_fetches = {}
+_started = time.time()
+
+
+def _new_stage():
+    return {"count": 0, "total": 0.0, "max": 0.0, "samples": collections.deque(maxlen=STAGE_SAMPLES)}
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _emit(event: str, **fields):
+    if log.handlers:
+        log.info(json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, default=str))
+
+
+def record_stage(stage: str, seconds: float, **tags):
+    with _lock:
+        stats = _stages.setdefault(stage, _new_stage())
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["samples"].append(seconds)
+    _emit("stage", stage=stage, ms=_ms(seconds), **tags)
+    ata_trace.record_span(stage, seconds, **tags)
+
+
+@contextlib.contextmanager
+def timer(stage: str, **tags):
+    """Time the block as one sample of stage (tags go to the structured log and trace)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, **tags)
+
+
+def count(name: str, n: int = 1):
+    with _lock:
+        _counters[name] += n
+
+
+def cache_hit(cache: str, n: int = 1):
+    count(f"{cache}.hit", n)
+
+
+def cache_miss(cache: str, n: int = 1):
+    count(f"{cache}.miss", n)
+
+
+def record_fetch(url: str, seconds: float, nbytes: int = 0, status=None):
+    """One HTTP fetch: latency, bytes transferred and status (None for a connection error)."""
+    with _lock:
+        stats = _fetches.setdefault(url, {"count": 0, "bytes": 0, "errors": 0, "samples": collections.deque(maxlen=URL_SAMPLES)})
+        stats["count"] += 1
+        stats["bytes"] += nbytes
+        stats["errors"] += status not in (200, 304)
+        stats["samples"].append(seconds)
+        _counters["fetch.requests"] += 1
+        _counters["fetch.bytes"] += nbytes
+        _counters["fetch.errors"] += status not in (200, 304)
+    _emit("fetch", url=url, ms=_ms(seconds), bytes=nbytes, status=status)
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def reset():
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _fetches.clear()
+        _started = time.time()
+
+
+def snapshot(slowest_urls: int = 10) -> dict:
+    """JSON-serializable view of everything recorded since start (or the last reset)."""
+    with _lock:
+        stages = {name: dict(s, samples=list(s["samples"])) for name, s in _stages.items()}
+        counters = dict(_counters)
+        fetches = {url: dict(s, samples=list(s["samples"])) for url, s in _fetches.items()}
+        started = _started
+
+    stage_rows = [
+        {
+            "stage": name,
+            "count": s["count"],
+            "total_s": round(s["total"], 3),
+            "mean_ms": _ms(s["total"] / s["count"]),
+            "p50_ms": _ms(percentile(s["samples"], 0.50)),
+            "p95_ms": _ms(percentile(s["samples"], 0.95)),
+            "max_ms": _ms(s["max"]),
+        }
+        for name, s in sorted(stages.items(), key=lambda item: -item[1]["total"])
+    ]
+
+    caches = sorted({name.rsplit(".", 1)[0] for name in counters if name.endswith((".hit", ".miss"))})
+    cache_rows = []
+    for cache in caches:
+        hits, misses = counters.get(f"{cache}.hit", 0), counters.get(f"{cache}.miss", 0)
+        cache_rows.append({
+            "cache": cache, "hits": hits, "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+        })
+
+    all_samples = [x for s in fetches.values() for x in s["samples"]]
+    url_rows = sorted(
+        (
+            {
+                "url": url,
+                "count": s["count"],
+                "errors": s["errors"],
+                "bytes": s["bytes"],
+                "p50_ms": _ms(percentile(s["samples"], 0.50)),
+                "p95_ms": _ms(percentile(s["samples"], 0.95)),
+            }
+            for url, s in fetches.items()
+        ),
+        key=lambda row: -row["p95_ms"],
+    )
+
+    return {
+        "since": started,
+        "stages": stage_rows,
+        "counters": counters,
+        "caches": cache_rows,
+        "fetch": {
+            "requests": counters.get("fetch.requests", 0),
+            "errors": counters.get("fetch.errors", 0),
+            "bytes": counters.get("fetch.bytes", 0),
+            "bytes_saved": counters.get("fetch.bytes_saved", 0),
+            "not_modified": counters.get("fetch.not_modified", 0),
+            "p50_ms": _ms(percentile(all_samples, 0.50)),
+            "p95_ms": _ms(percentile(all_samples, 0.95)),
+            "p99_ms": _ms(percentile(all_samples, 0.99)),
+            "slowest_urls": url_rows[:slowest_urls],
+        },
+    }
@@ -0,0 +1,549 @@
+"""
+Pure parsing, ranking and collation steps of the standings pipeline.
+
+Nothing here touches Streamlit, the network or the store, so the steps can
+be imported by the dashboard, the benchmark suite and offline tools alike.
+"""
+import hashlib
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+EVENT_NAMES = [
+    "Forms", "Weapons", "Combat Weapons", "Sparring",
+    "Creative Forms", "Creative Weapons", "X-Treme Forms", "X-Treme Weapons"
+]
+
+REGION_CODES = {
+    "Alabama": ("US", "AL"), "Alaska": ("US", "AK"), "Arizona": ("US", "AZ"), "Arkansas": ("US", "AR"),
+    "California": ("US", "CA"), "Colorado": ("US", "CO"), "Connecticut": ("US", "CT"), "Delaware": ("US", "DE"),
+    "Florida": ("US", "FL"), "Georgia": ("US", "GA"), "Hawaii": ("US", "HI"), "Idaho": ("US", "ID"),
+    "Illinois": ("US", "IL"), "Indiana": ("US", "IN"), "Iowa": ("US", "IA"), "Kansas": ("US", "KS"),
+    "Kentucky": ("US", "KY"), "Louisiana": ("US", "LA"), "Maine": ("US", "ME"), "Maryland": ("US", "MD"),
+    "Massachusetts": ("US", "MA"), "Michigan": ("US", "MI"), "Minnesota": ("US", "MN"), "Mississippi": ("US", "MS"),
+    "Missouri": ("US", "MO"), "Montana": ("US", "MT"), "Nebraska": ("US", "NE"), "Nevada": ("US", "NV"),
+    "New Hampshire": ("US", "NH"), "New Jersey": ("US", "NJ"), "New Mexico": ("US", "NM"), "New York": ("US", "NY"),
+    "North Carolina": ("US", "NC"), "North Dakota": ("US", "ND"), "Ohio": ("US", "OH"), "Oklahoma": ("US", "OK"),
+    "Oregon": ("US", "OR"), "Pennsylvania": ("US", "PA"), "Rhode Island": ("US", "RI"), "South Carolina": ("US", "SC"),
+    "South Dakota": ("US", "SD"), "Tennessee": ("US", "TN"), "Texas": ("US", "TX"), "Utah": ("US", "UT"),
+    "Vermont": ("US", "VT"), "Virginia": ("US", "VA"), "Washington": ("US", "WA"), "West Virginia": ("US", "WV"),
+    "Wisconsin": ("US", "WI"), "Wyoming": ("US", "WY"),
+    "Alberta": ("CA", "AB"), "British Columbia": ("CA", "BC"), "Manitoba": ("CA", "MB"), "New Brunswick": ("CA", "NB"),
+    "Newfoundland and Labrador": ("CA", "NL"), "Nova Scotia": ("CA", "NS"), "Ontario": ("CA", "ON"),
+    "Prince Edward Island": ("CA", "PE"), "Quebec": ("CA", "QC"), "Saskatchewan": ("CA", "SK")
+}
+
+# Province name → abbreviation (shared by all location parsing)
+PROVINCE_NAME_TO_ABBREV = {
+    "Alberta": "AB",
+    "British Columbia": "BC",
+    "Manitoba": "MB",
+    "New Brunswick": "NB",
+    "Newfoundland and Labrador": "NL",
+    "Nova Scotia": "NS",
+    "Ontario": "ON",
+    "Prince Edward Island": "PE",
+    "Quebec": "QC",
+    "Saskatchewan": "SK",
+}
+
+# Reverse lookup: abbrev → (country, state_name)
+ABBREV_TO_REGION = {
+    abbrev: (country, state_name)
+    for state_name, (country, abbrev) in REGION_CODES.items()
+}
+
+
+def split_location(loc: str):
+    """Split an ATA "Town, ST" location into (town, state abbreviation)."""
+    loc = loc.strip()
+    loc_norm = loc.replace(", ", ",").replace(" ,", ",")
+
+    if "," in loc_norm:
+        town, region_part = loc_norm.split(",", 1)
+    else:
+        parts = loc_norm.split()
+        if len(parts) > 1:
+            town = " ".join(parts[:-1])
+            region_part = parts[-1]
+        else:
+            town = loc_norm
+            region_part = ""
+
+    town = town.strip()
+    region_part = region_part.strip()
+
+    if region_part.title() in PROVINCE_NAME_TO_ABBREV:
+        return town, PROVINCE_NAME_TO_ABBREV[region_part.title()]
+    return town, region_part.replace(".", "").strip().upper()
+
+
+# Function to normalize the town name if it's more than one word
+def normalize_town(t: str) -> str:
+    if not isinstance(t, str):
+        return ""
+    return (
+        t.lower()
+         .replace(",", " ")
+         .replace(".", " ")
+         .replace("  ", " ")
+         .strip()
+    )
+
+
+def parse_standings(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    data = {ev: [] for ev in EVENT_NAMES}
+
+    # Province name → abbreviation
+    PROVINCE_NAME_TO_ABBREV = {
+        "Alberta": "AB",
+        "British Columbia": "BC",
+        "Manitoba": "MB",
+        "New Brunswick": "NB",
+        "Newfoundland and Labrador": "NL",
+        "Nova Scotia": "NS",
+        "Ontario": "ON",
+        "Prince Edward Island": "PE",
+        "Quebec": "QC",
+        "Saskatchewan": "SK",
+    }
+
+    headers = soup.find_all("ul", class_="tournament-header")
+    tables = soup.find_all("table")
+
+    for header, table in zip(headers, tables):
+        evt = header.find("span", class_="text-primary text-uppercase")
+        if not evt:
+            continue
+
+        ev_name = evt.get_text(strip=True)
+        if ev_name not in EVENT_NAMES:
+            continue
+
+        tbody = table.find("tbody")
+        if not tbody:
+            continue
+
+        for tr in tbody.find_all("tr"):
+            cols = [td.get_text(strip=True) for td in tr.find_all("td")]
+            if len(cols) != 4:
+                continue
+
+            rank_s, name, pts_s, loc = cols
+
+            try:
+                pts_val = int(pts_s)
+            except:
+                continue
+
+            if pts_val <= 0:
+                continue
+
+            # --- FIX: Proper location parsing for Canada ---
+            loc = loc.strip()
+            loc_norm = loc.replace(", ", ",").replace(" ,", ",")
+
+            if "," in loc_norm:
+                town, region_part = loc_norm.split(",", 1)
+            else:
+                parts = loc_norm.split()
+                if len(parts) > 1:
+                    town = " ".join(parts[:-1])
+                    region_part = parts[-1]
+                else:
+                    town = loc_norm
+                    region_part = ""
+
+            town = town.strip()
+            region_part = region_part.strip()
+
+            # Convert province names → abbreviations
+            if region_part.title() in PROVINCE_NAME_TO_ABBREV:
+                state_abbrev = PROVINCE_NAME_TO_ABBREV[region_part.title()]
+            else:
+                state_abbrev = region_part.replace(".", "").strip().upper()
+
+            data[ev_name].append({
+                "Rank": int(rank_s),
+                "Name": name.strip(),
+                "Points": pts_val,
+                "Town": town,
+                "State": state_abbrev,
+                "Location": loc.strip()
+            })
+
+    return data
+
+
+# New parse for District and Worlds 
+def parse_multi_event_standings(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+
+    EVENT_MAP = {
+        "Forms": "Forms",
+        "Weapons": "Weapons",
+        "Combat Weapons": "Combat Weapons",
+        "Sparring": "Sparring",
+        "Creative Forms": "Creative Forms",
+        "Creative Weapons": "Creative Weapons",
+        "X-Treme Forms": "X-Treme Forms",
+        "X-Treme Weapons": "X-Treme Weapons",
+    }
+
+    results = {ev: [] for ev in EVENT_MAP.values()}
+
+    # Find all event headers
+    headers = soup.find_all("ul", class_="tournament-header")
+
+    for header in headers:
+        # Extract event name
+        span = header.find("span", class_="text-primary text-uppercase")
+        if not span:
+            continue
+
+        event_name = span.get_text(strip=True)
+
+        if event_name not in EVENT_MAP:
+            continue
+
+        # Find the NEXT table after this header
+        table = header.find_next("table")
+        if not table:
+            continue
+
+        tbody = table.find("tbody")
+        if not tbody:
+            continue
+
+        rows = []
+
+        for tr in tbody.find_all("tr"):
+            cols = [td.get_text(strip=True) for td in tr.find_all("td")]
+            if len(cols) != 4:
+                continue
+
+            place_s, name, pts_s, loc = cols
+
+            try:
+                pts_val = int(pts_s)
+            except:
+                continue
+
+            rows.append({
+                "Rank": int(place_s),
+                "Name": name.strip(),
+                "Points": pts_val,
+                "Location": loc.strip()
+            })
+
+        if rows:
+            results[event_name] = rows
+
+    return results
+
+
+def dedupe_and_rank(event_data: dict):
+    clean = {}
+    for ev, entries in event_data.items():
+        seen = set()
+        uniq = []
+        for e in entries:
+            key = (e["Name"].lower(), e["Location"], e["Points"])
+            if key not in seen:
+                seen.add(key)
+                uniq.append(e)
+        uniq.sort(key=lambda x: (-x["Points"], x["Name"]))
+        prev_points = None
+        prev_rank = None
+        current_pos = 1
+        for item in uniq:
+            if prev_points is None or item["Points"] != prev_points:
+                rank_to_assign = current_pos
+                item["Rank"] = rank_to_assign
+                prev_rank = rank_to_assign
+            else:
+                item["Rank"] = prev_rank
+            prev_points = item["Points"]
+            current_pos += 1
+        clean[ev] = uniq
+    return clean
+
+
+STANDINGS_COLUMNS = [
+    "Name", "Location", "Event", "Rank", "Points", "Town", "State",
+    "First Name", "Last Name", "Suffix", "SortKey",
+]
+
+
+def standings_frame(ranked: dict) -> pd.DataFrame:
+    """
+    Ingest ranked standings as one row per (competitor, event). Location and
+    name parsing happen once here and are stored as columns for reuse.
+    """
+    df = pd.DataFrame(
+        [
+            {
+                "Name": e["Name"],
+                "Location": e["Location"],
+                "Event": ev,
+                "Rank": e["Rank"],
+                "Points": e["Points"],
+            }
+            for ev, entries in ranked.items()
+            for e in entries
+        ],
+        columns=["Name", "Location", "Event", "Rank", "Points"],
+    )
+
+    locations = {loc: split_location(loc) for loc in df["Location"].unique()}
+    df["Town"] = df["Location"].map(lambda loc: locations[loc][0])
+    df["State"] = df["Location"].map(lambda loc: locations[loc][1])
+
+    return df.join(parse_names(df["Name"]))
+
+
+# --- QUALIFIER COLLATION ---
+EVENT_ORDER = {ev: i for i, ev in enumerate(EVENT_NAMES, start=1)}
+
+# Event → (export column, export code) for the district-wide tables
+TRADITIONAL_COLUMNS = {
+    "Forms": ("Traditional Forms", "FORMS"),
+    "Sparring": ("Traditional Sparring", "SPARRING"),
+    "Weapons": ("Traditional Weapons", "WEAPONS"),
+    "Combat Weapons": ("Combat Weapons", "COMBAT"),
+}
+
+CREATIVE_COLUMNS = {
+    "Creative Forms": ("Creative Forms", "ATA-CF"),
+    "Creative Weapons": ("Creative Weapons", "ATA-CW"),
+    "X-Treme Forms": ("Xtreme Forms", "ATA-XF"),
+    "X-Treme Weapons": ("Xtreme Weapons", "ATA-XW"),
+}
+
+
+# Generational suffixes, shared by name parsing and competitor identity
+NAME_SUFFIXES = ("jr", "sr", "ii", "iii", "iv", "v")
+
+# "First Middle Last[, Suffix]" — lazy first name, last token, optional suffix
+NAME_PATTERN = re.compile(
+    rf"^(?P<first>.*?)\s*(?P<last>\S+)(?:\s+(?P<suffix>(?:{'|'.join(NAME_SUFFIXES)})\.?))?$",
+    re.IGNORECASE,
+)
+
+
+def parse_names(names: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized competitor name parsing into First Name, Last Name, Suffix
+    (Jr./Sr./III…) and a lowercase SortKey on the last name. Each distinct
+    name is parsed once and mapped back onto the rows.
+    """
+    cleaned = (
+        names.astype(str)
+        .str.replace(",", "", regex=False)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    unique_names = pd.Series(cleaned.unique())
+    parts = unique_names.str.extract(NAME_PATTERN).fillna("")
+    parts.index = unique_names
+
+    parsed = parts.reindex(cleaned.to_numpy())
+    parsed.index = names.index
+
+    return pd.DataFrame(
+        {
+            "First Name": parsed["first"],
+            "Last Name": parsed["last"],
+            "Suffix": parsed["suffix"],
+            "SortKey": parsed["last"].str.lower(),
+        },
+        index=names.index,
+    )
+
+
+def with_name_columns(df: pd.DataFrame) -> pd.DataFrame:
+    if "SortKey" in df.columns:
+        return df
+    return df.join(parse_names(df["Name"]))
+
+
+def collate_district_tables(results_df: pd.DataFrame, by_division: bool = False):
+    """
+    District-wide export format: one row per competitor with each event
+    pivoted to a column holding its code (or "None").
+    Returns (traditional_df, creative_xtreme_df).
+    """
+    keys = ["Name", "Town", "State"] + (["Division"] if by_division else [])
+    lead_cols = (["Division"] if by_division else []) + ["Last Name", "First Name"]
+
+    if results_df.empty:
+        return tuple(
+            pd.DataFrame(columns=lead_cols + [c for c, _ in columns.values()])
+            for columns in (TRADITIONAL_COLUMNS, CREATIVE_COLUMNS)
+        )
+
+    name_cols = ["First Name", "Last Name", "Suffix"]
+    flags = (
+        with_name_columns(results_df)
+        .groupby(keys + name_cols + ["Event"]).size()
+        .unstack("Event", fill_value=0)
+        .gt(0)
+        .reset_index()
+    )
+    last_names = flags["Last Name"].where(
+        flags["Suffix"] == "", flags["Last Name"] + " " + flags["Suffix"]
+    )
+
+    def build(columns):
+        table = pd.DataFrame({"Last Name": last_names, "First Name": flags["First Name"]})
+        if by_division:
+            table["Division"] = flags["Division"]
+        has_any = pd.Series(False, index=flags.index)
+        for ev, (col, code) in columns.items():
+            present = flags[ev] if ev in flags.columns else pd.Series(False, index=flags.index)
+            table[col] = present.map({True: code, False: "None"})
+            has_any |= present
+        table = table.loc[has_any, lead_cols + [c for c, _ in columns.values()]]
+        return table.sort_values(lead_cols).reset_index(drop=True)
+
+    return build(TRADITIONAL_COLUMNS), build(CREATIVE_COLUMNS)
+
+
+def collate_qualifiers(results_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    State / World format: one row per (competitor, division) with events
+    joined by <br> in EVENT_ORDER, sorted by last name.
+    """
+    keys = ["Name", "Town", "State", "Division"]
+
+    ordered = with_name_columns(results_df)
+    ordered = ordered.assign(
+        _order=ordered["Event"].map(EVENT_ORDER).fillna(999)
+    ).sort_values("_order", kind="stable")
+
+    df = (
+        ordered.groupby(keys + ["SortKey"], sort=False)["Event"]
+        .agg("<br>".join)
+        .rename("Events")
+        .reset_index()
+    )
+
+    df = df.sort_values(["SortKey", "Name"]).reset_index(drop=True)
+    return df.drop(columns=["SortKey"])
+
+
+# --- COMPETITOR IDENTITY ---
+# Names spelled differently across sheets and standings pages ("Jon Smith",
+# "John Smith") resolve to one competitor ID. Identical names (after
+# normalization, generational suffix included, so a father and son stay
+# apart) always share an ID. Anything looser needs the same Location too:
+# the first names must match once nicknames are resolved, and the last names
+# must be equal or, when both are at least FUZZY_LAST_NAME_LENGTH letters,
+# one typo apart. Candidates are blocked on location, first name and the
+# start or end of the last name.
+FUZZY_LAST_NAME_LENGTH = 6
+NICKNAMES = {
+    "jon": "john", "johnny": "john", "jack": "john",
+    "bob": "robert", "bobby": "robert", "rob": "robert", "robbie": "robert",
+    "bill": "william", "billy": "william", "will": "william",
+    "jim": "james", "jimmy": "james", "mike": "michael",
+    "dave": "david", "chris": "christopher", "tom": "thomas", "tommy": "thomas",
+    "joe": "joseph", "dan": "daniel", "danny": "daniel", "matt": "matthew",
+    "steve": "steven", "stephen": "steven", "tony": "anthony", "andy": "andrew",
+    "greg": "gregory", "ed": "edward", "rick": "richard", "rich": "richard",
+    "nick": "nicholas", "ben": "benjamin", "sam": "samuel", "alex": "alexander",
+    "kate": "katherine", "katie": "katherine", "kathy": "katherine",
+    "liz": "elizabeth", "beth": "elizabeth", "jen": "jennifer", "jenny": "jennifer",
+    "sue": "susan", "patty": "patricia", "peggy": "margaret", "maggie": "margaret",
+    "deb": "deborah", "debbie": "deborah", "cindy": "cynthia",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, punctuation-free, single-spaced name used for lookups."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(name).lower()).split())
+
+
+def identity_key(name) -> str:
+    """Exact-match key of a competitor name: normalize_name, suffix kept."""
+    return normalize_name(name)
+
+
+def identity_keys(names: pd.Series) -> pd.Series:
+    """identity_key per name, None for blanks (exact lookups such as license numbers)."""
+    keys = names.map(lambda name: identity_key(name) if pd.notna(name) else "")
+    return keys.where(keys != "", None)
+
+
+def name_parts(key: str):
+    """(first name with nicknames resolved, rest of the name joined, suffix) of an identity key."""
+    tokens = key.split()
+    suffix = tokens.pop() if len(tokens) > 2 and tokens[-1] in NAME_SUFFIXES else ""
+    first = tokens[0] if tokens else ""
+    return NICKNAMES.get(first, first), "".join(tokens[1:]), suffix
+
+
+def identity_blocks(key: str, location: str):
+    # A typo near the end of the last name still shares the first block,
+    # one near its start the second
+    first, last, _ = name_parts(key)
+    return (f"S:{location}:{first}:{last[:2]}", f"E:{location}:{first}:{last[-2:]}")
+
+
+def one_edit_apart(a: str, b: str) -> bool:
+    """True when a and b differ by one insertion, deletion, substitution or adjacent swap."""
+    if abs(len(a) - len(b)) > 1 or a == b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (
+        i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    )
+
+
+def match_identity(key: str, location: str, blocks: dict, ids: dict):
+    """
+    ID of a known key at the same location whose name is a nickname or a
+    one-letter typo away from key's, or None. Without a location nothing
+    matches: only identical keys share an ID.
+    """
+    if not location:
+        return None
+    first, last, suffix = name_parts(key)
+    candidates = {c for block in identity_blocks(key, location) for c in blocks.get(block, ())}
+    # Sorted so the same candidates always resolve the same way
+    for candidate in sorted(candidates):
+        candidate_first, candidate_last, candidate_suffix = name_parts(candidate)
+        if candidate_first != first or candidate_suffix != suffix:
+            continue
+        if candidate_last == last or (
+            min(len(last), len(candidate_last)) >= FUZZY_LAST_NAME_LENGTH
+            and one_edit_apart(last, candidate_last)
+        ):
+            return ids[candidate]
+    return None
+
+
+def resolve_identities(pairs, ids: dict, blocks: dict) -> dict:
+    """
+    {(identity key, location key): competitor ID} for pairs, registering
+    keys not seen before in ids ({key: ID}) and blocks ({block: {keys}}).
+    Location keys are normalize_name'd Locations, "" when unknown.
+    """
+    pairs = set(pairs)
+    # Located pairs first, so an unlocated key can reuse the ID its located
+    # spelling matched in the same batch
+    for key, location in sorted(pairs, key=lambda pair: (not pair[1], pair)):
+        if key not in ids:
+            ids[key] = match_identity(key, location, blocks, ids) or hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+        if location:
+            for block in identity_blocks(key, location):
+                blocks.setdefault(block, set()).add(key)
+    return {pair: ids[pair[0]] for pair in pairs}
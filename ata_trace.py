@@ -0,0 +1,184 @@
+"""
+Per-run request tracing in the Chrome Trace Event format.
+
+    ATA_TRACE_DIR=traces streamlit run ata_dashboard.py
+    python ata_trace.py traces/*.json --by division
+    python ata_trace.py traces/*.json --by state --stage fetch
+
+Set ATA_TRACE_DIR to turn tracing on. Every script run that records any
+span gets its own file there; each ata_metrics stage (fetch, parse, rank,
+store, collate, render, ...) becomes a complete ("X") event carrying its
+tags (division, state, url, report, table) as args. Files open directly in
+chrome://tracing or https://ui.perfetto.dev. They are written as they go
+and left without the closing "]" (which the format allows), since a page
+run can end at any st.stop().
+
+Worker threads only join the run when their function is wrapped with
+bind() at submit time.
+"""
+import argparse
+import collections
+import contextvars
+import glob
+import itertools
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+TRACE_DIR = os.environ.get("ATA_TRACE_DIR", "")
+# Oldest trace files are deleted beyond this many
+TRACE_KEEP = 500
+
+_current = contextvars.ContextVar("ata_trace_run", default=None)
+
+
+class TraceRun:
+    """One script run's trace file, opened on the first span."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.run_id = uuid.uuid4().hex[:8]
+        slug = re.sub(r"[^a-z0-9]+", "-", page.lower()).strip("-")[:40]
+        self.path = os.path.join(TRACE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{self.run_id}.json")
+        self.lock = threading.Lock()
+        self.file = None
+        self.threads = set()
+
+    def write(self, event: dict):
+        pid, tid = event["pid"], event["tid"]
+        with self.lock:
+            if self.file is None:
+                os.makedirs(TRACE_DIR, exist_ok=True)
+                self.file = open(self.path, "w", encoding="utf-8")
+                self.file.write("[\n")
+                self._append({"name": "process_name", "ph": "M", "pid": pid, "tid": tid,
+                              "args": {"name": f"{self.page} ({self.run_id})"}}, first=True)
+            if tid not in self.threads:
+                self.threads.add(tid)
+                self._append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                              "args": {"name": threading.current_thread().name}})
+            self._append(event)
+            self.file.flush()
+
+    def _append(self, event: dict, first: bool = False):
+        self.file.write(("" if first else ",\n") + json.dumps(event, default=str))
+
+
+def prune(keep: int = TRACE_KEEP):
+    paths = sorted(glob.glob(os.path.join(TRACE_DIR, "*.json")), key=os.path.getmtime)
+    for path in paths[:max(0, len(paths) - keep)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def begin_run(page: str):
+    """Start tracing a script run on this thread (no-op unless ATA_TRACE_DIR is set)."""
+    if not TRACE_DIR:
+        return
+    previous = _current.get()
+    if previous is not None and previous.file is not None:
+        with previous.lock:
+            previous.file.close()
+    _current.set(TraceRun(page))
+    if os.path.isdir(TRACE_DIR):
+        prune()
+
+
+def bind(fn):
+    """Wrap fn so it records into the calling thread's run when called from a worker thread."""
+    run = _current.get()
+    if run is None:
+        return fn
+
+    def bound(*args, **kwargs):
+        token = _current.set(run)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return bound
+
+
+def record_span(name: str, seconds: float, **tags):
+    """A span of the given duration that ended just now, if a run is being traced."""
+    run = _current.get()
+    if run is None:
+        return
+    end = time.time()
+    run.write({
+        "name": name,
+        "cat": "pipeline",
+        "ph": "X",
+        "ts": round((end - seconds) * 1e6),
+        "dur": round(seconds * 1e6),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "args": tags,
+    })
+
+
+# --- ANALYSIS ---
+def load_events(path: str) -> list:
+    """Events of one trace file, whether or not it was closed with "]"."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if not text.endswith("]"):
+        text = text.rstrip(",") + "]"
+    data = json.loads(text)
+    return data["traceEvents"] if isinstance(data, dict) else data
+
+
+def summarize(paths, by: str = "division", stage: str = None) -> list:
+    """Span time per tag value, slowest first: [{by, spans, total_ms, max_ms, stages}]."""
+    totals = collections.defaultdict(lambda: {"spans": 0, "total": 0, "max": 0, "stages": collections.Counter()})
+    for event in itertools.chain.from_iterable(load_events(p) for p in paths):
+        if event.get("ph") != "X" or (stage and event["name"] != stage):
+            continue
+        key = event.get("args", {}).get(by)
+        if key is None:
+            continue
+        row = totals[key]
+        row["spans"] += 1
+        row["total"] += event["dur"]
+        row["max"] = max(row["max"], event["dur"])
+        row["stages"][event["name"]] += event["dur"]
+
+    return sorted(
+        (
+            {
+                by: key,
+                "spans": row["spans"],
+                "total_ms": round(row["total"] / 1000, 1),
+                "max_ms": round(row["max"] / 1000, 1),
+                "stages": {name: round(us / 1000, 1) for name, us in row["stages"].most_common()},
+            }
+            for key, row in totals.items()
+        ),
+        key=lambda row: -row["total_ms"],
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="trace files")
+    parser.add_argument("--by", default="division", help="span tag to group by (division, state, url, report, table)")
+    parser.add_argument("--stage", help="only count spans of this stage (e.g. fetch)")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    for row in summarize(args.paths, args.by, args.stage)[:args.top]:
+        stages = ", ".join(f"{name} {ms:,.0f}" for name, ms in row["stages"].items())
+        print(f"{row['total_ms']:>12,.1f} ms {row['spans']:>6} spans  max {row['max_ms']:>9,.1f} ms  "
+              f"{row[args.by]}  [{stages}]")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Offline benchmarks for the fetch → parse → rank → collate pipeline.
+
+    python bench.py                         # realistic and 10x scale
+    python bench.py --scales 1 --repeat 5
+    python bench.py --json bench.json       # save results
+    python bench.py --baseline bench.json   # exit 1 on a throughput regression
+    python bench.py --baseline bench_baseline.json
+    python bench.py record URL [URL ...]    # add live pages to the recorded corpus
+
+The corpus is the recorded fixtures (see ata_fixtures) when there are any,
+otherwise deterministic synthetic pages: one page per state/province plus
+the world page (one full sweep of a division) at scale 1. Results say
+which corpus they ran on, and --baseline only compares like with like.
+bench_baseline.json is a synthetic-corpus run on a single-core Linux VM
+(Python 3.11); regenerate it with --json on the machine you compare on.
+"""
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import ata_fixtures
+import pdf_extract
+from ata_pipeline import (
+    EVENT_NAMES,
+    REGION_CODES,
+    collate_district_tables,
+    collate_qualifiers,
+    dedupe_and_rank,
+    normalize_town,
+    parse_multi_event_standings,
+    parse_standings,
+    split_location,
+    standings_frame,
+)
+
+ROWS_PER_EVENT = 25
+TEAM_PDFS = 9
+# Team PDFs long enough for pdf_extract's process pool, split across
+# PDF_POOL_WORKERS chunks however many cores the machine has
+LARGE_TEAM_PDFS = 2
+LARGE_TEAM_PDF_PAGES = 2 * pdf_extract.PARALLEL_MIN_PAGES
+PDF_POOL_WORKERS = 2
+SHEETS = 4
+
+
+# --- CORPUS ---
+def build_corpus(scale: int) -> dict:
+    """
+    {"html": [str], "pdf": [bytes], "large_pdf": [bytes], "csv": [str],
+    "source": "recorded" or "synthetic"} at the given multiple of one sweep.
+    large_pdf holds the PDFs of at least PARALLEL_MIN_PAGES pages.
+    """
+    html = [c.decode("utf-8", "replace") for c in ata_fixtures.recorded("html")]
+    pdfs = ata_fixtures.recorded("pdf")
+    csvs = [c.decode("utf-8", "replace") for c in ata_fixtures.recorded("csv")]
+    source = "recorded" if html or pdfs or csvs else "synthetic"
+
+    regions = ["World"] + list(REGION_CODES)
+    if html:
+        html = html * scale
+    else:
+        html = [
+            ata_fixtures.standings_page(f"{copy}:{region}", ROWS_PER_EVENT, None if region == "World" else region)
+            for copy in range(scale)
+            for region in regions
+        ]
+    large_pdfs = [pdf for pdf in pdfs if pdf_extract.page_count(pdf) >= pdf_extract.PARALLEL_MIN_PAGES]
+    large_pdfs = large_pdfs * scale if large_pdfs else [
+        ata_fixtures.team_pdf(f"large:{i}", pages=LARGE_TEAM_PDF_PAGES) for i in range(LARGE_TEAM_PDFS * scale)
+    ]
+    pdfs = pdfs * scale if pdfs else [ata_fixtures.team_pdf(i) for i in range(TEAM_PDFS * scale)]
+    csvs = csvs * scale if csvs else [ata_fixtures.sheet_csv(i) for i in range(SHEETS * scale)]
+    return {"html": html, "pdf": pdfs, "large_pdf": large_pdfs, "csv": csvs, "source": source}
+
+
+# --- BENCHMARKS ---
+# Each benchmark is (name, unit, setup(corpus) -> state, run(state) -> items processed)
+def setup_parsed(corpus):
+    # Parsed once per corpus and shared by the benchmarks downstream of parsing
+    if "parsed" not in corpus:
+        corpus["parsed"] = [parse_multi_event_standings(html) for html in corpus["html"]]
+    return corpus["parsed"]
+
+
+def run_dedupe(parsed):
+    combined = {ev: [] for ev in EVENT_NAMES}
+    for page in parsed:
+        for ev, entries in page.items():
+            combined[ev].extend(dict(e) for e in entries)
+    ranked = dedupe_and_rank(combined)
+    return sum(len(v) for v in ranked.values())
+
+
+def run_locations(locations):
+    for loc in locations:
+        town, _ = split_location(loc)
+        normalize_town(town)
+    return len(locations)
+
+
+def setup_collation(corpus):
+    parsed = setup_parsed(corpus)
+    return [(i, dedupe_and_rank(page)) for i, page in enumerate(parsed)]
+
+
+def run_collation(ranked_pages):
+    frames = [
+        standings_frame(ranked).assign(Division=f"Division {i % 12}", Code=f"D{i % 12:03d}")
+        for i, ranked in ranked_pages
+    ]
+    results = pd.concat(frames, ignore_index=True)
+    top10 = results[results["Rank"] <= 10]
+    collate_district_tables(top10, by_division=True)
+    collate_qualifiers(top10)
+    return len(results)
+
+
+def run_pdfs(pdfs):
+    for content in pdfs:
+        pdf_extract.parse_team_lines(pdf_extract.extract_lines(content))
+    return len(pdfs)
+
+
+def run_pooled_pdfs(pdfs):
+    for content in pdfs:
+        pdf_extract.parse_team_lines(pdf_extract.extract_lines(content, workers=PDF_POOL_WORKERS))
+    return len(pdfs)
+
+
+def run_sheets(csvs):
+    for text in csvs:
+        df = pd.read_csv(io.StringIO(text))
+        for ev in EVENT_NAMES:
+            if ev in df.columns:
+                df[ev] = pd.to_numeric(df[ev], errors="coerce").fillna(0)
+    return len(csvs)
+
+
+BENCHMARKS = [
+    ("parse_standings", "pages", lambda c: c["html"], lambda pages: len([parse_standings(h) for h in pages])),
+    ("parse_multi_event_standings", "pages", lambda c: c["html"],
+     lambda pages: len([parse_multi_event_standings(h) for h in pages])),
+    ("dedupe_and_rank", "rows", setup_parsed, run_dedupe),
+    ("location_normalization", "locations",
+     lambda c: [e["Location"] for page in setup_parsed(c) for rows in page.values() for e in rows],
+     run_locations),
+    ("qualifier_collation", "rows", setup_collation, run_collation),
+    ("team_pdf_parse", "pdfs", lambda c: c["pdf"], run_pdfs),
+    ("team_pdf_parse_pooled", "pdfs", lambda c: c["large_pdf"], run_pooled_pdfs),
+    ("sheet_csv_parse", "sheets", lambda c: c["csv"], run_sheets),
+]
+
+
+def measure(run, state, repeat: int):
+    """(best seconds, items, peak traced MiB); memory is traced in a separate run."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run(state)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, items, peak / 2**20
+
+
+def run_benchmarks(scales, repeat: int, only=None) -> list:
+    results = []
+    for scale in scales:
+        corpus = build_corpus(scale)
+        for name, unit, setup, run in BENCHMARKS:
+            if only and name not in only:
+                continue
+            seconds, items, peak_mib = measure(run, setup(corpus), repeat)
+            results.append({
+                "benchmark": name,
+                "scale": scale,
+                "corpus": corpus["source"],
+                "items": items,
+                "unit": unit,
+                "seconds": round(seconds, 4),
+                "throughput": round(items / seconds, 1) if seconds else None,
+                "peak_mib": round(peak_mib, 1),
+            })
+            print(
+                f"{name:<30} {scale:>3}x {items:>9} {unit:<10} {seconds:>9.3f}s "
+                f"{results[-1]['throughput']:>12,.1f}/s {peak_mib:>9.1f} MiB",
+                flush=True,
+            )
+    return results
+
+
+def regressions(results, baseline, tolerance: float) -> list:
+    """Benchmarks whose throughput fell more than tolerance below the baseline's."""
+    before = {(r["benchmark"], r["scale"], r.get("corpus", "synthetic")): r["throughput"] for r in baseline}
+    slower = []
+    for r in results:
+        old = before.get((r["benchmark"], r["scale"], r["corpus"]))
+        if old and r["throughput"] and r["throughput"] < old * (1 - tolerance):
+            slower.append(f"{r['benchmark']} @ {r['scale']}x: {r['throughput']:,.1f}/s vs {old:,.1f}/s")
+    return slower
+
+
+# --- RECORDING ---
+def fixture_kind(url: str, content_type: str) -> str:
+    if url.lower().endswith(".pdf") or "pdf" in content_type:
+        return "pdf"
+    if "csv" in url.lower() or "csv" in content_type:
+        return "csv"
+    return "html"
+
+
+def record(urls):
+    import requests
+
+    headers = {"User-Agent": "Mozilla/5.0 (ATA dashboard fixture recorder)"}
+    for url in urls:
+        r = requests.get(url, headers=headers, timeout=30)
+        r.raise_for_status()
+        kind = fixture_kind(url, r.headers.get("Content-Type", ""))
+        ata_fixtures.save_fixture(url, kind, r.content)
+        print(f"recorded {kind:<4} {len(r.content):>9} bytes  {url}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "record"])
+    parser.add_argument("urls", nargs="*", help="URLs to record (record only)")
+    parser.add_argument("--scales", default="1,10", help="comma-separated corpus multiples (default 1,10)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark; the best is kept")
+    parser.add_argument("--only", default="", help="comma-separated benchmark names")
+    parser.add_argument("--json", dest="json_path", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed throughput drop (default 0.25)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if not args.urls:
+            parser.error("record needs at least one URL")
+        record(args.urls)
+        return 0
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    results = run_benchmarks(scales, args.repeat, only)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Standings crawler: fetches every standings page into the shared store, out
+of the dashboard's process.
+
+    python crawler.py                                  # one pass over everything stale
+    python crawler.py --processes 4 --loop             # keep the store fresh
+    python crawler.py --divisions "Div A" --districts "District 3"
+    python crawler.py --max-age 0                      # refetch everything
+    ATA_READ_ONLY=1 streamlit run ata_dashboard.py     # dashboard only reads the store
+
+A pass covers the world page and every state/province page of each
+MATRIX_GROUPS and GROUPS division (or just the given divisions/districts),
+skipping pages crawled within --max-age seconds, then the team sparring
+PDFs. Pages are split across worker processes (at most MAX_PROCESSES by
+default), each with its own fetch governor running FETCH_WORKERS threads.
+The per-host rate, burst, concurrency limit and circuit-breaker threshold
+are divided between them, so the crawl as a whole stays within the
+single-process governor's limits. Every
+pass is recorded in the store's crawl_runs table. Exit status is 1 when
+any page could not be fetched.
+"""
+import argparse
+import concurrent.futures
+import math
+import multiprocessing
+import sys
+import time
+
+import ata_config
+import ata_fetch
+import standings_store
+from ata_pipeline import ABBREV_TO_REGION, REGION_CODES
+
+# Default cap on worker processes: parsing scales with cores, the host does not
+MAX_PROCESSES = 4
+
+# Warehouse parser each kind of page is stored under
+KIND_PARSERS = {"group": standings_store.PARSER_STANDINGS, "matrix": standings_store.PARSER_MULTI_EVENT}
+
+
+def crawl_items(matrix_groups: dict, div_names=None, regions=None) -> list:
+    """
+    Every page to crawl: GROUPS pages (Kind "group"), then MATRIX_GROUPS
+    pages (Kind "matrix"). A division in both is crawled once per kind,
+    since each kind is parsed and stored separately.
+    """
+    regions = list(REGION_CODES) if regions is None else regions
+    items = {}
+    for kind, groups in (("group", ata_config.GROUPS), ("matrix", matrix_groups)):
+        names = list(groups) if div_names is None else [name for name in div_names if name in groups]
+        for item in ata_config.build_fetch_plan(groups, names, regions, include_world=True):
+            items.setdefault((item["Code"], item["Region"], kind), dict(item, Kind=kind))
+    return list(items.values())
+
+
+def stale_items(items: list, max_age: float) -> list:
+    conn = standings_store.connect()
+    try:
+        fresh = {
+            kind: standings_store.fresh_pages(conn, max_age, parser=parser)
+            for kind, parser in KIND_PARSERS.items()
+        }
+    finally:
+        conn.close()
+    return [item for item in items if (item["Code"], item["Region"]) not in fresh[item["Kind"]]]
+
+
+def crawl_page(item: dict) -> dict:
+    if item["Kind"] == "group":
+        result = ata_fetch.fetch_group_page(item["Division"], item["Region"], item["url"])
+    else:
+        result = ata_fetch.fetch_and_store_frame(item)
+    return {"url": item["url"], "ok": result is not None}
+
+
+def crawl_chunk(items: list) -> list:
+    """Fetch and store items on FETCH_WORKERS threads: [{url, ok, reason}]."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=ata_fetch.FETCH_WORKERS) as pool:
+        results = list(pool.map(crawl_page, items))
+    skipped = {record["url"]: record["reason"] for record in ata_fetch.get_fetch_governor().skipped()}
+    for result in results:
+        result["reason"] = "" if result["ok"] else skipped.get(result["url"], "empty page")
+    return results
+
+
+def init_worker(processes: int):
+    # Before the process's governor exists, so it picks up its share
+    ata_fetch.FETCH_RATE /= processes
+    ata_fetch.FETCH_BURST = max(1, ata_fetch.FETCH_BURST // processes)
+    ata_fetch.FETCH_MAX_CONCURRENCY = max(1, ata_fetch.FETCH_MAX_CONCURRENCY // processes)
+    ata_fetch.FETCH_FAILURE_THRESHOLD = math.ceil(ata_fetch.FETCH_FAILURE_THRESHOLD / processes)
+
+
+def crawl_pages(items: list, processes: int) -> list:
+    # Every process needs at least one concurrency slot of the host's share
+    processes = min(processes, ata_fetch.FETCH_MAX_CONCURRENCY)
+    if processes <= 1 or len(items) <= ata_fetch.FETCH_WORKERS:
+        return crawl_chunk(items)
+
+    # A few chunks per process, interleaved so each mixes divisions and hosts' slow pages
+    chunks = [items[i::processes * 4] for i in range(processes * 4)]
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(processes,),
+    ) as pool:
+        for chunk_results in pool.map(crawl_chunk, [chunk for chunk in chunks if chunk]):
+            results.extend(chunk_results)
+    return results
+
+
+def crawl_team_pdfs() -> list:
+    results = []
+    for division, url in ata_config.TEAM_SPARRING_PDFS.items():
+        try:
+            ata_fetch.fetch_team_pdf_rows(url)
+            results.append({"url": url, "ok": True, "reason": ""})
+        except Exception as e:
+            results.append({"url": url, "ok": False, "reason": str(e)})
+    return results
+
+
+def crawl_once(args, matrix_groups: dict, regions) -> int:
+    started = time.time()
+    items = crawl_items(matrix_groups, args.divisions, regions)
+    pending = stale_items(items, args.max_age)
+    print(f"{len(pending)} of {len(items)} pages stale; crawling on {args.processes} process(es)")
+
+    results = crawl_pages(pending, args.processes) if pending else []
+    if args.teams:
+        results += crawl_team_pdfs()
+
+    failed = [result for result in results if not result["ok"]]
+    finished = time.time()
+    conn = standings_store.connect()
+    try:
+        standings_store.record_crawl(conn, started, finished, len(results), len(results) - len(failed), len(failed))
+    finally:
+        conn.close()
+
+    print(f"{len(results) - len(failed)} of {len(results)} fetched in {finished - started:.1f}s")
+    for result in failed[:20]:
+        print(f"  failed: {result['url']} ({result['reason']})")
+    if len(failed) > 20:
+        print(f"  ... and {len(failed) - 20} more")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=min(MAX_PROCESSES, multiprocessing.cpu_count()),
+                        help=f"worker processes (default: CPU count, at most {MAX_PROCESSES})")
+    parser.add_argument("--divisions", nargs="+", help="only these divisions (default: all)")
+    parser.add_argument("--districts", nargs="+", help="only the states/provinces of these districts")
+    parser.add_argument("--max-age", type=float, default=ata_config.STANDINGS_TTL,
+                        help="seconds a stored page counts as fresh (0: refetch everything)")
+    parser.add_argument("--no-teams", dest="teams", action="store_false", help="skip the team sparring PDFs")
+    parser.add_argument("--loop", action="store_true", help="crawl again every --interval seconds")
+    parser.add_argument("--interval", type=float, default=600, help="seconds between passes with --loop")
+    args = parser.parse_args(argv)
+
+    regions = None
+    if args.districts:
+        district_map = ata_config.district_map(ata_config.load_district_df())
+        unknown = [d for d in args.districts if d not in district_map]
+        if unknown:
+            parser.error(f"unknown district(s): {', '.join(unknown)}")
+        regions = [
+            ABBREV_TO_REGION[abbrev][1]
+            for district in args.districts
+            for abbrev in district_map[district]
+            if abbrev in ABBREV_TO_REGION
+        ]
+
+    while True:
+        status = crawl_once(args, ata_config.load_matrix_groups(), regions)
+        if not args.loop:
+            return status
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Per-host fetch governor: a token-bucket rate limit, an adaptive concurrency
+limit and a circuit breaker, shared by every thread fetching from the host.
+
+    governor = FetchGovernor(rate=8, burst=16, max_concurrency=16)
+    reason = governor.acquire(url)          # blocks for a token and a slot
+    if reason:                              # circuit open: not sent at all
+        ...
+    else:
+        ...send the request...
+        governor.release(url, seconds, status, reason=None if ok else "...")
+
+Concurrency grows by about one slot per limit's worth of fast successes and
+halves (at most once per BACKOFF_INTERVAL) on a 429, a 5xx, a connection
+error or a response slower than slow_seconds. A 429's Retry-After pauses
+the host. failure_threshold consecutive 429/5xx/connection failures open
+the circuit for cooldown seconds; then a single probe request decides
+whether it closes again. Only the release() of that probe (same URL, same
+thread as its acquire()) can close or re-open the circuit; requests that
+were already in flight when it opened are fed back but decide nothing.
+Every URL that did not produce a usable page is kept, with why, until it
+next succeeds (see skipped()).
+
+Callers retry overloaded() outcomes after backoff_delay(), within a fixed
+number of attempts per URL; the circuit breaker ends retries early.
+"""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import ata_metrics
+
+BACKOFF_INTERVAL = 1.0
+MAX_RETRY_AFTER = 30.0
+
+
+def overloaded(status) -> bool:
+    """Responses that mean the host is struggling (None: no response at all)."""
+    return status is None or status == 429 or status >= 500
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0, rng=random) -> float:
+    """Full-jitter exponential backoff before retry number attempt (1, 2, ...)."""
+    return rng.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def retry_after_seconds(value) -> float:
+    try:
+        return min(MAX_RETRY_AFTER, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class HostState:
+    def __init__(self, rate: float, burst: int, concurrency: float):
+        self.tokens = float(burst)
+        self.refilled = time.monotonic()
+        self.limit = concurrency
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_backoff = 0.0
+        self.failures = 0
+        self.circuit = "closed"  # closed / open / half_open
+        self.opened_at = 0.0
+        # (url, thread id) of the half-open probe while it is in flight
+        self.probe = None
+
+
+class FetchGovernor:
+    def __init__(self, rate: float = 8.0, burst: int = 16, min_concurrency: int = 1,
+                 max_concurrency: int = 16, slow_seconds: float = 5.0,
+                 failure_threshold: int = 5, cooldown: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.slow_seconds = slow_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.cond = threading.Condition()
+        self.hosts = {}
+        self.skips = {}
+
+    def host(self, url: str) -> HostState:
+        key = urlsplit(url).netloc
+        if key not in self.hosts:
+            self.hosts[key] = HostState(self.rate, self.burst, max(self.min_concurrency, self.max_concurrency / 2))
+        return self.hosts[key]
+
+    def acquire(self, url: str):
+        """
+        Wait for a rate token and a concurrency slot on url's host.
+        Returns None once both are held (release() must follow), or the
+        reason the URL is skipped without being sent.
+        """
+        with self.cond:
+            state = self.host(url)
+            while True:
+                now = time.monotonic()
+                if state.circuit == "open" and now - state.opened_at >= self.cooldown:
+                    state.circuit = "half_open"
+
+                if state.circuit == "open":
+                    reason = f"circuit open ({state.failures} consecutive failures)"
+                    self._skip(url, reason)
+                    return reason
+
+                state.tokens = min(self.burst, state.tokens + (now - state.refilled) * self.rate)
+                state.refilled = now
+
+                waits = []
+                if state.circuit == "half_open" and state.probe is not None:
+                    waits.append(self.cooldown)
+                if state.in_flight >= int(state.limit):
+                    waits.append(self.cooldown)
+                if now < state.paused_until:
+                    waits.append(state.paused_until - now)
+                if state.tokens < 1:
+                    waits.append((1 - state.tokens) / self.rate)
+
+                if not waits:
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    if state.circuit == "half_open":
+                        state.probe = (url, threading.get_ident())
+                    return None
+                # Woken early by release(); the wait is only an upper bound
+                self.cond.wait(min(waits))
+
+    def release(self, url: str, seconds: float, status=None, reason: str = None, retry_after=None):
+        """
+        Feed back one sent request. status is the HTTP status (None for a
+        connection error); reason, if given, records the URL as skipped.
+        """
+        with self.cond:
+            state = self.host(url)
+            now = time.monotonic()
+            state.in_flight -= 1
+            was_probe = state.probe == (url, threading.get_ident())
+            if was_probe:
+                state.probe = None
+
+            if overloaded(status):
+                state.failures += 1
+                if status == 429:
+                    state.paused_until = max(state.paused_until, now + retry_after_seconds(retry_after))
+                if was_probe or (state.circuit == "closed" and state.failures >= self.failure_threshold):
+                    if state.circuit != "open":
+                        ata_metrics.count("governor.circuit_opened")
+                    state.circuit = "open"
+                    state.opened_at = now
+                self._back_off(state, now)
+            else:
+                # A request sent before the circuit opened says nothing about
+                # the host now; only the probe closes it
+                if state.circuit == "closed" or was_probe:
+                    state.failures = 0
+                    state.circuit = "closed"
+                if seconds > self.slow_seconds:
+                    self._back_off(state, now)
+                elif status in (200, 304):
+                    state.limit = min(self.max_concurrency, state.limit + 1 / state.limit)
+
+            if reason:
+                self._skip(url, reason, status, seconds)
+            else:
+                self.skips.pop(url, None)
+            self.cond.notify_all()
+
+    def _back_off(self, state: HostState, now: float):
+        if now - state.last_backoff >= BACKOFF_INTERVAL:
+            state.limit = max(self.min_concurrency, state.limit / 2)
+            state.last_backoff = now
+            ata_metrics.count("governor.backoff")
+
+    def _skip(self, url: str, reason: str, status=None, seconds: float = None):
+        self.skips[url] = {
+            "url": url,
+            "reason": reason,
+            "status": status,
+            "seconds": round(seconds, 2) if seconds is not None else None,
+            "at": time.time(),
+        }
+        ata_metrics.count("governor.skipped")
+
+    def skipped(self, urls=None) -> list:
+        """Skip records (oldest first), optionally only for the given URLs."""
+        with self.cond:
+            records = list(self.skips.values()) if urls is None else [
+                self.skips[url] for url in urls if url in self.skips
+            ]
+        return sorted(records, key=lambda r: r["at"])
+
+    def status(self) -> list:
+        """One row per host: circuit state, concurrency limit, in-flight requests, tokens."""
+        with self.cond:
+            return [
+                {
+                    "host": host,
+                    "circuit": state.circuit,
+                    "limit": round(state.limit, 1),
+                    "in_flight": state.in_flight,
+                    "tokens": round(state.tokens, 1),
+                    "failures": state.failures,
+                }
+                for host, state in self.hosts.items()
+            ]
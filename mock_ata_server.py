@@ -0,0 +1,247 @@
+"""
+Local stand-in for the ATA standings site, for load and latency testing.
+
+    python mock_ata_server.py --port 8765 --latency-ms 300 --jitter-ms 200 --error-rate 0.05
+    ATA_BASE_URL=http://127.0.0.1:8765 streamlit run ata_dashboard.py
+
+Serves the URL shapes the dashboard builds:
+- /events/tournament-standings/worlds-standings/?code=XXXX
+- /events/tournament-standings/state-standings/?country=US&state=GA&code=XXXX
+- /events/tournament-standings/state-standings/?country=CA&state=on&code=XXXX&region=Ontario
+  (Canadian pages without region= come back empty, as on the real site)
+- /media/<id>/<name>.pdf  (team standings PDFs)
+- /__stats  (JSON request/error/byte counters; /__stats?reset=1 clears them)
+
+Pages are deterministic per URL (see ata_fixtures), or the recorded corpus
+with --replay. Latency, 5xx and 429 rates and page size are configurable.
+Like the real site, 200s carry an ETag and Last-Modified and conditional
+requests for an unchanged page get a 304; bodies are gzip- or (with the
+brotli package) brotli-encoded when the client accepts it.
+"""
+import argparse
+import email.utils
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import ata_fixtures
+from ata_pipeline import REGION_CODES
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STANDINGS_PATH = "/events/tournament-standings/"
+
+# Site chrome (navigation, scripts, footer) the real pages carry around the tables
+CHROME_UNIT = '<div class="nav-item"><a href="/events/">Events</a></div>\n'
+
+
+class MockConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 rows=25, padding=20000, replay=False, seed=0, compress=True, validators=True):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rows = rows
+        self.padding = padding
+        self.replay = replay
+        self.compress = compress
+        self.validators = validators
+        self.last_modified = email.utils.formatdate(time.time(), usegmt=True)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "ok": 0, "errors": 0, "throttled": 0, "not_found": 0, "unchanged": 0, "bytes": 0}
+
+    def count(self, key, nbytes=0):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+            self.stats["bytes"] += nbytes
+
+    def draw(self):
+        """(delay seconds, outcome) for one request: outcome is "ok", "error" or "throttled"."""
+        with self.lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self.rng.random()
+        if roll < self.error_rate:
+            return delay, "error"
+        if roll < self.error_rate + self.throttle_rate:
+            return delay, "throttled"
+        return delay, "ok"
+
+
+def standings_region(path: str, query: dict):
+    """Region (full name) the page is for, "World", or None for an empty page."""
+    if path.endswith("/worlds-standings/"):
+        return "World"
+    country = query.get("country", [""])[0].upper()
+    state = query.get("state", [""])[0].upper()
+    for region, (region_country, abbrev) in REGION_CODES.items():
+        if (region_country, abbrev) == (country, state):
+            # Canadian province pages only resolve with &region=
+            if country == "CA" and query.get("region", [""])[0].replace("+", " ") != region:
+                return None
+            return region
+    return None
+
+
+def render_standings(config: MockConfig, path: str, query: dict, url_key: str) -> bytes:
+    region = standings_region(path, query)
+    if region is None or not query.get("code"):
+        body = ata_fixtures.standings_html({})
+    else:
+        body = ata_fixtures.standings_page(url_key, config.rows, None if region == "World" else region)
+    chrome = CHROME_UNIT * (config.padding // len(CHROME_UNIT))
+    return body.replace("<body>", "<body>" + chrome, 1).encode("utf-8")
+
+
+def encode_body(body: bytes, accept_encoding: str):
+    """(body, Content-Encoding or None) for the client's Accept-Encoding."""
+    accepted = {token.split(";")[0].strip() for token in accept_encoding.lower().split(",")}
+    if brotli is not None and "br" in accepted:
+        return brotli.compress(body), "br"
+    if "gzip" in accepted:
+        return gzip.compress(body, mtime=0), "gzip"
+    return body, None
+
+
+def make_handler(config: MockConfig):
+    replayed = {}
+    if config.replay:
+        index = ata_fixtures.load_index()
+        for url, entry in index.items():
+            parts = urlsplit(url)
+            replayed[parts.path + ("?" + parts.query if parts.query else "")] = entry
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def send(self, status, body: bytes, content_type="text/html; charset=utf-8", headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+
+            if parts.path == "/__stats":
+                if query.get("reset"):
+                    config.reset_stats()
+                with config.lock:
+                    body = json.dumps(config.stats).encode("utf-8")
+                return self.send(200, body, "application/json")
+
+            delay, outcome = config.draw()
+            time.sleep(delay)
+
+            if outcome == "error":
+                config.count("errors")
+                return self.send(self.draw_error_status(), b"<html><body>Server Error</body></html>")
+            if outcome == "throttled":
+                config.count("throttled")
+                return self.send(429, b"<html><body>Too Many Requests</body></html>", headers=[("Retry-After", "1")])
+
+            entry = replayed.get(self.path)
+            if entry:
+                with open(f"{ata_fixtures.FIXTURE_DIR}/{entry['path']}", "rb") as f:
+                    body = f.read()
+                content_type = {"pdf": "application/pdf", "csv": "text/csv"}.get(entry["kind"], "text/html; charset=utf-8")
+            elif parts.path.startswith(STANDINGS_PATH):
+                body = render_standings(config, parts.path, query, self.path)
+                content_type = "text/html; charset=utf-8"
+            elif parts.path.startswith("/media/") and parts.path.endswith(".pdf"):
+                body = ata_fixtures.team_pdf(parts.path)
+                content_type = "application/pdf"
+            else:
+                config.count("not_found")
+                return self.send(404, b"<html><body>Not Found</body></html>")
+
+            headers = []
+            if config.validators:
+                etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                headers = [("ETag", etag), ("Last-Modified", config.last_modified)]
+                if_none_match = self.headers.get("If-None-Match")
+                if (if_none_match == etag if if_none_match
+                        else self.headers.get("If-Modified-Since") == config.last_modified):
+                    config.count("unchanged")
+                    return self.send(304, b"", content_type, headers)
+            if config.compress:
+                body, encoding = encode_body(body, self.headers.get("Accept-Encoding", ""))
+                headers.append(("Vary", "Accept-Encoding"))
+                if encoding:
+                    headers.append(("Content-Encoding", encoding))
+
+            config.count("ok", len(body))
+            self.send(200, body, content_type, headers)
+
+        def draw_error_status(self):
+            with config.lock:
+                return config.rng.choice([500, 502, 503])
+
+    return Handler
+
+
+def serve(config: MockConfig, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Start the server on a daemon thread and return it (server.shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-ata-server", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean response delay")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform +/- jitter on the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500/502/503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of 429 responses")
+    parser.add_argument("--rows", type=int, default=25, help="rows per event on each standings page")
+    parser.add_argument("--padding", type=int, default=20000, help="bytes of site chrome per page")
+    parser.add_argument("--replay", action="store_true", help="serve recorded fixtures where a URL was recorded")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency and error draws")
+    parser.add_argument("--no-compress", action="store_true", help="never gzip/brotli-encode bodies")
+    parser.add_argument("--no-validators", action="store_true", help="no ETag/Last-Modified, never 304")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, rows=args.rows, padding=args.padding,
+        replay=args.replay, seed=args.seed, compress=not args.no_compress,
+        validators=not args.no_validators,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"Mock ATA server on http://{args.host}:{args.port} (ATA_BASE_URL=http://{args.host}:{args.port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Text extraction and row parsing for the ATA team standings PDFs.
+
+Kept free of Streamlit so page extraction can run in worker processes:
+each worker opens the PDF from bytes and extracts a contiguous range of
+pages, and the lines are stitched back together in page order.
+"""
+import concurrent.futures
+import io
+import multiprocessing
+import os
+import threading
+
+import pdfplumber
+
+# Smaller PDFs are extracted in-process; starting a pool costs more than it saves
+PARALLEL_MIN_PAGES = 4
+
+TEAM_COLUMNS = ["Rank", "Team", "Points", "Location"]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Worker pool shared by every extraction, so workers are only started once."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the dashboard process is multi-threaded, which fork doesn't mix with
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def page_count(content: bytes) -> int:
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_lines(content: bytes, first: int, last: int) -> list:
+    """Stripped text lines of pages first..last-1."""
+    lines = []
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for page in pdf.pages[first:last]:
+            txt = page.extract_text()
+            if txt:
+                lines.extend(line.strip() for line in txt.split("\n"))
+    return lines
+
+
+def extract_lines(content: bytes, workers: int = None) -> list:
+    """Text lines of every page, extracted by a process pool for larger PDFs."""
+    pages = page_count(content)
+    workers = min(workers or os.cpu_count() or 1, pages)
+    if pages < PARALLEL_MIN_PAGES or workers < 2:
+        return extract_page_lines(content, 0, pages)
+
+    step = -(-pages // workers)
+    bounds = [(first, min(first + step, pages)) for first in range(0, pages, step)]
+    chunks = get_pool().map(
+        extract_page_lines,
+        [content] * len(bounds),
+        [first for first, _ in bounds],
+        [last for _, last in bounds],
+    )
+    return [line for chunk in chunks for line in chunk]
+
+
+def parse_team_lines(lines) -> list:
+    """Rows from lines that look like: Rank  Team  Points  Location."""
+    rows = []
+    for line in lines:
+        # crude pattern: number ... number ... state
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+
+        # first token must be rank
+        if not parts[0].isdigit():
+            continue
+
+        # second-to-last token is points
+        if not parts[-2].isdigit():
+            continue
+
+        rows.append({
+            "Rank": int(parts[0]),
+            # everything in the middle is team name
+            "Team": " ".join(parts[1:-2]),
+            "Points": int(parts[-2]),
+            # last token is state abbreviation or full name
+            "Location": parts[-1],
+        })
+    return rows
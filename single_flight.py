@@ -0,0 +1,62 @@
+"""
+In-flight request coalescing ("single flight").
+
+While one caller is computing a key, every other caller asking for the
+same key waits for that result instead of starting its own. Nothing is
+kept once the call finishes; caching stays with the layers that already
+do it. Used with one shared instance per server process (cache_resource),
+so concurrent sessions pulling the same standings URL share one fetch and
+one parse.
+"""
+import threading
+
+import ata_metrics
+
+
+class Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        fn(*args, **kwargs), run once for all concurrent callers of key.
+        Returns (result, shared); shared is True for callers that waited on
+        another caller's run. An exception is raised to every caller.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+
+        if not leader:
+            ata_metrics.cache_hit(self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        ata_metrics.cache_miss(self.name)
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls)
@@ -0,0 +1,587 @@
+"""
+Local SQLite store of parsed ATA standings.
+
+- snapshots / snapshot_rows: one snapshot per (division code, region, event)
+  each time that event's parsed rows change, so consecutive pulls can be
+  diffed row by row and unchanged events don't need to be re-ranked.
+- pages / standings: the warehouse, i.e. the current rows of every crawled
+  standings page, indexed for the dashboard's queries. A page is keyed by
+  division code, region and parser: report pages (PARSER_MULTI_EVENT, every
+  row re-ranked) and GROUPS pages (PARSER_STANDINGS, site ranks, no
+  zero-point rows) can share a URL but are stored separately. pages also
+  keeps the HTTP validators (ETag, Last-Modified) the page was served with,
+  for conditional re-fetches.
+- state_champions: materialized rank-1 (+ ties) rows of every state page,
+  refreshed only for pages whose content changed.
+- team_pdfs / team_rows: rows extracted from team standings PDFs, keyed by
+  the PDF's content hash so an unchanged file is never re-extracted.
+- crawl_runs: one row per crawler.py pass, so a read-only dashboard can
+  say how current its data is.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+import pandas as pd
+
+from ata_pipeline import normalize_name
+
+STORE_PATH = os.environ.get("ATA_STORE_PATH", "ata_standings.sqlite3")
+
+# Snapshots kept per (division code, region, event); older ones are pruned
+SNAPSHOT_KEEP = 10
+
+# How a warehouse page's rows were parsed (see the module docstring)
+PARSER_MULTI_EVENT = "multi_event"
+PARSER_STANDINGS = "standings"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    division_code TEXT NOT NULL,
+    region TEXT NOT NULL,
+    event TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    pulled_at REAL NOT NULL,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_key
+    ON snapshots (division_code, region, event, pulled_at);
+
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    location TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshot_rows_snapshot
+    ON snapshot_rows (snapshot_id);
+
+CREATE TABLE IF NOT EXISTS pages (
+    division_code TEXT NOT NULL,
+    region TEXT NOT NULL,
+    division TEXT NOT NULL,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    content_hash TEXT NOT NULL DEFAULT '',
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    page_bytes INTEGER NOT NULL DEFAULT 0,
+    parser TEXT NOT NULL DEFAULT 'multi_event',
+    PRIMARY KEY (division_code, region, parser)
+);
+
+CREATE TABLE IF NOT EXISTS standings (
+    division_code TEXT NOT NULL,
+    region TEXT NOT NULL,
+    parser TEXT NOT NULL DEFAULT 'multi_event',
+    event TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    location TEXT NOT NULL,
+    town TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_standings_page ON standings (division_code, region, parser);
+CREATE INDEX IF NOT EXISTS idx_standings_state ON standings (state, division_code);
+CREATE INDEX IF NOT EXISTS idx_standings_event ON standings (event, division_code);
+CREATE INDEX IF NOT EXISTS idx_standings_name ON standings (name_norm);
+CREATE INDEX IF NOT EXISTS idx_standings_points ON standings (division_code, event, points DESC);
+
+CREATE TABLE IF NOT EXISTS state_champions (
+    division_code TEXT NOT NULL,
+    region TEXT NOT NULL,
+    parser TEXT NOT NULL DEFAULT 'multi_event',
+    event TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    location TEXT NOT NULL,
+    town TEXT NOT NULL,
+    state TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_state_champions_page ON state_champions (division_code, region, parser);
+
+CREATE TABLE IF NOT EXISTS team_pdfs (
+    content_hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    extracted_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS team_rows (
+    content_hash TEXT NOT NULL REFERENCES team_pdfs (content_hash) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    team TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    location TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_team_rows_pdf ON team_rows (content_hash);
+
+CREATE TABLE IF NOT EXISTS crawl_runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    pages INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    failed INTEGER NOT NULL
+);
+"""
+
+# Columns added after a table was first created: (table, column, definition)
+MIGRATIONS = [
+    ("pages", "content_hash", "TEXT NOT NULL DEFAULT ''"),
+    ("pages", "etag", "TEXT NOT NULL DEFAULT ''"),
+    ("pages", "last_modified", "TEXT NOT NULL DEFAULT ''"),
+    ("pages", "page_bytes", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+CHAMPIONS_QUERY = """
+SELECT c.name AS Name, c.town AS Town, c.state AS State, c.event AS Event,
+       c.rank AS Rank, c.points AS Points, p.division AS Division,
+       c.division_code AS Code, c.region AS StateQueried, p.fetched_at AS "Fetched At"
+FROM state_champions c
+JOIN pages p ON p.division_code = c.division_code AND p.region = c.region AND p.parser = c.parser
+"""
+
+STANDINGS_QUERY = """
+SELECT p.division AS Division, s.division_code AS Code, s.region AS Region,
+       s.event AS Event, s.rank AS Rank, s.name AS Name, s.points AS Points,
+       s.location AS Location, s.town AS Town, s.state AS State,
+       p.fetched_at AS "Fetched At"
+FROM standings s
+JOIN pages p ON p.division_code = s.division_code AND p.region = s.region AND p.parser = s.parser
+"""
+
+DIFF_COLUMNS = [
+    "Event", "Name", "Location", "Change",
+    "Old Rank", "New Rank", "Old Points", "New Points",
+]
+
+
+def connect(path: str = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or STORE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    # Warehouse pages from before the parser column can't be attributed to
+    # a parser; they are dropped and simply re-crawled
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+    if existing and "parser" not in existing:
+        conn.executescript(
+            "DROP TABLE IF EXISTS pages; DROP TABLE IF EXISTS standings; DROP TABLE IF EXISTS state_champions;"
+        )
+    conn.executescript(SCHEMA)
+    for table, column, definition in MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return conn
+
+
+def event_hash(entries) -> str:
+    """Order-independent hash of an event's parsed (Name, Points, Location) rows."""
+    h = hashlib.sha1()
+    for name, points, location in sorted(
+        (e["Name"], e["Points"], e["Location"]) for e in entries
+    ):
+        h.update(f"{name}\x1f{points}\x1f{location}\x1e".encode("utf-8"))
+    return h.hexdigest()
+
+
+def latest_snapshots(conn, division_code: str, region: str) -> dict:
+    """{event: (snapshot_id, content_hash)} for the newest snapshot of each event."""
+    rows = conn.execute(
+        """
+        SELECT s.event, s.id, s.content_hash
+        FROM snapshots s
+        WHERE s.division_code = ? AND s.region = ?
+          AND s.pulled_at = (
+              SELECT MAX(pulled_at) FROM snapshots
+              WHERE division_code = s.division_code
+                AND region = s.region
+                AND event = s.event
+          )
+        """,
+        (division_code, region),
+    ).fetchall()
+    return {event: (snapshot_id, content_hash) for event, snapshot_id, content_hash in rows}
+
+
+def load_snapshot_rows(conn, snapshot_id: int) -> list:
+    rows = conn.execute(
+        "SELECT rank, name, points, location FROM snapshot_rows WHERE snapshot_id = ? ORDER BY rowid",
+        (snapshot_id,),
+    ).fetchall()
+    return [
+        {"Rank": rank, "Name": name, "Points": points, "Location": location}
+        for rank, name, points, location in rows
+    ]
+
+
+def record_snapshot(conn, division_code: str, region: str, event: str,
+                    content_hash: str, ranked_entries, pulled_at: float = None) -> int:
+    pulled_at = pulled_at or time.time()
+    cur = conn.execute(
+        """
+        INSERT INTO snapshots (division_code, region, event, content_hash, pulled_at, checked_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (division_code, region, event, content_hash, pulled_at, pulled_at),
+    )
+    snapshot_id = cur.lastrowid
+    conn.executemany(
+        "INSERT INTO snapshot_rows (snapshot_id, rank, name, points, location) VALUES (?, ?, ?, ?, ?)",
+        [(snapshot_id, e["Rank"], e["Name"], e["Points"], e["Location"]) for e in ranked_entries],
+    )
+    conn.execute(
+        """
+        DELETE FROM snapshots
+        WHERE division_code = ? AND region = ? AND event = ?
+          AND id NOT IN (
+              SELECT id FROM snapshots
+              WHERE division_code = ? AND region = ? AND event = ?
+              ORDER BY pulled_at DESC LIMIT ?
+          )
+        """,
+        (division_code, region, event, division_code, region, event, SNAPSHOT_KEEP),
+    )
+    return snapshot_id
+
+
+def mark_checked(conn, snapshot_ids, checked_at: float = None):
+    """Record that unchanged snapshots were confirmed by a newer pull."""
+    checked_at = checked_at or time.time()
+    conn.executemany(
+        "UPDATE snapshots SET checked_at = ? WHERE id = ?",
+        [(checked_at, snapshot_id) for snapshot_id in snapshot_ids],
+    )
+
+
+def diff_rows(old_rows, new_rows, event: str = "") -> pd.DataFrame:
+    """
+    Row-level changes between two snapshots of one event, matching
+    competitors on (lowercased name, location): New, Dropped, Points, Rank.
+    """
+    cols = ["key", "Name", "Location", "Rank", "Points"]
+
+    def frame(rows):
+        df = pd.DataFrame(rows, columns=["Rank", "Name", "Points", "Location"])
+        df["key"] = df["Name"].str.lower() + "\x1f" + df["Location"]
+        return df[cols].drop_duplicates("key")
+
+    merged = frame(old_rows).merge(
+        frame(new_rows), on="key", how="outer", suffixes=(" old", " new"), indicator=True
+    )
+
+    change = pd.Series("", index=merged.index)
+    change[merged["_merge"] == "right_only"] = "New"
+    change[merged["_merge"] == "left_only"] = "Dropped"
+    both = merged["_merge"] == "both"
+    change[both & (merged["Rank old"] != merged["Rank new"])] = "Rank"
+    change[both & (merged["Points old"] != merged["Points new"])] = "Points"
+
+    out = pd.DataFrame({
+        "Event": event,
+        "Name": merged["Name new"].fillna(merged["Name old"]),
+        "Location": merged["Location new"].fillna(merged["Location old"]),
+        "Change": change,
+        "Old Rank": merged["Rank old"],
+        "New Rank": merged["Rank new"],
+        "Old Points": merged["Points old"],
+        "New Points": merged["Points new"],
+    })
+    out = out[out["Change"] != ""]
+    return out.sort_values(["New Rank", "Old Rank"]).reset_index(drop=True)[DIFF_COLUMNS]
+
+
+def latest_diff(conn, division_code: str, region: str) -> pd.DataFrame:
+    """Changes between the two newest snapshots of every event on one page."""
+    events = conn.execute(
+        "SELECT DISTINCT event FROM snapshots WHERE division_code = ? AND region = ?",
+        (division_code, region),
+    ).fetchall()
+
+    diffs = []
+    for (event,) in events:
+        ids = conn.execute(
+            """
+            SELECT id FROM snapshots
+            WHERE division_code = ? AND region = ? AND event = ?
+            ORDER BY pulled_at DESC LIMIT 2
+            """,
+            (division_code, region, event),
+        ).fetchall()
+        if len(ids) < 2:
+            continue
+        new_rows = load_snapshot_rows(conn, ids[0][0])
+        old_rows = load_snapshot_rows(conn, ids[1][0])
+        diffs.append(diff_rows(old_rows, new_rows, event))
+
+    if not diffs:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    return pd.concat(diffs, ignore_index=True)
+
+
+# --- WAREHOUSE ---
+def page_hash(rows) -> str:
+    """Order-independent hash of a page's (Event, Rank, Name, Points, Location) rows."""
+    h = hashlib.sha1()
+    for row in sorted(
+        (r["Event"], int(r["Rank"]), r["Name"], int(r["Points"]), r["Location"]) for r in rows
+    ):
+        h.update("\x1f".join(map(str, row)).encode("utf-8") + b"\x1e")
+    return h.hexdigest()
+
+
+def replace_page(conn, division_code: str, region: str, division: str, url: str,
+                 rows, fetched_at: float = None, etag: str = "", last_modified: str = "",
+                 page_bytes: int = 0, parser: str = PARSER_MULTI_EVENT) -> bool:
+    """
+    Replace the warehouse rows of one standings page as parsed by parser.
+    rows are dicts with Event, Rank, Name, Points, Location, Town and State;
+    etag/last_modified are the response's validators and page_bytes its
+    decoded size. If the content is unchanged only the fetch time and
+    validators are updated. Returns True if it changed.
+    """
+    fetched_at = fetched_at or time.time()
+    rows = list(rows)
+    content_hash = page_hash(rows)
+
+    with conn:
+        current = conn.execute(
+            "SELECT content_hash FROM pages WHERE division_code = ? AND region = ? AND parser = ?",
+            (division_code, region, parser),
+        ).fetchone()
+        if current and current[0] == content_hash:
+            conn.execute(
+                """
+                UPDATE pages SET fetched_at = ?, url = ?, division = ?,
+                                 etag = ?, last_modified = ?, page_bytes = ?
+                WHERE division_code = ? AND region = ? AND parser = ?
+                """,
+                (fetched_at, url, division, etag, last_modified, page_bytes, division_code, region, parser),
+            )
+            return False
+
+        conn.execute(
+            "DELETE FROM standings WHERE division_code = ? AND region = ? AND parser = ?",
+            (division_code, region, parser),
+        )
+        conn.executemany(
+            """
+            INSERT INTO standings
+                (division_code, region, parser, event, rank, name, name_norm, points, location, town, state)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    division_code, region, parser, r["Event"], int(r["Rank"]), r["Name"],
+                    normalize_name(r["Name"]), int(r["Points"]), r["Location"],
+                    r["Town"], r["State"],
+                )
+                for r in rows
+            ],
+        )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO pages
+                (division_code, region, parser, division, url, fetched_at, content_hash,
+                 etag, last_modified, page_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (division_code, region, parser, division, url, fetched_at, content_hash,
+             etag, last_modified, page_bytes),
+        )
+        if region != "World":
+            refresh_champions(conn, division_code, region, parser)
+    return True
+
+
+def refresh_champions(conn, division_code: str, region: str, parser: str = PARSER_MULTI_EVENT):
+    """Recompute the state_champions slice of one page: best rank (+ ties) per event."""
+    conn.execute(
+        "DELETE FROM state_champions WHERE division_code = ? AND region = ? AND parser = ?",
+        (division_code, region, parser),
+    )
+    conn.execute(
+        """
+        INSERT INTO state_champions
+            (division_code, region, parser, event, rank, name, points, location, town, state)
+        WITH best AS (
+            -- Pinned to the page index: the planner otherwise picks
+            -- idx_standings_points and scans every region of the division
+            SELECT event, MIN(rank) AS rank
+            FROM standings INDEXED BY idx_standings_page
+            WHERE division_code = ? AND region = ? AND parser = ?
+            GROUP BY event
+        )
+        SELECT s.division_code, s.region, s.parser, s.event, s.rank, s.name, s.points,
+               s.location, s.town, s.state
+        FROM standings s
+        JOIN best b ON s.event = b.event AND s.rank = b.rank
+        WHERE s.division_code = ? AND s.region = ? AND s.parser = ?
+        """,
+        (division_code, region, parser, division_code, region, parser),
+    )
+
+
+def query_champions(conn, pages, parser: str = PARSER_MULTI_EVENT) -> pd.DataFrame:
+    """Materialized state champions for a list of (division_code, region) pages."""
+    pages = list(pages)
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_pages (division_code TEXT, region TEXT)")
+    conn.execute("DELETE FROM wanted_pages")
+    conn.executemany("INSERT INTO wanted_pages VALUES (?, ?)", pages)
+    return pd.read_sql_query(
+        CHAMPIONS_QUERY
+        + " JOIN wanted_pages w ON w.division_code = c.division_code AND w.region = c.region"
+        + " WHERE c.parser = ?"
+        + " ORDER BY c.region, p.division, c.event, c.rank",
+        conn,
+        params=(parser,),
+    )
+
+
+def load_team_rows(conn, content_hash: str):
+    """Extracted rows of a team PDF as Rank/Team/Points/Location, or None if never extracted."""
+    if not conn.execute(
+        "SELECT 1 FROM team_pdfs WHERE content_hash = ?", (content_hash,)
+    ).fetchone():
+        return None
+    return pd.read_sql_query(
+        """
+        SELECT rank AS Rank, team AS Team, points AS Points, location AS Location
+        FROM team_rows WHERE content_hash = ? ORDER BY rowid
+        """,
+        conn,
+        params=(content_hash,),
+    )
+
+
+def save_team_rows(conn, content_hash: str, url: str, rows, extracted_at: float = None):
+    """Store the rows extracted from one team PDF (rows are Rank/Team/Points/Location dicts)."""
+    with conn:
+        conn.execute("DELETE FROM team_rows WHERE content_hash = ?", (content_hash,))
+        conn.execute(
+            "INSERT OR REPLACE INTO team_pdfs (content_hash, url, extracted_at) VALUES (?, ?, ?)",
+            (content_hash, url, extracted_at or time.time()),
+        )
+        conn.executemany(
+            "INSERT INTO team_rows (content_hash, rank, team, points, location) VALUES (?, ?, ?, ?, ?)",
+            [(content_hash, r["Rank"], r["Team"], r["Points"], r["Location"]) for r in rows],
+        )
+
+
+def latest_team_rows(conn, url: str):
+    """Rows of the most recently extracted PDF from url, or None if it was never extracted."""
+    row = conn.execute(
+        "SELECT content_hash FROM team_pdfs WHERE url = ? ORDER BY extracted_at DESC LIMIT 1",
+        (url,),
+    ).fetchone()
+    return load_team_rows(conn, row[0]) if row else None
+
+
+def record_crawl(conn, started_at: float, finished_at: float, pages: int, ok: int, failed: int):
+    with conn:
+        conn.execute(
+            "INSERT INTO crawl_runs (started_at, finished_at, pages, ok, failed) VALUES (?, ?, ?, ?, ?)",
+            (started_at, finished_at, pages, ok, failed),
+        )
+
+
+def last_crawl(conn):
+    """The newest crawl_runs row as a dict, or None if the crawler never ran."""
+    row = conn.execute(
+        "SELECT started_at, finished_at, pages, ok, failed FROM crawl_runs ORDER BY finished_at DESC LIMIT 1"
+    ).fetchone()
+    if not row:
+        return None
+    return dict(zip(["started_at", "finished_at", "pages", "ok", "failed"], row))
+
+
+def fresh_pages(conn, max_age: float, now: float = None, parser: str = PARSER_MULTI_EVENT) -> set:
+    """(division_code, region) of every page parsed by parser and fetched within max_age seconds."""
+    now = now or time.time()
+    rows = conn.execute(
+        "SELECT division_code, region FROM pages WHERE fetched_at >= ? AND parser = ?",
+        (now - max_age, parser),
+    ).fetchall()
+    return set(rows)
+
+
+def page_validators(conn, division_code: str, region: str, url: str, parser: str = PARSER_MULTI_EVENT):
+    """
+    (etag, last_modified, page_bytes) the stored copy of a page was served
+    with, or None when there is no stored copy of this URL from parser or
+    it came without validators.
+    """
+    row = conn.execute(
+        """
+        SELECT etag, last_modified, page_bytes FROM pages
+        WHERE division_code = ? AND region = ? AND parser = ? AND url = ?
+        """,
+        (division_code, region, parser, url),
+    ).fetchone()
+    if not row or not (row[0] or row[1]):
+        return None
+    return row
+
+
+def touch_page(conn, division_code: str, region: str, fetched_at: float = None,
+               parser: str = PARSER_MULTI_EVENT):
+    """Mark a page fetched now without changing its rows (the site answered 304)."""
+    with conn:
+        conn.execute(
+            "UPDATE pages SET fetched_at = ? WHERE division_code = ? AND region = ? AND parser = ?",
+            (fetched_at or time.time(), division_code, region, parser),
+        )
+
+
+def expire_pages(conn):
+    """Mark every warehouse page stale so the next read re-crawls it."""
+    with conn:
+        conn.execute("UPDATE pages SET fetched_at = 0")
+
+
+def query_pages(conn, pages, parser: str = PARSER_MULTI_EVENT) -> pd.DataFrame:
+    """Warehouse rows for a list of (division_code, region) pages as parsed by parser."""
+    pages = list(pages)
+    if not pages:
+        return pd.read_sql_query(STANDINGS_QUERY + " WHERE 0", conn)
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_pages (division_code TEXT, region TEXT)")
+    conn.execute("DELETE FROM wanted_pages")
+    conn.executemany("INSERT INTO wanted_pages VALUES (?, ?)", pages)
+    return pd.read_sql_query(
+        STANDINGS_QUERY
+        + " JOIN wanted_pages w ON w.division_code = s.division_code AND w.region = s.region"
+        + " WHERE s.parser = ?"
+        + " ORDER BY s.division_code, s.region, s.event, s.rank",
+        conn,
+        params=(parser,),
+    )
+
+
+def search_competitor(conn, name_query: str, limit: int = 1000) -> pd.DataFrame:
+    """
+    Every crawled standing for a competitor, across all divisions and
+    regions. A page stored by both parsers is listed once, from the
+    multi-event copy.
+    """
+    norm = normalize_name(name_query)
+    return pd.read_sql_query(
+        STANDINGS_QUERY
+        + """
+        WHERE s.name_norm LIKE ?
+          AND (s.parser = ? OR NOT EXISTS (
+              SELECT 1 FROM pages m
+              WHERE m.division_code = s.division_code AND m.region = s.region AND m.parser = ?
+          ))
+        ORDER BY s.name_norm, p.division, s.region, s.event LIMIT ?
+        """,
+        conn,
+        params=(f"%{norm}%", PARSER_MULTI_EVENT, PARSER_MULTI_EVENT, limit),
+    )
+
@@ -0,0 +1,149 @@
+import pandas as pd
+import pytest
+
+from ata_pipeline import (
+    TRADITIONAL_COLUMNS,
+    collate_district_tables,
+    collate_qualifiers,
+    identity_key,
+    identity_keys,
+    normalize_name,
+    one_edit_apart,
+    parse_names,
+    resolve_identities,
+    standings_frame,
+)
+
+MACON = normalize_name("Macon, GA")
+
+
+def same_competitor(a: str, b: str, location: str = MACON) -> bool:
+    ids = resolve_identities([(identity_key(a), location), (identity_key(b), location)], {}, {})
+    return ids[(identity_key(a), location)] == ids[(identity_key(b), location)]
+
+
+def test_identity_key_keeps_suffix():
+    assert identity_key("John Smith, Jr.") == "john smith jr"
+    assert identity_key("  MARY   O'Neil ") == "mary o neil"
+    keys = identity_keys(pd.Series(["John Smith", None, " "]))
+    assert keys.iloc[0] == "john smith"
+    assert keys.iloc[1:].isna().all()
+
+
+def test_parse_names_suffixes():
+    parsed = parse_names(pd.Series(["John Smith Jr.", "Bob Lee III", "Mary Jo Smith"]))
+    assert parsed["Suffix"].tolist() == ["Jr.", "III", ""]
+    assert parsed["Last Name"].tolist() == ["Smith", "Lee", "Smith"]
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("garcia", "garcai", True),
+    ("hansen", "hanson", True),
+    ("hansen", "hansenn", True),
+    ("hansen", "hansen", False),
+    ("hansen", "hanso", False),
+    ("smith", "josmith", False),
+])
+def test_one_edit_apart(a, b, expected):
+    assert one_edit_apart(a, b) is expected
+    assert one_edit_apart(b, a) is expected
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Linda Garcia", "Linda Garcai"),
+    ("Karen Hansen", "Karen Hanson"),
+    ("Jon Garcia", "John Garcia"),
+    ("Bob O'Neil", "Robert ONeil"),
+    ("John Smith Jr", "John Smith, Jr."),
+])
+def test_variants_merge_at_same_location(a, b):
+    assert same_competitor(a, b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("John Smith", "Joan Smith"),
+    ("Carl Miller", "Carla Miller"),
+    ("Mary Jones", "Mary Jonas"),
+    ("Mary Jo Smith", "Mary Smith"),
+    ("John Smith Jr.", "John Smith"),
+    ("John Smith Jr.", "John Smith Sr."),
+])
+def test_different_people_stay_apart(a, b):
+    assert not same_competitor(a, b)
+
+
+def test_fuzzy_merge_needs_location():
+    assert not same_competitor("Karen Hansen", "Karen Hanson", location="")
+    ids = resolve_identities(
+        [("karen hansen", MACON), ("karen hanson", normalize_name("Athens, GA"))], {}, {}
+    )
+    assert len(set(ids.values())) == 2
+    assert same_competitor("Karen Hansen", "karen hansen!", location="")
+
+
+def test_unlocated_spelling_reuses_located_match():
+    ids = resolve_identities([("jon garcia", ""), ("john garcia", MACON), ("jon garcia", MACON)], {}, {})
+    assert len(set(ids.values())) == 1
+
+
+def test_registry_ids_are_stable():
+    ids, blocks = {}, {}
+    first = resolve_identities([("linda garcia", MACON)], ids, blocks)
+    second = resolve_identities([("linda garcai", MACON), ("linda garcia", "")], ids, blocks)
+    assert set(second.values()) == set(first.values())
+
+
+def results_frame(rows, division="Div A"):
+    """standings_frame rows from (event, rank, name, points, location) tuples."""
+    ranked = {}
+    for event, rank, name, points, location in rows:
+        ranked.setdefault(event, []).append({"Name": name, "Location": location, "Rank": rank, "Points": points})
+    return standings_frame(ranked).assign(Division=division)
+
+
+def test_collate_district_tables_pivots_events():
+    results = results_frame([
+        ("Forms", 1, "Mary Smith", 50, "Macon, GA"),
+        ("Sparring", 3, "Mary Smith", 20, "Macon, GA"),
+        ("Creative Forms", 2, "Bob Lee Jr.", 30, "Rome, GA"),
+        ("Weapons", 5, "Ann Adams", 10, "Athens, GA"),
+    ])
+    trad, creative = collate_district_tables(results)
+
+    assert trad.columns.tolist() == ["Last Name", "First Name"] + [c for c, _ in TRADITIONAL_COLUMNS.values()]
+    assert trad[["Last Name", "First Name"]].values.tolist() == [["Adams", "Ann"], ["Smith", "Mary"]]
+    mary = trad.iloc[1]
+    assert (mary["Traditional Forms"], mary["Traditional Sparring"], mary["Traditional Weapons"]) == (
+        "FORMS", "SPARRING", "None"
+    )
+    assert creative[["Last Name", "First Name", "Creative Forms"]].values.tolist() == [["Lee Jr.", "Bob", "ATA-CF"]]
+
+
+def test_collate_district_tables_by_division():
+    results = pd.concat([
+        results_frame([("Forms", 1, "Mary Smith", 50, "Macon, GA")], "Div B"),
+        results_frame([("Forms", 2, "Mary Smith", 40, "Macon, GA")], "Div A"),
+    ], ignore_index=True)
+    merged, _ = collate_district_tables(results)
+    split, _ = collate_district_tables(results, by_division=True)
+    assert len(merged) == 1
+    assert split[["Division", "Last Name"]].values.tolist() == [["Div A", "Smith"], ["Div B", "Smith"]]
+
+
+def test_collate_district_tables_empty():
+    trad, creative = collate_district_tables(results_frame([]).iloc[:0], by_division=True)
+    assert trad.empty and creative.empty
+    assert trad.columns[0] == "Division"
+
+
+def test_collate_qualifiers_orders_events_and_names():
+    results = results_frame([
+        ("Sparring", 1, "Mary Smith", 50, "Macon, GA"),
+        ("Forms", 4, "Mary Smith", 20, "Macon, GA"),
+        ("Weapons", 2, "Ann Adams", 30, "Athens, GA"),
+    ])
+    df = collate_qualifiers(results)
+    assert df.columns.tolist() == ["Name", "Town", "State", "Division", "Events"]
+    assert df["Name"].tolist() == ["Ann Adams", "Mary Smith"]
+    assert df.loc[1, "Events"] == "Forms<br>Sparring"
+    assert (df["State"] == "GA").all()
@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pytest
+
+import fetch_governor
+from fetch_governor import FetchGovernor, backoff_delay, overloaded, retry_after_seconds
+
+URL = "https://host.test/page"
+
+
+def open_circuit(governor: FetchGovernor, url: str = URL):
+    for _ in range(governor.failure_threshold):
+        assert governor.acquire(url) is None
+        governor.release(url, 0.1, 503)
+
+
+def test_overloaded():
+    assert overloaded(None)
+    assert overloaded(429)
+    assert overloaded(503)
+    assert not overloaded(200)
+    assert not overloaded(304)
+    assert not overloaded(404)
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds(None) == 0.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("-5") == 0.0
+    assert retry_after_seconds("3600") == fetch_governor.MAX_RETRY_AFTER
+
+
+def test_backoff_delay_is_capped():
+    class Top:
+        def uniform(self, low, high):
+            return high
+
+    assert backoff_delay(1, rng=Top()) == 0.5
+    assert backoff_delay(3, rng=Top()) == 2.0
+    assert backoff_delay(20, rng=Top()) == 8.0
+
+
+def test_token_bucket_burst_then_rate():
+    governor = FetchGovernor(rate=20, burst=3, max_concurrency=16)
+    started = time.monotonic()
+    for _ in range(3):
+        assert governor.acquire(URL) is None
+        governor.release(URL, 0.01, 200)
+    assert time.monotonic() - started < 0.04
+
+    # The burst is spent: each further token takes 1/rate seconds
+    started = time.monotonic()
+    for _ in range(2):
+        assert governor.acquire(URL) is None
+        governor.release(URL, 0.01, 200)
+    assert time.monotonic() - started >= 0.08
+
+
+def test_concurrency_limit_blocks_until_release():
+    governor = FetchGovernor(rate=1000, burst=100, min_concurrency=1, max_concurrency=2)
+    assert governor.acquire(URL) is None  # limit starts at max_concurrency / 2 = 1
+    acquired = threading.Event()
+
+    def second():
+        governor.acquire(URL)
+        acquired.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not acquired.wait(0.1)
+    governor.release(URL, 0.01, 200)
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_backoff_halves_limit_and_success_grows_it():
+    governor = FetchGovernor(rate=1000, burst=100, max_concurrency=16)
+    assert governor.acquire(URL) is None
+    governor.release(URL, 0.01, 503)
+    assert governor.status()[0]["limit"] == 4
+
+    assert governor.acquire(URL) is None
+    governor.release(URL, 0.01, 200)
+    assert governor.status()[0]["limit"] == 4.2
+
+
+def test_retry_after_pauses_host():
+    governor = FetchGovernor(rate=1000, burst=100)
+    assert governor.acquire(URL) is None
+    governor.release(URL, 0.01, 429, retry_after="0.2")
+    started = time.monotonic()
+    assert governor.acquire(URL) is None
+    assert time.monotonic() - started >= 0.15
+
+
+def test_circuit_opens_after_threshold_and_skips():
+    governor = FetchGovernor(rate=1000, burst=100, failure_threshold=3, cooldown=60)
+    open_circuit(governor)
+    assert governor.status()[0]["circuit"] == "open"
+
+    reason = governor.acquire(URL)
+    assert reason.startswith("circuit open")
+    assert [record["url"] for record in governor.skipped()] == [URL]
+
+
+def test_probe_closes_or_reopens_circuit():
+    governor = FetchGovernor(rate=1000, burst=100, failure_threshold=2, cooldown=0.05)
+    open_circuit(governor)
+    time.sleep(0.06)
+
+    assert governor.acquire(URL) is None
+    assert governor.status()[0]["circuit"] == "half_open"
+    governor.release(URL, 0.01, 503)
+    assert governor.status()[0]["circuit"] == "open"
+
+    time.sleep(0.06)
+    assert governor.acquire(URL) is None
+    governor.release(URL, 0.01, 200)
+    assert governor.status()[0]["circuit"] == "closed"
+    assert governor.skipped() == []
+
+
+def test_only_one_probe_in_flight():
+    governor = FetchGovernor(rate=1000, burst=100, failure_threshold=2, cooldown=0.05)
+    open_circuit(governor)
+    time.sleep(0.06)
+    assert governor.acquire(URL) is None
+    second = threading.Event()
+
+    def waiter():
+        governor.acquire(URL + "?other")
+        second.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not second.wait(0.1)
+    governor.release(URL, 0.01, 200)
+    assert second.wait(1)
+    thread.join()
+
+
+@pytest.mark.parametrize("status", [200, 503])
+def test_stale_release_does_not_decide_half_open(status):
+    """A request sent before the circuit opened finishing during the probe."""
+    governor = FetchGovernor(rate=1000, burst=100, max_concurrency=16, failure_threshold=2, cooldown=0.05)
+    straggler = URL + "?slow"
+    assert governor.acquire(straggler) is None
+    open_circuit(governor)
+    time.sleep(0.06)
+
+    probe_sent = threading.Event()
+    finish_probe = threading.Event()
+
+    def probe():
+        assert governor.acquire(URL) is None
+        probe_sent.set()
+        finish_probe.wait(1)
+        governor.release(URL, 0.01, 503)
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    assert probe_sent.wait(1)
+
+    governor.release(straggler, 0.01, status)
+    assert governor.status()[0]["circuit"] == "half_open"
+
+    finish_probe.set()
+    thread.join()
+    assert governor.status()[0]["circuit"] == "open"
+
+
+def test_same_url_other_thread_is_not_the_probe():
+    governor = FetchGovernor(rate=1000, burst=100, max_concurrency=16, failure_threshold=2, cooldown=0.05)
+    assert governor.acquire(URL) is None  # sent before the circuit opens
+    open_circuit(governor)
+    time.sleep(0.06)
+
+    probe_sent = threading.Event()
+    finish_probe = threading.Event()
+
+    def probe():
+        assert governor.acquire(URL) is None
+        probe_sent.set()
+        finish_probe.wait(1)
+        governor.release(URL, 0.01, 200)
+
+    thread = threading.Thread(target=probe)
+    thread.start()
+    assert probe_sent.wait(1)
+    governor.release(URL, 0.01, 503)
+    assert governor.status()[0]["circuit"] == "half_open"
+
+    finish_probe.set()
+    thread.join()
+    assert governor.status()[0]["circuit"] == "closed"
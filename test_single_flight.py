@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_sequential_calls_are_not_shared():
+    flight = SingleFlight("test")
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (2, False)
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def slow(value):
+        calls.append(value)
+        release.wait(1)
+        return value * 2
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow, 21)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.001)
+    time.sleep(0.2)  # let the followers reach the wait
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [21]
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flight.in_flight() == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    barrier = threading.Barrier(2, timeout=1)
+
+    def both_running(key):
+        barrier.wait()  # deadlocks (and times out) if the keys were coalesced
+        return key
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda key=key: results.update({key: flight.do(key, both_running, key)}))
+        for key in ("a", "b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"a": ("a", False), "b": ("b", False)}
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(1)
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2 and errors[0] is errors[1]
+    assert flight.do("k", lambda: "ok") == ("ok", False)
+    with pytest.raises(ValueError):
+        flight.do("k", failing)
@@ -0,0 +1,156 @@
+import sqlite3
+
+import pytest
+
+import standings_store
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = standings_store.connect(str(tmp_path / "store.sqlite3"))
+    yield conn
+    conn.close()
+
+
+def entries(*rows):
+    return [{"Rank": rank, "Name": name, "Points": points, "Location": location}
+            for rank, name, points, location in rows]
+
+
+# --- SNAPSHOTS ---
+def test_event_hash_ignores_order():
+    rows = entries((1, "Mary Smith", 50, "Macon, GA"), (2, "Sue Brown", 40, "Athens, GA"))
+    assert standings_store.event_hash(rows) == standings_store.event_hash(rows[::-1])
+    changed = entries((1, "Mary Smith", 55, "Macon, GA"), (2, "Sue Brown", 40, "Athens, GA"))
+    assert standings_store.event_hash(rows) != standings_store.event_hash(changed)
+
+
+def test_latest_snapshots_and_pruning(conn):
+    for pulled_at in range(1, standings_store.SNAPSHOT_KEEP + 3):
+        rows = entries((1, "Mary Smith", pulled_at, "Macon, GA"))
+        standings_store.record_snapshot(
+            conn, "A01", "Georgia", "Forms", standings_store.event_hash(rows), rows, pulled_at=pulled_at
+        )
+    standings_store.record_snapshot(conn, "A01", "Georgia", "Sparring", "h", [], pulled_at=5)
+
+    latest = standings_store.latest_snapshots(conn, "A01", "Georgia")
+    assert set(latest) == {"Forms", "Sparring"}
+    assert standings_store.load_snapshot_rows(conn, latest["Forms"][0])[0]["Points"] == standings_store.SNAPSHOT_KEEP + 2
+    kept = conn.execute("SELECT COUNT(*) FROM snapshots WHERE event = 'Forms'").fetchone()[0]
+    assert kept == standings_store.SNAPSHOT_KEEP
+
+
+def test_diff_rows():
+    old = entries((1, "Mary Smith", 50, "Macon, GA"), (2, "Sue Brown", 40, "Athens, GA"),
+                  (3, "Ann Lee", 30, "Rome, GA"))
+    new = entries((1, "Sue Brown", 60, "Athens, GA"), (2, "MARY SMITH", 50, "Macon, GA"),
+                  (3, "Kim Park", 35, "Rome, GA"))
+    diff = standings_store.diff_rows(old, new, "Forms")
+    changes = dict(zip(diff["Name"], diff["Change"]))
+    assert changes == {"Sue Brown": "Points", "MARY SMITH": "Rank", "Kim Park": "New", "Ann Lee": "Dropped"}
+    assert (diff["Event"] == "Forms").all()
+    assert list(diff.columns) == standings_store.DIFF_COLUMNS
+
+
+def test_latest_diff_needs_two_snapshots(conn):
+    first = entries((1, "Mary Smith", 50, "Macon, GA"))
+    standings_store.record_snapshot(conn, "A01", "Georgia", "Forms", "h1", first, pulled_at=1)
+    assert standings_store.latest_diff(conn, "A01", "Georgia").empty
+
+    second = entries((1, "Mary Smith", 70, "Macon, GA"))
+    standings_store.record_snapshot(conn, "A01", "Georgia", "Forms", "h2", second, pulled_at=2)
+    diff = standings_store.latest_diff(conn, "A01", "Georgia")
+    assert diff[["Name", "Change", "Old Points", "New Points"]].values.tolist() == [["Mary Smith", "Points", 50, 70]]
+
+
+# --- WAREHOUSE ---
+def page_rows(*rows):
+    return [
+        {"Event": event, "Rank": rank, "Name": name, "Points": points, "Location": location,
+         "Town": location.split(",")[0], "State": location.split(", ")[1]}
+        for event, rank, name, points, location in rows
+    ]
+
+
+GEORGIA = page_rows(
+    ("Forms", 1, "Mary Smith", 50, "Macon, GA"),
+    ("Forms", 1, "Sue Brown", 50, "Athens, GA"),
+    ("Forms", 3, "Ann Lee", 30, "Rome, GA"),
+    ("Sparring", 2, "Ann Lee", 20, "Rome, GA"),
+)
+
+
+def test_replace_page_skips_unchanged_content(conn):
+    assert standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA, fetched_at=1, etag='"a"')
+    assert not standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA[::-1], fetched_at=2, etag='"b"')
+
+    assert standings_store.fresh_pages(conn, 10, now=5) == {("A01", "Georgia")}
+    assert standings_store.page_validators(conn, "A01", "Georgia", "u") == ('"b"', "", 0)
+    assert len(standings_store.query_pages(conn, [("A01", "Georgia")])) == len(GEORGIA)
+
+    changed = GEORGIA[:-1]
+    assert standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", changed, fetched_at=3)
+    assert len(standings_store.query_pages(conn, [("A01", "Georgia")])) == len(changed)
+
+
+def test_page_validators(conn):
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA,
+                                 etag="", last_modified="Mon, 01 Jan 2024 00:00:00 GMT", page_bytes=1234)
+    standings_store.replace_page(conn, "A01", "Florida", "Div A", "f", GEORGIA)
+    assert standings_store.page_validators(conn, "A01", "Georgia", "u") == ("", "Mon, 01 Jan 2024 00:00:00 GMT", 1234)
+    assert standings_store.page_validators(conn, "A01", "Georgia", "other-url") is None
+    assert standings_store.page_validators(conn, "A01", "Florida", "f") is None
+    assert standings_store.page_validators(conn, "A01", "Georgia", "u", parser=standings_store.PARSER_STANDINGS) is None
+
+
+def test_touch_and_expire_pages(conn):
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA, fetched_at=1)
+    assert standings_store.fresh_pages(conn, 10, now=100) == set()
+    standings_store.touch_page(conn, "A01", "Georgia", fetched_at=95)
+    assert standings_store.fresh_pages(conn, 10, now=100) == {("A01", "Georgia")}
+    standings_store.expire_pages(conn)
+    assert standings_store.fresh_pages(conn, 10, now=100) == set()
+    assert standings_store.fresh_pages(conn, float("inf"), now=100) == {("A01", "Georgia")}
+
+
+def test_champions_view_keeps_ties_and_skips_world(conn):
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA)
+    standings_store.replace_page(conn, "A01", "World", "Div A", "w", GEORGIA)
+    champions = standings_store.query_champions(conn, [("A01", "Georgia"), ("A01", "World")])
+    assert sorted(zip(champions["Event"], champions["Name"])) == [
+        ("Forms", "Mary Smith"), ("Forms", "Sue Brown"), ("Sparring", "Ann Lee"),
+    ]
+
+    # Only the changed page's slice is recomputed
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA[2:])
+    champions = standings_store.query_champions(conn, [("A01", "Georgia")])
+    assert sorted(zip(champions["Event"], champions["Name"])) == [("Forms", "Ann Lee"), ("Sparring", "Ann Lee")]
+
+
+def test_parsers_are_stored_separately(conn):
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA)
+    standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA[:1],
+                                 parser=standings_store.PARSER_STANDINGS)
+
+    assert len(standings_store.query_pages(conn, [("A01", "Georgia")])) == len(GEORGIA)
+    assert len(standings_store.query_pages(
+        conn, [("A01", "Georgia")], parser=standings_store.PARSER_STANDINGS
+    )) == 1
+    assert standings_store.fresh_pages(conn, 10, parser=standings_store.PARSER_STANDINGS) == {("A01", "Georgia")}
+    assert len(standings_store.query_champions(conn, [("A01", "Georgia")])) == 3
+
+
+def test_old_store_without_parser_column_is_rebuilt(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    old = sqlite3.connect(path)
+    old.execute("CREATE TABLE pages (division_code TEXT, region TEXT, url TEXT, fetched_at REAL)")
+    old.execute("INSERT INTO pages VALUES ('A01', 'Georgia', 'u', 1)")
+    old.commit()
+    old.close()
+
+    conn = standings_store.connect(path)
+    try:
+        assert standings_store.fresh_pages(conn, float("inf")) == set()
+        assert standings_store.replace_page(conn, "A01", "Georgia", "Div A", "u", GEORGIA)
+    finally:
+        conn.close()